@@ -1,6 +1,5 @@
 #!/usr/bin/env bash
 (
     source .venv/bin/activate &&
-        uv run src/main.py static-site-generator docs &&
-        uv run -m http.server 8888
+        uv run src/serve.py static-site-generator docs --watch
 )
@@ -0,0 +1,778 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import cast
+
+import blocks
+import patterns
+from blocks import BlockType
+from fragments import FragmentMemo
+from htmlnode import HTMLNode
+from leafnode import LeafNode
+from main import content_generation
+from manifest import text_digest
+from parentnode import ParentNode
+from planner import plan_build
+from profiler import count_nodes
+from sync import AssetSync
+from textnode import TextNode, TextType
+
+WORDS = (
+    "the quick brown fox jumps over a lazy dog while elves sing of "
+    "rivendell and old tom bombadil keeps his own counsel"
+).split()
+
+
+class Arguments(argparse.Namespace):
+    # Each benchmark's parser supplies its own defaults for its options.
+    seed: int = 0
+    repeat: int = 5
+    run: Callable[[Arguments], None] | None = None
+    blocks: int = 5000
+    paragraphs: int = 5000
+    words: int = 40
+    nodes: int = 200000
+    files: int = 100000
+    per_directory: int = 100
+    fanout: int = 10
+    pages: int = 200
+    page_blocks: int = 40
+    depth: int = 3
+    list_density: float = 0.15
+    code_density: float = 0.1
+    quote_density: float = 0.1
+    link_density: float = 0.05
+    shared_density: float = 0.0
+    jobs: int = 1
+    output: Path | None = None
+    baseline: Path = Path()
+    current: Path = Path()
+    threshold: float = 0.1
+
+
+def synthetic_sentence(generator: random.Random, words: int) -> str:
+    return " ".join(generator.choice(WORDS) for _ in range(words))
+
+
+def synthetic_inline(generator: random.Random, words: int) -> str:
+    parts: list[str] = []
+    for _ in range(words):
+        word = generator.choice(WORDS)
+        kind = generator.randrange(12)
+        if kind == 0:
+            word = f"**{word}**"
+        elif kind == 1:
+            word = f"_{word}_"
+        elif kind == 2:
+            word = f"`{word}`"
+        elif kind == 3:
+            word = f"[{word}](/{word}/index.html)"
+        elif kind == 4:
+            word = f"![{word}](/images/{word}.png)"
+        parts.append(word)
+    return " ".join(parts)
+
+
+def synthetic_block(generator: random.Random) -> str:
+    kind = generator.randrange(7)
+    if kind == 0:
+        level = generator.randint(1, 6)
+        return f"{'#' * level} {synthetic_sentence(generator, 4)}"
+    if kind == 1:
+        lines = [synthetic_sentence(generator, 6) for _ in range(4)]
+        return "```python\n" + "\n".join(lines) + "\n```"
+    if kind == 2:
+        return "\n".join(
+            f"> {synthetic_sentence(generator, 8)}"
+            for _ in range(generator.randint(1, 4))
+        )
+    if kind == 3:
+        return "\n".join(
+            f"{index}. {synthetic_sentence(generator, 6)}"
+            for index in range(1, generator.randint(2, 6))
+        )
+    if kind == 4:
+        return "\n".join(
+            f"- {synthetic_sentence(generator, 6)}"
+            for _ in range(generator.randint(1, 5))
+        )
+    return "\n".join(
+        synthetic_sentence(generator, 12)
+        for _ in range(generator.randint(1, 5))
+    )
+
+
+def synthetic_markdown(block_count: int, seed: int = 0) -> str:
+    generator = random.Random(seed)
+    return "\n\n".join(synthetic_block(generator) for _ in range(block_count))
+
+
+def best_time(function: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _ = function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_blocks(arguments: Arguments) -> None:
+    text = synthetic_markdown(arguments.blocks, arguments.seed)
+    if blocks.split_blocks(text) != blocks.iterator_split_blocks(text):
+        raise ValueError("split_blocks disagrees with iterator_split_blocks")
+    iterators = best_time(
+        lambda: blocks.iterator_split_blocks(text), arguments.repeat
+    )
+    tokenizer = best_time(lambda: blocks.split_blocks(text), arguments.repeat)
+    print(f"{arguments.blocks} blocks, {len(text)} characters")
+    print(f"iterator_split_blocks: {iterators * 1000:10.2f} ms")
+    print(f"split_blocks:          {tokenizer * 1000:10.2f} ms")
+    print(f"speedup:               {iterators / tokenizer:10.2f}x")
+
+
+def bench_inline(arguments: Arguments) -> None:
+    generator = random.Random(arguments.seed)
+    nodes = [
+        TextNode(synthetic_inline(generator, arguments.words), TextType.PLAIN)
+        for _ in range(arguments.paragraphs)
+    ]
+    if [node.split_node() for node in nodes] != [
+        node.staged_split_node() for node in nodes
+    ]:
+        raise ValueError("split_node disagrees with staged_split_node")
+    staged = best_time(
+        lambda: [node.staged_split_node() for node in nodes], arguments.repeat
+    )
+    lexer = best_time(
+        lambda: [node.split_node() for node in nodes], arguments.repeat
+    )
+    print(f"{arguments.paragraphs} paragraphs of {arguments.words} words")
+    print(f"staged_split_node: {staged * 1000:10.2f} ms")
+    print(f"split_node:        {lexer * 1000:10.2f} ms")
+    print(f"speedup:           {staged / lexer:10.2f}x")
+
+
+def traced_bytes(function: Callable[[], object]) -> tuple[object, int]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = function()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+class UnslottedNode:
+    # HTMLNode as it was laid out before __slots__ and lazy props.
+    def __init__(
+        self,
+        tag: str | None,
+        value: str | None,
+        children: list[UnslottedNode] | None = None,
+        props: dict[str, str] | None = None,
+    ) -> None:
+        self.tag: str | None = tag
+        self.value: str | None = value
+        self.children: list[UnslottedNode] = (
+            children if children is not None else []
+        )
+        self.props: dict[str, str] = props if props is not None else {}
+
+
+class UnslottedTextNode:
+    def __init__(
+        self, text: str, text_type: TextType, url: str | None = None
+    ) -> None:
+        self.text: str = text
+        self.text_type: TextType = text_type
+        self.url: str | None = url
+
+
+def unslotted_copy(node: HTMLNode) -> UnslottedNode:
+    return UnslottedNode(
+        node.tag,
+        node.value,
+        [unslotted_copy(child) for child in node.children] or None,
+        dict(node.props) if node.props else None,
+    )
+
+
+def slotted_copy(node: HTMLNode) -> HTMLNode:
+    return HTMLNode(
+        node.tag,
+        node.value,
+        [slotted_copy(child) for child in node.children] or None,
+        dict(node.props) if node.props else None,
+    )
+
+
+def bench_nodes(arguments: Arguments) -> None:
+    text = synthetic_markdown(arguments.blocks, arguments.seed)
+    tree, tree_bytes = traced_bytes(lambda: ParentNode.from_markdown(text))
+    if not isinstance(tree, HTMLNode):
+        raise TypeError("from_markdown did not return a node")
+    nodes = count_nodes(tree)
+    # props allocates an empty dict on first read. Read it on every node
+    # now so neither traced copy pays for the source tree's dicts.
+    pending = [tree]
+    while pending:
+        node = pending.pop()
+        _ = node.props
+        pending.extend(node.children)
+    value = "shared text"
+    # Copies share the tree's strings, so they measure the node layout only.
+    measurements: list[tuple[str, int, int, int]] = [
+        (
+            "from_markdown tree",
+            nodes,
+            traced_bytes(lambda: unslotted_copy(tree))[1],
+            traced_bytes(lambda: slotted_copy(tree))[1],
+        ),
+        (
+            "LeafNode(None, text)",
+            arguments.nodes,
+            traced_bytes(
+                lambda: [
+                    UnslottedNode(None, value) for _ in range(arguments.nodes)
+                ]
+            )[1],
+            traced_bytes(
+                lambda: [LeafNode(None, value) for _ in range(arguments.nodes)]
+            )[1],
+        ),
+        (
+            "TextNode(text, PLAIN)",
+            arguments.nodes,
+            traced_bytes(
+                lambda: [
+                    UnslottedTextNode(value, TextType.PLAIN)
+                    for _ in range(arguments.nodes)
+                ]
+            )[1],
+            traced_bytes(
+                lambda: [
+                    TextNode(value, TextType.PLAIN)
+                    for _ in range(arguments.nodes)
+                ]
+            )[1],
+        ),
+    ]
+    print(
+        (
+            f"from_markdown: {nodes} nodes, {tree_bytes} bytes with text, "
+            f"{nodes / (tree_bytes / 2**20):.0f} nodes/MB"
+        )
+    )
+    print(f"{'':24}{'unslotted':>23}{'slotted':>23}")
+    for name, count, before, after in measurements:
+        print(
+            f"{name:24}"
+            + "".join(
+                f"{size / count:8.1f} B {count / (size / 2**20):9.0f}/MB"
+                for size in (before, after)
+            )
+        )
+
+
+def bench_regex(arguments: Arguments) -> None:
+    generator = random.Random(arguments.seed)
+    texts = [synthetic_block(generator) for _ in range(arguments.blocks)]
+    cases: list[
+        tuple[
+            str,
+            Callable[[str], object],
+            Callable[[str], object],
+        ]
+    ] = [
+        (
+            "quote block",
+            lambda text: list(re.finditer(patterns.list_regex(r">"), text)),
+            lambda text: list(patterns.QUOTE_BLOCK.finditer(text)),
+        ),
+        (
+            "unordered list block",
+            lambda text: list(
+                re.finditer(patterns.list_regex(r"\*", r"\-"), text)
+            ),
+            lambda text: list(patterns.UNORDERED_LIST_BLOCK.finditer(text)),
+        ),
+        (
+            "code fence",
+            lambda text: list(re.finditer(patterns.CODE_FENCE.pattern, text)),
+            lambda text: list(patterns.CODE_FENCE.finditer(text)),
+        ),
+        (
+            "image or link",
+            lambda text: list(
+                re.finditer(patterns.IMAGE_OR_LINK.pattern, text)
+            ),
+            lambda text: list(patterns.IMAGE_OR_LINK.finditer(text)),
+        ),
+    ]
+    print(f"{arguments.blocks} blocks, microseconds per block")
+    for name, uncompiled, compiled in cases:
+        before = best_time(
+            lambda: [uncompiled(text) for text in texts], arguments.repeat
+        )
+        after = best_time(
+            lambda: [compiled(text) for text in texts], arguments.repeat
+        )
+        print(
+            (
+                f"{name:22} pattern string: {before / len(texts) * 1e6:6.2f}"
+                f"  compiled: {after / len(texts) * 1e6:6.2f}"
+            )
+        )
+
+
+def synthetic_tree(
+    root: Path, files: int, per_directory: int, fanout: int, seed: int
+) -> None:
+    generator = random.Random(seed)
+    for index in range(0, files, per_directory):
+        digits: list[str] = []
+        directory_index = index // per_directory
+        while directory_index:
+            directory_index, digit = divmod(directory_index, fanout)
+            digits.append(f"d{digit}")
+        directory = root.joinpath(*digits)
+        directory.mkdir(parents=True, exist_ok=True)
+        for file_index in range(index, min(files, index + per_directory)):
+            _ = directory.joinpath(f"f{file_index}.bin").write_bytes(
+                generator.randbytes(generator.randrange(16))
+            )
+
+
+def recursive_walk(source: Path, destination: Path) -> int:
+    # The stat pattern of the old recursively_act with a no-op action.
+    visited = 0
+    if source.exists():
+        if destination.parent.exists():
+            visited += 1
+        if source.is_dir():
+            for next_source in source.iterdir():
+                visited += recursive_walk(
+                    next_source, destination.joinpath(next_source.name)
+                )
+    return visited
+
+
+def bench_tree(arguments: Arguments) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        static_dir = Path(directory).joinpath("static")
+        public_dir = Path(directory).joinpath("public")
+        start = time.perf_counter()
+        synthetic_tree(
+            static_dir,
+            arguments.files,
+            arguments.per_directory,
+            arguments.fanout,
+            arguments.seed,
+        )
+        print(
+            (
+                f"created {arguments.files} files in "
+                f"{time.perf_counter() - start:.2f} s"
+            )
+        )
+        public_dir.mkdir()
+        recursive = best_time(
+            lambda: recursive_walk(static_dir, public_dir), arguments.repeat
+        )
+        planned = best_time(
+            lambda: plan_build(public_dir, static_dir), arguments.repeat
+        )
+        with open(os.devnull, "w") as devnull:
+            with contextlib.redirect_stdout(devnull):
+                start = time.perf_counter()
+                AssetSync().sync_tree(static_dir, public_dir)
+                first_sync = time.perf_counter() - start
+                unchanged = best_time(
+                    lambda: AssetSync().sync_tree(static_dir, public_dir),
+                    arguments.repeat,
+                )
+        replan = best_time(
+            lambda: plan_build(public_dir, static_dir), arguments.repeat
+        )
+        print(f"recursive walk:        {recursive * 1000:10.1f} ms")
+        print(f"plan_build:            {planned * 1000:10.1f} ms")
+        print(f"plan_build, populated: {replan * 1000:10.1f} ms")
+        print(f"first sync:            {first_sync * 1000:10.1f} ms")
+        print(f"unchanged sync:        {unchanged * 1000:10.1f} ms")
+
+
+def page_path(index: int, depth: int) -> Path:
+    parts: list[str] = []
+    value = index
+    for _ in range(index % (depth + 1)):
+        value, digit = divmod(value, 4)
+        parts.append(f"section{digit}")
+    return Path(*parts, f"page{index}.md")
+
+
+def corpus_inline(
+    generator: random.Random, words: int, link_density: float, urls: list[str]
+) -> str:
+    parts: list[str] = []
+    for _ in range(words):
+        word = generator.choice(WORDS)
+        if generator.random() < link_density:
+            word = f"[{word}]({generator.choice(urls)})"
+        else:
+            kind = generator.randrange(12)
+            if kind == 0:
+                word = f"**{word}**"
+            elif kind == 1:
+                word = f"_{word}_"
+            elif kind == 2:
+                word = f"`{word}`"
+        parts.append(word)
+    return " ".join(parts)
+
+
+def corpus_block(
+    generator: random.Random, arguments: Arguments, urls: list[str]
+) -> str:
+    def inline(words: int) -> str:
+        return corpus_inline(generator, words, arguments.link_density, urls)
+
+    roll = generator.random()
+    if roll < arguments.list_density:
+        items = generator.randint(2, 6)
+        if generator.randrange(2):
+            return "\n".join(f"- {inline(6)}" for _ in range(items))
+        return "\n".join(
+            f"{index}. {inline(6)}" for index in range(1, items + 1)
+        )
+    roll -= arguments.list_density
+    if roll < arguments.code_density:
+        lines = [synthetic_sentence(generator, 6) for _ in range(4)]
+        return "```python\n" + "\n".join(lines) + "\n```"
+    roll -= arguments.code_density
+    if roll < arguments.quote_density:
+        return "\n".join(
+            f"> {inline(8)}" for _ in range(generator.randint(1, 4))
+        )
+    roll -= arguments.quote_density
+    if roll < 0.1:
+        level = generator.randint(2, 6)
+        return f"{'#' * level} {synthetic_sentence(generator, 4)}"
+    return "\n".join(inline(12) for _ in range(generator.randint(1, 5)))
+
+
+def synthetic_content(root: Path, arguments: Arguments) -> dict[Path, str]:
+    generator = random.Random(arguments.seed)
+    paths = [
+        page_path(index, arguments.depth) for index in range(arguments.pages)
+    ]
+    urls = [f"/{path.with_suffix('.html').as_posix()}" for path in paths]
+    # Boilerplate such as notes and footers that many pages repeat.
+    shared = (
+        [corpus_block(generator, arguments, urls) for _ in range(16)]
+        if arguments.shared_density > 0
+        else []
+    )
+
+    def block() -> str:
+        if shared and generator.random() < arguments.shared_density:
+            return generator.choice(shared)
+        return corpus_block(generator, arguments, urls)
+
+    pages: dict[Path, str] = {}
+    for path in paths:
+        markdown = "\n\n".join(
+            [f"# {synthetic_sentence(generator, 4)}"]
+            + [block() for _ in range(arguments.page_blocks)]
+        )
+        target = root.joinpath(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _ = target.write_text(markdown, encoding="utf-8")
+        pages[target] = markdown
+    return pages
+
+
+def render_corpus(
+    markdowns: list[str], memo: FragmentMemo | None = None
+) -> list[str]:
+    return [
+        "".join(
+            ParentNode.iter_blocks_html(
+                blocks.tokenize_blocks(markdown.split("\n")),
+                memo=memo,
+            )
+        )
+        for markdown in markdowns
+    ]
+
+
+def run_times(function: Callable[[], object], repeat: int) -> list[float]:
+    times: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _ = function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def full_build(site: Path, destination: Path, jobs: int) -> None:
+    with open(os.devnull, "w") as devnull:
+        with contextlib.chdir(site), contextlib.redirect_stdout(devnull):
+            _ = content_generation(None, str(destination), jobs=jobs)
+
+
+def bench_suite(arguments: Arguments) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        site = Path(directory)
+        pages = synthetic_content(site.joinpath("content"), arguments)
+        markdowns = list(pages.values())
+        site.joinpath("static").mkdir()
+        _ = shutil.copy(
+            Path(__file__).parent.parent.joinpath("template.html"), site
+        )
+        paragraphs = [
+            block
+            for markdown in markdowns
+            for block, block_type, _ in blocks.split_blocks(markdown)
+            if block_type is BlockType.PARAGRAPH
+        ]
+        trees = [ParentNode.from_markdown(markdown) for markdown in markdowns]
+        cases: list[tuple[str, Callable[[], object]]] = [
+            (
+                "split_blocks",
+                lambda: [blocks.split_blocks(text) for text in markdowns],
+            ),
+            (
+                "split_text",
+                lambda: [TextNode.split_text(text) for text in paragraphs],
+            ),
+            (
+                "from_markdown",
+                lambda: [ParentNode.from_markdown(text) for text in markdowns],
+            ),
+            ("to_html", lambda: [tree.to_html() for tree in trees]),
+            ("render_blocks", lambda: render_corpus(markdowns)),
+            (
+                "render_blocks_memo",
+                lambda: render_corpus(markdowns, FragmentMemo()),
+            ),
+            (
+                "content_generation",
+                lambda: full_build(
+                    site, site.joinpath("public"), arguments.jobs
+                ),
+            ),
+        ]
+        results: dict[str, dict[str, object]] = {}
+        for name, function in cases:
+            times = run_times(function, arguments.repeat)
+            results[name] = {
+                "best_ms": min(times) * 1000,
+                "median_ms": statistics.median(times) * 1000,
+                "runs_ms": [value * 1000 for value in times],
+            }
+            print(
+                (
+                    f"{name:20} best {min(times) * 1000:10.2f} ms  "
+                    f"median {statistics.median(times) * 1000:10.2f} ms"
+                ),
+                file=sys.stderr,
+            )
+        memo = FragmentMemo()
+        _ = render_corpus(markdowns, memo)
+        print(memo.summary(), file=sys.stderr)
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "parameters": {
+            name: getattr(arguments, name)
+            for name in (
+                "seed",
+                "repeat",
+                "pages",
+                "page_blocks",
+                "depth",
+                "list_density",
+                "code_density",
+                "quote_density",
+                "link_density",
+                "shared_density",
+                "jobs",
+            )
+        },
+        "corpus": {
+            "pages": len(markdowns),
+            "characters": sum(len(text) for text in markdowns),
+            "paragraphs": len(paragraphs),
+            "digest": text_digest("\n".join(markdowns)),
+        },
+        "fragments": {
+            "hits": memo.hits,
+            "misses": memo.misses,
+            "hit_rate": memo.hit_rate,
+        },
+        "results": results,
+    }
+    if arguments.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(arguments.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+type Report = dict[str, dict[str, dict[str, float]]]
+
+
+def compare_reports(
+    baseline: Report,
+    current: Report,
+    threshold: float,
+) -> list[tuple[str, float, float, float, bool]]:
+    rows: list[tuple[str, float, float, float, bool]] = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        before = previous["best_ms"]
+        after = result["best_ms"]
+        ratio = after / before if before else float("inf")
+        rows.append((name, before, after, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def bench_compare(arguments: Arguments) -> None:
+    with open(arguments.baseline, encoding="utf-8") as file:
+        baseline = cast(Report, json.load(file))
+    with open(arguments.current, encoding="utf-8") as file:
+        current = cast(Report, json.load(file))
+    if baseline["parameters"] != current["parameters"]:
+        print("warning: the reports were run with different parameters")
+    rows = compare_reports(baseline, current, arguments.threshold)
+    print(f"{'benchmark':20} {'before ms':>10} {'after ms':>10} {'ratio':>7}")
+    for name, before, after, ratio, regressed in rows:
+        print(
+            (
+                f"{name:20} {before:10.2f} {after:10.2f} {ratio:7.2f}"
+                f"{'  REGRESSION' if regressed else ''}"
+            )
+        )
+    if any(row[4] for row in rows):
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parser benchmarks")
+    _ = parser.add_argument("--seed", type=int, default=0)
+    _ = parser.add_argument("--repeat", type=int, default=5)
+    benchmarks = parser.add_subparsers(dest="benchmark", required=True)
+    blocks_parser = benchmarks.add_parser(
+        "blocks", help="compare the block tokenizer with the regex iterators"
+    )
+    _ = blocks_parser.add_argument("--blocks", type=int, default=20000)
+    blocks_parser.set_defaults(run=bench_blocks)
+    inline_parser = benchmarks.add_parser(
+        "inline", help="compare the inline lexer with the staged splitters"
+    )
+    _ = inline_parser.add_argument("--paragraphs", type=int, default=5000)
+    _ = inline_parser.add_argument("--words", type=int, default=40)
+    inline_parser.set_defaults(run=bench_inline)
+    nodes_parser = benchmarks.add_parser(
+        "nodes", help="measure the memory used by node objects"
+    )
+    _ = nodes_parser.add_argument("--blocks", type=int, default=5000)
+    _ = nodes_parser.add_argument("--nodes", type=int, default=200000)
+    nodes_parser.set_defaults(run=bench_nodes)
+    regex_parser = benchmarks.add_parser(
+        "regex", help="measure per-block pattern lookup overhead"
+    )
+    _ = regex_parser.add_argument("--blocks", type=int, default=5000)
+    regex_parser.set_defaults(run=bench_regex)
+    tree_parser = benchmarks.add_parser(
+        "tree", help="compare the build planner with the recursive walk"
+    )
+    _ = tree_parser.add_argument("--files", type=int, default=100000)
+    _ = tree_parser.add_argument("--per-directory", type=int, default=100)
+    _ = tree_parser.add_argument("--fanout", type=int, default=10)
+    tree_parser.set_defaults(run=bench_tree)
+    suite_parser = benchmarks.add_parser(
+        "suite",
+        help=(
+            "time the build pipeline on a synthetic content tree and "
+            "write the results as JSON"
+        ),
+    )
+    _ = suite_parser.add_argument("--pages", type=int, default=200)
+    _ = suite_parser.add_argument(
+        "--page-blocks", type=int, default=40, help="blocks per page"
+    )
+    _ = suite_parser.add_argument(
+        "--depth", type=int, default=3, help="maximum directory nesting"
+    )
+    _ = suite_parser.add_argument("--list-density", type=float, default=0.15)
+    _ = suite_parser.add_argument("--code-density", type=float, default=0.1)
+    _ = suite_parser.add_argument("--quote-density", type=float, default=0.1)
+    _ = suite_parser.add_argument(
+        "--link-density",
+        type=float,
+        default=0.05,
+        help="fraction of words that link to another page",
+    )
+    _ = suite_parser.add_argument(
+        "--shared-density",
+        type=float,
+        default=0.0,
+        help="fraction of blocks repeated verbatim across pages",
+    )
+    _ = suite_parser.add_argument("-j", "--jobs", type=int, default=1)
+    _ = suite_parser.add_argument(
+        "-o", "--output", type=Path, help="write JSON here instead of stdout"
+    )
+    suite_parser.set_defaults(run=bench_suite)
+    compare_parser = benchmarks.add_parser(
+        "compare", help="compare two suite reports and fail on regressions"
+    )
+    _ = compare_parser.add_argument("baseline", type=Path)
+    _ = compare_parser.add_argument("current", type=Path)
+    _ = compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="allowed slowdown of the best time, as a fraction",
+    )
+    compare_parser.set_defaults(run=bench_compare)
+    arguments = parser.parse_args(namespace=Arguments())
+    if arguments.run is not None:
+        arguments.run(arguments)
+
+
+if __name__ == "__main__":
+    main()
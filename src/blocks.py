@@ -1,6 +1,8 @@
-import re
-from collections.abc import Generator, Sequence
+from collections.abc import Generator, Iterable, Iterator, Sequence
 from enum import Enum, auto
+from typing import TextIO
+
+import patterns
 
 
 class BlockType(Enum):
@@ -12,25 +14,6 @@ class BlockType(Enum):
     PARAGRAPH = auto()
 
 
-def list_regex(item_start: str, alternate_start: str | None = None) -> str:
-    if alternate_start is None:
-        return (
-            rf"(?:^|(?:\r?\n))[^\S\r\n]*(?:"
-            rf"(?:[^\S\r\n]*{item_start}(?:[^\S\r\n].*)?\r?\n)*)"
-            rf"[^\S\r\n]*{item_start}[^\S\r\n].*"
-        )
-    return (
-        rf"(?:^|(?:\r?\n))(?:"
-        rf"(?:[^\S\r\n]*(?:"
-        rf"(?:[^\S\r\n]*{item_start}(?:[^\S\r\n].*)?\r?\n)*)"
-        rf"[^\S\r\n]*{item_start}[^\S\r\n].*)"
-        rf"|(?:"
-        rf"[^\S\r\n]*(?:"
-        rf"(?:[^\S\r\n]*{alternate_start}(?:[^\S\r\n].*)?\r?\n)*)"
-        rf"[^\S\r\n]*{alternate_start}[^\S\r\n].*))"
-    )
-
-
 def code_block_iterator(
     text: str,
     block_type: BlockType = BlockType.PARAGRAPH,
@@ -40,10 +23,7 @@ def code_block_iterator(
         props = {}
     block_start = 0
     language: str | None = None
-    for block in re.finditer(
-        r"(?:^|(?:\r?\n))[^\S\r\n]*```([^\S\r\n]*(?P<language>.*?))?[^\S\r\n]*(?:$|(?:\r?\n))",
-        text,
-    ):
+    for block in patterns.CODE_FENCE.finditer(text):
         if block_type is BlockType.CODE and block.group("language"):
             continue
         next_block_start = (
@@ -82,10 +62,7 @@ def header_block_iterator(
         yield text, block_type, props.copy()
         return
     block_start = 0
-    for block in re.finditer(
-        r"(?:^|(?:\r?\n))[^\S\r\n]*(?P<hashcount>#{1,6})[^\S\r\n]+(?P<header>.*?)[^\S\r\n]*(?:$|(?:\r?\n))",
-        text,
-    ):
+    for block in patterns.HEADING.finditer(text):
         if block.start() > block_start:
             yield (
                 text[block_start : block.start()],
@@ -114,7 +91,7 @@ def quote_block_iterator(
         yield text, block_type, props.copy()
         return
     block_start = 0
-    for block in re.finditer(list_regex(r">"), text):
+    for block in patterns.QUOTE_BLOCK.finditer(text):
         if block.start() > block_start:
             yield (
                 text[block_start : block.start()],
@@ -141,7 +118,7 @@ def ordered_list_block_iterator(
         yield text, block_type, props.copy()
         return
     block_start = 0
-    for block in re.finditer(list_regex(r"\d+\."), text):
+    for block in patterns.ORDERED_LIST_BLOCK.finditer(text):
         if block.start() > block_start:
             yield (
                 text[block_start : block.start()],
@@ -168,7 +145,7 @@ def unordered_list_block_iterator(
         yield text, block_type, props.copy()
         return
     block_start = 0
-    for block in re.finditer(list_regex(r"\*", r"\-"), text):
+    for block in patterns.UNORDERED_LIST_BLOCK.finditer(text):
         if block.start() > block_start:
             yield (
                 text[block_start : block.start()],
@@ -195,7 +172,7 @@ def paragraph_block_iterator(
         yield text, block_type, props.copy()
         return
     block_start = 0
-    for block in re.finditer(r"(?:\r?\n)+", text):
+    for block in patterns.NEWLINES.finditer(text):
         newlines = block.group().count("\n")
         if block.start() > block_start and newlines > 1:
             yield (
@@ -207,7 +184,7 @@ def paragraph_block_iterator(
     yield text[block_start:], block_type, props.copy()
 
 
-def split_blocks(
+def iterator_split_blocks(
     text: str,
 ) -> Sequence[tuple[str, BlockType, dict[str, str]]]:
     return [
@@ -230,6 +207,204 @@ def split_blocks(
     ]
 
 
+def _run_block(
+    lines: list[str], block_type: BlockType
+) -> tuple[str, BlockType, dict[str, str]] | None:
+    text = "\n".join(lines).strip()
+    if text == "":
+        return None
+    if block_type is BlockType.PARAGRAPH:
+        text = text.replace("\n", " ")
+    return text, block_type, {}
+
+
+def tokenize_blocks(
+    lines: Iterable[str],
+) -> Generator[tuple[str, BlockType, dict[str, str]]]:
+    # lines follows str.split("\n"): only the last element is unterminated.
+    # Fences and headings swallow the newline after them, so a fence or a
+    # heading directly following another one is plain text, as in the
+    # regex iterators.
+    code: list[str] | None = None
+    code_language = ""
+    fence_matched = False
+    heading_matched = False
+    paragraph: list[str] = []
+    run: list[str] = []
+    run_type = BlockType.PARAGRAPH
+    run_marker = ""
+    run_final = -1
+
+    def resolve_run() -> Generator[tuple[str, BlockType, dict[str, str]]]:
+        nonlocal run, run_final, paragraph
+        if run_final >= 0:
+            block = _run_block(paragraph, BlockType.PARAGRAPH)
+            if block is not None:
+                yield block
+            block = _run_block(run[: run_final + 1], run_type)
+            if block is not None:
+                yield block
+            paragraph = run[run_final + 1 :]
+        else:
+            paragraph.extend(run)
+        run = []
+        run_final = -1
+
+    def flush() -> Generator[tuple[str, BlockType, dict[str, str]]]:
+        nonlocal paragraph
+        yield from resolve_run()
+        block = _run_block(paragraph, BlockType.PARAGRAPH)
+        if block is not None:
+            yield block
+        paragraph = []
+
+    iterator = iter(lines)
+    line = next(iterator, None)
+    while line is not None:
+        next_line = next(iterator, None)
+        match = patterns.BLOCK_LINE.match(line)
+        if match is not None and match.group("fence") and not fence_matched:
+            fence_matched = True
+            language = (
+                patterns.FENCE_LANGUAGE
+                if next_line is not None
+                else patterns.LAST_FENCE_LANGUAGE
+            ).fullmatch(match.group("rest"))
+            language = language.group("language") if language else ""
+            if code is None:
+                yield from flush()
+                code = [line]
+                code_language = language
+            else:
+                code.append(line)
+                if not language:
+                    yield (
+                        "\n".join(code).strip(),
+                        BlockType.CODE,
+                        (
+                            {"class": f"language-{code_language}"}
+                            if code_language
+                            else {}
+                        ),
+                    )
+                    code = None
+                    heading_matched = False
+            line = next_line
+            continue
+        fence_matched = False
+        if code is not None:
+            code.append(line)
+        elif (
+            match is not None
+            and match.group("hashes")
+            and not heading_matched
+        ):
+            yield from flush()
+            heading_matched = True
+            yield (
+                line.strip(),
+                BlockType.HEADING,
+                {"heading": str(len(match.group("hashes")))},
+            )
+        else:
+            heading_matched = False
+            marker = match.group("marker") if match is not None else None
+            rest = match.group("rest") if match is not None else ""
+            final = rest != "" and rest[0].isspace() and rest[0] not in "\r\n"
+            if marker is not None and (final or rest in ("", "\r")):
+                marker_key = "1" if marker[0].isdecimal() else marker
+                if run and marker_key != run_marker:
+                    yield from resolve_run()
+                run_marker = marker_key
+                run_type = {
+                    ">": BlockType.QUOTE,
+                    "1": BlockType.ORDERED_LIST,
+                }.get(marker_key, BlockType.UNORDERED_LIST)
+                run.append(line)
+                if final:
+                    run_final = len(run) - 1
+            else:
+                yield from resolve_run()
+                if line in ("", "\r"):
+                    yield from flush()
+                else:
+                    paragraph.append(line)
+        line = next_line
+    yield from flush()
+    if code is not None:
+        yield "\n".join(code).strip(), BlockType.CODE, {}
+
+
+def iter_lines(file: TextIO) -> Iterator[str]:
+    # The elements of file.read().split("\n") without holding the text.
+    line = ""
+    for line in file:
+        yield line.removesuffix("\n")
+    if not line or line.endswith("\n"):
+        yield ""
+
+
+def find_title(lines: Iterable[str]) -> str | None:
+    for block, block_type, props in tokenize_blocks(lines):
+        if block_type is BlockType.HEADING and props["heading"] == "1":
+            return block.strip()[2:]
+    return None
+
+
+def split_blocks(
+    text: str,
+) -> Sequence[tuple[str, BlockType, dict[str, str]]]:
+    return list(tokenize_blocks(text.split("\n")))
+
+
+class Document:
+    __slots__: tuple[str, ...] = ("blocks", "title", "outline", "word_count")
+
+    def __init__(
+        self,
+        document_blocks: list[tuple[str, BlockType, dict[str, str]]],
+        title: str | None = None,
+        outline: list[tuple[int, str]] | None = None,
+        word_count: int = 0,
+    ) -> None:
+        self.blocks: list[tuple[str, BlockType, dict[str, str]]] = (
+            document_blocks
+        )
+        self.title: str | None = title
+        self.outline: list[tuple[int, str]] = (
+            outline if outline is not None else []
+        )
+        self.word_count: int = word_count
+
+    def add_block(
+        self, block: str, block_type: BlockType, props: dict[str, str]
+    ) -> None:
+        self.blocks.append((block, block_type, props))
+        match block_type:
+            case BlockType.HEADING:
+                level = int(props["heading"])
+                if level == 1 and self.title is None:
+                    self.title = block.strip()[2:]
+                heading = block[level:].strip()
+                self.outline.append((level, heading))
+                self.word_count += len(heading.split())
+            case BlockType.CODE:
+                pass
+            case BlockType.PARAGRAPH:
+                self.word_count += len(block.split())
+            case _:
+                self.word_count += max(
+                    0, len(block.split()) - block.count("\n") - 1
+                )
+
+
+def parse_document(text: str) -> Document:
+    document = Document([])
+    for block in tokenize_blocks(text.split("\n")):
+        document.add_block(*block)
+    return document
+
+
 def extract_title(text: str) -> str | None:
     for c in code_block_iterator(text):
         for h in header_block_iterator(*c):
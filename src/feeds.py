@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import UTC, datetime
+from itertools import batched
+from pathlib import Path
+from urllib.parse import quote
+from xml.sax.saxutils import escape, quoteattr
+
+import patterns
+from links import rewrite_url
+from manifest import Manifest
+from sinks import DiskSink, OutputSink, temporary_path
+from siteindex import PageEntry, SiteIndex
+
+SITEMAP_LIMIT = 50000
+FEED_LIMIT = 50
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+
+
+def site_root(site_url: str, path_prefix: str) -> str:
+    return escape(
+        site_url.rstrip("/") + rewrite_url("/", path_prefix).rstrip("/"),
+        {'"': "&quot;"},
+    )
+
+
+def url_path(url: str) -> str:
+    # Quoted paths never need XML escaping.
+    if patterns.UNRESERVED_PATH.fullmatch(url):
+        return url
+    return quote(url)
+
+
+def rfc3339(date: str) -> str | None:
+    try:
+        parsed = datetime.fromisoformat(date)
+    except ValueError:
+        return None
+    # Front matter dates without an offset are taken as UTC.
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def entry_updated(entry: PageEntry) -> str:
+    if entry.date is not None and (updated := rfc3339(entry.date)):
+        return updated
+    return time.strftime(
+        "%Y-%m-%dT%H:%M:%SZ", time.gmtime(entry.signature[0] / 1e9)
+    )
+
+
+def entry_author(entry: PageEntry | None) -> str | None:
+    if entry is None:
+        return None
+    author = entry.fields.get("author")
+    return author if isinstance(author, str) and author else None
+
+
+def iter_sitemap(
+    entries: Iterable[PageEntry], site_url: str, path_prefix: str
+) -> Iterator[str]:
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<urlset xmlns="{SITEMAP_NAMESPACE}">\n'
+    root = site_root(site_url, path_prefix)
+    for entry in entries:
+        url = root + url_path(entry.url)
+        yield (
+            f"<url><loc>{url}</loc>"
+            f"<lastmod>{entry_updated(entry)}</lastmod></url>\n"
+        )
+    yield "</urlset>\n"
+
+
+def iter_sitemap_index(
+    urls: Iterable[str], site_url: str, path_prefix: str
+) -> Iterator[str]:
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n'
+    root = site_root(site_url, path_prefix)
+    for url in urls:
+        url = root + url_path(url)
+        yield f"<sitemap><loc>{url}</loc></sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def iter_atom_feed(
+    entries: Sequence[PageEntry],
+    site_url: str,
+    path_prefix: str,
+    title: str,
+    section_url: str,
+    feed_url: str,
+    author: str,
+) -> Iterator[str]:
+    updated = max(
+        (entry_updated(entry) for entry in entries),
+        default=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(0)),
+    )
+    root = site_root(site_url, path_prefix)
+    section = root + url_path(section_url)
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield f'<feed xmlns="{ATOM_NAMESPACE}">\n'
+    yield f"<title>{escape(title)}</title>\n"
+    yield f"<id>{section}</id>\n"
+    yield f'<link href="{section}"/>\n'
+    yield f'<link rel="self" href="{root}{url_path(feed_url)}"/>\n'
+    yield f"<updated>{updated}</updated>\n"
+    yield f"<author><name>{escape(author)}</name></author>\n"
+    for entry in entries:
+        url = root + url_path(entry.url)
+        yield "<entry>"
+        yield f"<title>{escape(entry.title or entry.slug)}</title>"
+        yield f"<id>{url}</id>"
+        yield f'<link href="{url}"/>'
+        yield f"<updated>{entry_updated(entry)}</updated>"
+        if (name := entry_author(entry)) is not None:
+            yield f"<author><name>{escape(name)}</name></author>"
+        for tag in entry.tags:
+            yield f"<category term={quoteattr(tag)}/>"
+        summary = entry.fields.get("summary", entry.fields.get("description"))
+        if isinstance(summary, str):
+            yield f"<summary>{escape(summary)}</summary>"
+        yield "</entry>\n"
+    yield "</feed>\n"
+
+
+def write_chunks(
+    path: Path,
+    chunks: Iterable[str],
+    sink: OutputSink | None = None,
+    manifest: Manifest | None = None,
+) -> None:
+    if manifest is None:
+        with (sink or DiskSink()).open_text(path) as file:
+            file.writelines(chunks)
+        return
+    # An unchanged file on disk keeps its inode and mtime.
+    digest = hashlib.sha256()
+    temporary = temporary_path(path)
+    try:
+        with (
+            sink.open_text(path)
+            if sink is not None
+            else open(temporary, "w", encoding="utf-8")
+        ) as file:
+            for chunk in chunks:
+                digest.update(chunk.encode("utf-8"))
+                _ = file.write(chunk)
+        changed = manifest.record_generated(path, digest.hexdigest())
+        if sink is None and (changed or not path.is_file()):
+            os.replace(temporary, path)
+    finally:
+        temporary.unlink(missing_ok=True)
+
+
+def write_sitemaps(
+    index: SiteIndex,
+    public_dir: Path,
+    site_url: str,
+    path_prefix: str,
+    sink: OutputSink | None = None,
+    manifest: Manifest | None = None,
+) -> list[Path]:
+    entries = sorted(index.pages.values(), key=lambda entry: entry.output)
+    if len(entries) <= SITEMAP_LIMIT:
+        path = public_dir.joinpath("sitemap.xml")
+        write_chunks(
+            path, iter_sitemap(entries, site_url, path_prefix), sink, manifest
+        )
+        return [path]
+    paths: list[Path] = []
+    for number, batch in enumerate(batched(entries, SITEMAP_LIMIT), 1):
+        path = public_dir.joinpath(f"sitemap-{number}.xml")
+        write_chunks(
+            path, iter_sitemap(batch, site_url, path_prefix), sink, manifest
+        )
+        paths.append(path)
+    path = public_dir.joinpath("sitemap.xml")
+    write_chunks(
+        path,
+        iter_sitemap_index(
+            (f"/{sitemap.name}" for sitemap in paths), site_url, path_prefix
+        ),
+        sink,
+        manifest,
+    )
+    return [path] + paths
+
+
+def write_feed(
+    index: SiteIndex,
+    public_dir: Path,
+    site_url: str,
+    path_prefix: str,
+    section: str,
+    limit: int = FEED_LIMIT,
+    sink: OutputSink | None = None,
+    manifest: Manifest | None = None,
+    author: str | None = None,
+) -> Path | None:
+    section = section.strip("/")
+    directory = public_dir.joinpath(section)
+    if not (sink or DiskSink()).is_dir(directory):
+        return None
+    listing = index.pages.get(f"{section}/index.md")
+    title = (
+        listing.title
+        if listing is not None and listing.title is not None
+        else section
+    )
+    path = directory.joinpath("atom.xml")
+    write_chunks(
+        path,
+        iter_atom_feed(
+            index.section(section, limit),
+            site_url,
+            path_prefix,
+            title,
+            f"/{section}/",
+            f"/{section}/atom.xml",
+            # Atom requires a feed author unless every entry has one.
+            author or entry_author(listing) or title,
+        ),
+        sink,
+        manifest,
+    )
+    return path
@@ -0,0 +1,22 @@
+import contextlib
+import tempfile
+import unittest
+from pathlib import Path
+from typing import override
+
+
+class WorkingPath:
+    def __init__(self, *parts: str) -> None:
+        self.parts: tuple[str, ...] = parts
+
+    def __get__(self, _instance: object, _owner: type | None = None) -> Path:
+        return Path(*self.parts).absolute()
+
+
+class WorkingDirectoryTestCase(unittest.TestCase):
+    root: WorkingPath = WorkingPath()
+
+    @override
+    def setUp(self) -> None:
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        _ = self.enterContext(contextlib.chdir(directory))
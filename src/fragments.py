@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable
+
+from blocks import BlockType
+from htmlnode import NodeData
+
+type FragmentKey = tuple[BlockType, str, tuple[tuple[str, str], ...], str]
+# Rendered HTML and the unprefixed, untransformed node data it came from.
+type Fragment = tuple[str, NodeData | None]
+
+
+class FragmentMemo:
+    def __init__(
+        self, max_entries: int = 4096, max_block: int = 2**16
+    ) -> None:
+        self.max_entries: int = max_entries
+        self.max_block: int = max_block
+        self.fragments: OrderedDict[FragmentKey, Fragment] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.saved_bytes: int = 0
+
+    def fragment(
+        self,
+        block: tuple[str, BlockType, dict[str, str]],
+        path_prefix: str | None,
+        render: Callable[[], Fragment],
+    ) -> Fragment:
+        text, block_type, block_props = block
+        # Huge one-off blocks would only push useful fragments out.
+        if len(text) > self.max_block:
+            return render()
+        key = (
+            block_type,
+            text,
+            tuple(block_props.items()),
+            path_prefix or "",
+        )
+        fragment = self.fragments.get(key)
+        if fragment is not None:
+            self.fragments.move_to_end(key)
+            self.hits += 1
+            self.saved_bytes += len(fragment[0])
+            return fragment
+        self.misses += 1
+        fragment = self.fragments[key] = render()
+        if len(self.fragments) > self.max_entries:
+            _ = self.fragments.popitem(last=False)
+        return fragment
+
+    def stats(self) -> tuple[int, int, int]:
+        return self.hits, self.misses, self.saved_bytes
+
+    def add_stats(self, stats: tuple[int, int, int]) -> None:
+        hits, misses, saved_bytes = stats
+        self.hits += hits
+        self.misses += misses
+        self.saved_bytes += saved_bytes
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Fragment memo: {self.hits} hits, {self.misses} misses "
+            f"({self.hit_rate:.1%}), {self.saved_bytes} bytes reused"
+        )
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from itertools import chain
+
+type FrontMatter = dict[str, str | list[str]]
+
+
+def is_fence(line: str) -> bool:
+    return line.rstrip() == "---"
+
+
+def unquote(value: str) -> str:
+    if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def parse_fields(lines: Iterable[str]) -> FrontMatter:
+    fields: FrontMatter = {}
+    key: str | None = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped == "-" or stripped.startswith("- "):
+            if key is not None:
+                if fields.get(key) == "":
+                    fields[key] = []
+                items = fields[key]
+                if isinstance(items, list):
+                    items.append(unquote(stripped[1:].strip()))
+            continue
+        name, separator, value = stripped.partition(":")
+        if not separator:
+            key = None
+            continue
+        key = name.strip()
+        value = value.strip()
+        if value.startswith("[") and value.endswith("]"):
+            fields[key] = [
+                unquote(item.strip())
+                for item in value[1:-1].split(",")
+                if item.strip()
+            ]
+        else:
+            fields[key] = unquote(value)
+    return fields
+
+
+def split_front_matter(text: str) -> tuple[FrontMatter, str]:
+    end = text.find("\n")
+    if end < 0 or not is_fence(text[:end]):
+        return {}, text
+    start = end + 1
+    position = start
+    while position <= len(text):
+        end = text.find("\n", position)
+        if end < 0:
+            end = len(text)
+        if is_fence(text[position:end]):
+            return (
+                parse_fields(text[start:position].split("\n")),
+                text[end + 1 :],
+            )
+        position = end + 1
+    return {}, text
+
+
+def read_front_matter(
+    lines: Iterator[str],
+) -> tuple[FrontMatter, Iterator[str]]:
+    # The line based twin of split_front_matter for streamed sources.
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    if not is_fence(first):
+        return {}, chain((first,), lines)
+    head: list[str] = []
+    for line in lines:
+        if is_fence(line):
+            return parse_fields(head), lines
+        head.append(line)
+    return {}, chain((first,), head)
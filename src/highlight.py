@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import OrderedDict
+from html import escape
+
+from htmlnode import HTMLNode
+
+TOKEN_CLASSES = {
+    "comment": "hljs-comment",
+    "meta": "hljs-meta",
+    "attr": "hljs-attr",
+    "string": "hljs-string",
+    "variable": "hljs-variable",
+    "keyword": "hljs-keyword",
+    "literal": "hljs-literal",
+    "builtin": "hljs-built_in",
+    "type": "hljs-type",
+    "title": "hljs-title function_",
+    "selector": "hljs-selector-class",
+    "number": "hljs-number",
+}
+
+
+def words(text: str) -> str:
+    return r"\b(?:" + "|".join(text.split()) + r")\b"
+
+
+def grammar(**rules: str) -> re.Pattern[str]:
+    return re.compile(
+        "|".join(
+            f"(?P<{name}>{rules[name]})"
+            for name in TOKEN_CLASSES
+            if name in rules
+        ),
+        re.MULTILINE,
+    )
+
+
+DOUBLE_STRING = r'"(?:[^"\\\n]|\\.)*"'
+SINGLE_STRING = r"'(?:[^'\\\n]|\\.)*'"
+C_COMMENT = r"//[^\n]*|/\*[\s\S]*?\*/"
+C_NUMBER = (
+    r"\b(?:0[xX][\da-fA-F_]+|0[bB][01_]+|\d[\d_]*(?:\.[\d_]*)?"
+    r"(?:[eE][+-]?\d+)?)[a-zA-Z]*\b"
+)
+
+PYTHON = grammar(
+    comment=r"#[^\n]*",
+    meta=r"@[\w.]+",
+    string=(
+        r"\b[rRbBuUfF]{0,2}(?:\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|"
+        + DOUBLE_STRING
+        + "|"
+        + SINGLE_STRING
+        + ")"
+    ),
+    keyword=words(
+        (
+            "and as assert async await break class continue def del elif else "
+            "except finally for from global if import in is lambda nonlocal "
+            "not or pass raise return try while with yield match case"
+        )
+    ),
+    literal=words("True False None"),
+    builtin=words(
+        (
+            "print len range open int str float bool list dict set tuple "
+            "isinstance enumerate zip map filter sorted super type object "
+            "Exception ValueError TypeError KeyError self"
+        )
+    ),
+    title=r"(?<=\bdef )\w+|(?<=\bclass )\w+",
+    number=(
+        r"\b(?:0[xX][\da-fA-F_]+|0[bB][01_]+|0[oO][0-7_]+|"
+        r"\d[\d_]*(?:\.[\d_]*)?(?:[eE][+-]?\d+)?j?)\b"
+    ),
+)
+JAVASCRIPT = grammar(
+    comment=C_COMMENT,
+    string=DOUBLE_STRING + "|" + SINGLE_STRING + r"|`(?:[^`\\]|\\.)*`",
+    keyword=words(
+        (
+            "async await break case catch class const continue debugger "
+            "default delete do else export extends finally for from function "
+            "if import in instanceof interface let new of return static "
+            "switch throw try type typeof var void while with yield"
+        )
+    ),
+    literal=words("true false null undefined NaN Infinity this"),
+    builtin=words(
+        (
+            "console window document Math JSON Promise Object Array String "
+            "Number Boolean Map Set Error RegExp Date"
+        )
+    ),
+    title=r"(?<=\bfunction )\w+|(?<=\bclass )\w+",
+    number=C_NUMBER,
+)
+JSON = grammar(
+    attr=DOUBLE_STRING + r"(?=\s*:)",
+    string=DOUBLE_STRING,
+    literal=words("true false null"),
+    number=r"-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b",
+)
+BASH = grammar(
+    meta=r"\A#![^\n]*",
+    comment=r"(?<![\w$])#[^\n]*",
+    string=DOUBLE_STRING + "|" + r"'[^']*'",
+    variable=r"\$(?:\{[^}\n]*\}|\w+|[@*#?$!-])",
+    keyword=words(
+        (
+            "if then else elif fi for while until do done case esac function "
+            "in return local export select"
+        )
+    ),
+    builtin=words(
+        (
+            "echo cd ls cat grep sed awk printf read source exit set unset "
+            "test mkdir rm cp mv pwd"
+        )
+    ),
+    number=r"\b\d+\b",
+)
+CSS = grammar(
+    comment=r"/\*[\s\S]*?\*/",
+    string=DOUBLE_STRING + "|" + SINGLE_STRING,
+    keyword=r"@[\w-]+|!important",
+    attr=r"[\w-]+(?=\s*:[^:{};]*[;}])",
+    selector=r"\.[a-zA-Z_][\w-]*",
+    number=r"#[\da-fA-F]{3,8}\b|-?\b\d+(?:\.\d+)?(?:%|[a-z]+)?",
+)
+GO = grammar(
+    comment=C_COMMENT,
+    string=DOUBLE_STRING + r"|`[^`]*`|'(?:[^'\\\n]|\\.)*'",
+    keyword=words(
+        (
+            "break case chan const continue default defer else fallthrough "
+            "for func go goto if import interface map package range return "
+            "select struct switch type var"
+        )
+    ),
+    literal=words("true false nil iota"),
+    builtin=words(
+        (
+            "append cap close complex copy delete imag len make new panic "
+            "print println real recover"
+        )
+    ),
+    type=words(
+        (
+            "bool byte error float32 float64 int int8 int16 int32 int64 rune "
+            "string uint uint8 uint16 uint32 uint64 uintptr any"
+        )
+    ),
+    title=r"(?<=\bfunc )\w+",
+    number=C_NUMBER,
+)
+RUST = grammar(
+    comment=C_COMMENT,
+    meta=r"#!?\[[^\]\n]*\]",
+    string=DOUBLE_STRING,
+    keyword=words(
+        (
+            "as async await break const continue crate dyn else enum extern "
+            "fn for if impl in let loop match mod move mut pub ref return "
+            "self Self static struct super trait type unsafe use where while"
+        )
+    ),
+    literal=words("true false None Some Ok Err"),
+    builtin=r"\b\w+!",
+    type=words(
+        (
+            "i8 i16 i32 i64 i128 isize u8 u16 u32 u64 u128 usize f32 f64 bool "
+            "char str String Vec Option Result Box"
+        )
+    ),
+    title=r"(?<=\bfn )\w+",
+    number=C_NUMBER,
+)
+C = grammar(
+    comment=C_COMMENT,
+    meta=r"^[^\S\n]*#[^\n]*",
+    string=DOUBLE_STRING + "|" + SINGLE_STRING,
+    keyword=words(
+        (
+            "break case catch class const continue default delete do else "
+            "enum extends final finally for goto if implements import new "
+            "namespace package private protected public return sizeof static "
+            "struct switch template this throw throws try typedef union using "
+            "virtual volatile while"
+        )
+    ),
+    literal=words("true false null nullptr NULL"),
+    type=words(
+        (
+            "auto bool char double float int long short signed unsigned void "
+            "boolean byte String size_t"
+        )
+    ),
+    number=C_NUMBER,
+)
+
+LANGUAGES: dict[str, re.Pattern[str]] = {
+    "python": PYTHON,
+    "py": PYTHON,
+    "javascript": JAVASCRIPT,
+    "js": JAVASCRIPT,
+    "typescript": JAVASCRIPT,
+    "ts": JAVASCRIPT,
+    "json": JSON,
+    "bash": BASH,
+    "sh": BASH,
+    "shell": BASH,
+    "css": CSS,
+    "go": GO,
+    "rust": RUST,
+    "rs": RUST,
+    "c": C,
+    "cpp": C,
+    "c++": C,
+    "java": C,
+}
+
+
+def tokenize(code: str, language: re.Pattern[str]) -> str:
+    string_builder: list[str] = []
+    next_start = 0
+    for token in language.finditer(code):
+        if token.start() == token.end() or token.lastgroup is None:
+            continue
+        string_builder.append(escape(code[next_start : token.start()], False))
+        string_builder.append(
+            (
+                f'<span class="{TOKEN_CLASSES[token.lastgroup]}">'
+                f"{escape(token.group(), False)}</span>"
+            )
+        )
+        next_start = token.end()
+    string_builder.append(escape(code[next_start:], False))
+    return "".join(string_builder)
+
+
+def code_language(props: dict[str, str]) -> str | None:
+    if "class" not in props:
+        return None
+    for name in props["class"].split():
+        if name.startswith("language-"):
+            return name[len("language-") :].lower()
+    return None
+
+
+class Highlighter:
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries: int = max_entries
+        self.fragments: OrderedDict[tuple[str, bytes], str] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def highlight(self, code: str, language: str) -> str | None:
+        grammar = LANGUAGES.get(language)
+        if grammar is None:
+            return None
+        key = (
+            language,
+            hashlib.blake2b(code.encode(), digest_size=16).digest(),
+        )
+        fragment = self.fragments.get(key)
+        if fragment is not None:
+            self.fragments.move_to_end(key)
+            self.hits += 1
+            return fragment
+        self.misses += 1
+        fragment = self.fragments[key] = tokenize(code, grammar)
+        if len(self.fragments) > self.max_entries:
+            _ = self.fragments.popitem(last=False)
+        return fragment
+
+    def stats(self) -> tuple[int, int]:
+        return self.hits, self.misses
+
+    def add_stats(self, stats: tuple[int, int]) -> None:
+        hits, misses = stats
+        self.hits += hits
+        self.misses += misses
+
+    def highlight_node(self, node: HTMLNode) -> None:
+        if node.tag != "pre":
+            return
+        for child in node.children:
+            if child.tag != "code" or child.value is None:
+                continue
+            language = code_language(child.props)
+            if language is None:
+                continue
+            fragment = self.highlight(child.value, language)
+            if fragment is None:
+                continue
+            child.value = fragment
+            child.props = {
+                **child.props,
+                "class": f"hljs {child.props['class']}",
+                "data-highlighted": "yes",
+            }
+
+    def highlight_tree(self, node: HTMLNode) -> None:
+        for child in node.children:
+            self.highlight_node(child)
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
-from typing import override
+from collections.abc import Iterator, Sequence
+from typing import TextIO, override
+
+type NodeData = tuple[
+    str | None, str | list[NodeData] | None, dict[str, str] | None
+]
 
 
 class HTMLNode:
+    __slots__: tuple[str, ...] = ("tag", "value", "_children", "_props")
+
     def __init__(
         self,
         tag: str | None = None,
@@ -14,21 +20,49 @@ class HTMLNode:
     ) -> None:
         self.tag: str | None = tag
         self.value: str | None = value
-        self.children: Sequence[HTMLNode] = (
-            children if children is not None else []
-        )
-        self.props: dict[str, str] | None = props if props is not None else {}
+        self._children: Sequence[HTMLNode] | None = children
+        self._props: dict[str, str] | None = props
+
+    @property
+    def children(self) -> Sequence[HTMLNode]:
+        if self._children is None:
+            self._children = []
+        return self._children
+
+    @children.setter
+    def children(self, children: Sequence[HTMLNode]) -> None:
+        self._children = children
+
+    @property
+    def props(self) -> dict[str, str]:
+        if self._props is None:
+            self._props = {}
+        return self._props
+
+    @props.setter
+    def props(self, props: dict[str, str]) -> None:
+        self._props = props
 
     def to_html(self) -> str:
         raise NotImplementedError()
 
+    def iter_html(self) -> Iterator[str]:
+        raise NotImplementedError()
+
+    def to_data(self) -> NodeData:
+        raise NotImplementedError()
+
+    def prefix_links(self, _path_prefix: str) -> None:
+        raise NotImplementedError()
+
+    def write_html(self, stream: TextIO) -> None:
+        for chunk in self.iter_html():
+            _ = stream.write(chunk)
+
     def props_to_html(self) -> str:
-        if self.props is None:
+        if not self._props:
             return ""
-        return_string = ""
-        for k, v in self.props.items():
-            return_string += f' {k}="{v}"'
-        return return_string
+        return "".join(f' {k}="{v}"' for k, v in self._props.items())
 
     @override
     def __repr__(self) -> str:
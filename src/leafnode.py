@@ -1,9 +1,13 @@
+from collections.abc import Iterator
 from typing import override
 
-from htmlnode import HTMLNode
+from htmlnode import HTMLNode, NodeData
+from links import rewrite_url
 
 
 class LeafNode(HTMLNode):
+    __slots__: tuple[str, ...] = ()
+
     def __init__(
         self,
         tag: str | None,
@@ -28,6 +32,41 @@ class LeafNode(HTMLNode):
                 f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
             )
 
+    @override
+    def iter_html(self) -> Iterator[str]:
+        if self.tag is None:
+            if self.value is None:
+                raise ValueError(
+                    "Expected LeafNode tag or value to not be None"
+                )
+            yield self.value
+        elif self.value is None:
+            yield f"<{self.tag}{self.props_to_html()}>"
+        else:
+            yield f"<{self.tag}{self.props_to_html()}>"
+            yield self.value
+            yield f"</{self.tag}>"
+
+    @override
+    def to_data(self) -> NodeData:
+        return (self.tag, self.value, self._props)
+
+    @override
+    def prefix_links(self, path_prefix: str) -> None:
+        if self._props is None:
+            return
+        # Replace rather than mutate: to_data() shares props with cached trees.
+        if self.tag == "a" and "href" in self._props:
+            self._props: dict[str, str] | None = {
+                **self._props,
+                "href": rewrite_url(self._props["href"], path_prefix),
+            }
+        elif self.tag == "img" and "src" in self._props:
+            self._props = {
+                **self._props,
+                "src": rewrite_url(self._props["src"], path_prefix),
+            }
+
     @override
     def __repr__(self) -> str:
         return f"LeafNode({repr(self.tag)}, {repr(self.value)}, {repr(self.props)})"
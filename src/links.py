@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import lru_cache
+
+import patterns
+
+
+def path_parts(path: str) -> list[str]:
+    return [part for part in path.split("/") if part and part != "."]
+
+
+@lru_cache(maxsize=16384)
+def rewrite_url(url: str, path_prefix: str) -> str:
+    # Same result as joining "/", the prefix and the url relative to "/"
+    # with pathlib, which leaves relative, external and "//host" urls alone.
+    if not url.startswith("/") or (
+        url.startswith("//") and not url.startswith("///")
+    ):
+        return url
+    root = (
+        "//"
+        if path_prefix.startswith("//") and not path_prefix.startswith("///")
+        else "/"
+    )
+    return root + "/".join(path_parts(path_prefix) + path_parts(url))
+
+
+def replace_links(html: str, replace: Callable[[str], str]) -> str:
+    string_builder: list[str] = []
+    next_start = 0
+    for link in patterns.LINK_ATTRIBUTE.finditer(html):
+        string_builder.append(html[next_start : link.start()])
+        url = replace(link.group("link"))
+        string_builder.append(f'{link.group("type")}="{url}"')
+        next_start = link.end()
+    string_builder.append(html[next_start:])
+    return "".join(string_builder)
+
+
+def rewrite_links(html: str, path_prefix: str) -> str:
+    return replace_links(html, lambda url: rewrite_url(url, path_prefix))
+
+
+def page_reference(url: str) -> str | None:
+    if not url.startswith("/") or url.startswith("//"):
+        return None
+    parts = path_parts(url.partition("#")[0].partition("?")[0])
+    if not parts or "." not in parts[-1]:
+        parts.append("index.html")
+    elif not parts[-1].endswith(".html"):
+        return None
+    return "/".join(parts)
+
+
+def page_references(markdown: str) -> set[str]:
+    references: set[str] = set()
+    for link in patterns.IMAGE_OR_LINK.finditer(markdown):
+        if link.group("type"):
+            continue
+        reference = page_reference(link.group("url"))
+        if reference is not None:
+            references.add(reference)
+    return references
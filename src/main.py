@@ -1,59 +1,55 @@
-import re
-import shutil
-import sys
+import argparse
+import os
+import traceback
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, replace
+from functools import partial
+from itertools import groupby
 from pathlib import Path
-from typing import Callable
 
 import blocks
+from feeds import write_feed, write_sitemaps
+from fragments import FragmentMemo
+from frontmatter import read_front_matter, split_front_matter
+from highlight import Highlighter
+from htmlnode import HTMLNode
+from links import page_references
+from manifest import Manifest, stream_text_digest, text_digest
 from parentnode import ParentNode
+from parsecache import ParseCache
+from planner import Task, TaskType, plan_build
+from postbuild import ENCODINGS, PostBuild
+from profiler import BuildProfile, PageProfile, clock, count_nodes
+from search import SearchIndex, TermCollector
+from sinks import ArchiveSink, DiskSink, MemorySink, OutputSink
+from siteindex import SiteIndex
+from sync import LINK_MODES, AssetSync
+from template import Template
 
+STREAM_THRESHOLD = 64 * 2**20
 
-def recursively_act(
-    action: Callable[[Path, Path | None, tuple[object, ...] | None], None],
-    logger: Callable[
-        [Path, Path | None, Exception | None, tuple[object, ...] | None], None
-    ],
-    source: Path,
-    destination: Path | None,
-    action_first: bool,
-    payload: tuple[object, ...] | None = None,
-) -> None:
-    if source.exists():
-        if action_first:
-            if destination is None or destination.parent.exists():
-                try:
-                    action(source, destination, payload)
-                    logger(source, destination, None, payload)
-                except Exception as e:
-                    logger(source, destination, e, payload)
-
-        if source.is_dir():
-            for next_source in source.iterdir():
-                next_destination = (
-                    destination.joinpath(next_source.name)
-                    if destination is not None
-                    else None
-                )
-                recursively_act(
-                    action,
-                    logger,
-                    next_source,
-                    next_destination,
-                    action_first,
-                    payload,
-                )
 
-        if not action_first:
-            if destination is None or destination.parent.exists():
-                try:
-                    action(source, destination, payload)
-                    logger(source, destination, None, payload)
-                except Exception as e:
-                    logger(source, destination, e, payload)
+@dataclass
+class BuildContext:
+    path_prefix: str
+    template: Template
+    manifest: Manifest | None = None
+    profiler: BuildProfile | None = None
+    cache: ParseCache | None = None
+    stream_threshold: int = STREAM_THRESHOLD
+    highlighter: Highlighter | None = None
+    sink: OutputSink | None = None
+    memo: FragmentMemo | None = None
+    search: SearchIndex | None = None
+    site_url: str | None = None
+    feed_section: str = "blog"
+    feed_author: str | None = None
 
 
 def delete_action(
-    source: Path, _destination: Path | None, _payload: tuple[object, ...] | None
+    source: Path, _destination: Path | None, _context: BuildContext | None
 ) -> None:
     if source.is_file():
         source.unlink()
@@ -61,99 +57,347 @@ def delete_action(
         source.rmdir()
 
 
-def copy_action(
-    source: Path, destination: Path | None, _payload: tuple[object, ...] | None
-) -> None:
-    if destination is None:
-        raise ValueError("Cannot copy to a destination of None")
-
-    if source.is_file():
-        _ = shutil.copy(source, destination)
-    else:
-        destination.mkdir()
-
-
 def delete_logger(
     source: Path,
     _destination: Path | None,
     exception: Exception | None,
-    _payload: tuple[object, ...] | None,
+    _context: BuildContext | None,
 ) -> None:
     if exception is None:
         print(f"Deleting {source}")
     else:
         print(f"Attempted to delete {source} but encountered an exception")
-        print(exception.__traceback__)
+        traceback.print_exception(exception)
+
+
+def block_transform(
+    highlighter: Highlighter | None, collector: TermCollector | None
+) -> Callable[[HTMLNode], None] | None:
+    if collector is None:
+        return highlighter.highlight_node if highlighter is not None else None
+    if highlighter is None:
+        return collector.add_node
 
+    def transform(node: HTMLNode) -> None:
+        # Index the text before highlighting splits code into spans.
+        collector.add_node(node)
+        highlighter.highlight_node(node)
 
-def copy_logger(
+    return transform
+
+
+def iter_page(
+    markdown: str,
+    template: Template,
+    path_prefix: str,
+    profile: PageProfile | None = None,
+    cache: ParseCache | None = None,
+    highlighter: Highlighter | None = None,
+    memo: FragmentMemo | None = None,
+    collector: TermCollector | None = None,
+) -> Iterator[str]:
+    start = clock()
+    fields, markdown = split_front_matter(markdown)
+    content: HTMLNode | Iterator[str]
+    if cache is not None and (memo is None or collector is not None):
+        content, document = cache.parse(markdown, path_prefix)
+    elif cache is not None and (
+        loaded := cache.load(markdown, path_prefix)
+    ) is not None:
+        content, document = loaded
+    elif memo is not None and collector is None:
+        document = blocks.parse_document(markdown)
+        transform = (
+            highlighter.highlight_node if highlighter is not None else None
+        )
+        content = (
+            ParentNode.iter_blocks_html(
+                document.blocks, None, path_prefix, transform, memo
+            )
+            if cache is None
+            else cache.iter_html(
+                markdown, document, path_prefix, transform, memo
+            )
+        )
+    else:
+        # Indexed pages skip the memo, whose hits never build the nodes
+        # the search index reads its text from.
+        document = blocks.parse_document(markdown)
+        content = ParentNode.from_blocks(document.blocks, None, path_prefix)
+    if collector is not None and isinstance(content, HTMLNode):
+        collector.add_tree(content)
+    if highlighter is not None and isinstance(content, HTMLNode):
+        highlighter.highlight_tree(content)
+    title = fields.get("title")
+    if not isinstance(title, str):
+        title = document.title
+    if title is None:
+        raise ValueError(
+            "Markdown is required to have an h1 heading (single #) as a title."
+        )
+    chunks = template.iter_render({"Title": title, "Content": content})
+    if profile is None:
+        yield from chunks
+        return
+    profile.add("parse", start)
+    if isinstance(content, HTMLNode):
+        profile.nodes = count_nodes(content)
+    yield from timed_chunks(chunks, profile)
+
+
+def iter_streamed_page(
     source: Path,
-    destination: Path | None,
-    exception: Exception | None,
-    _payload: tuple[object, ...] | None,
-) -> None:
-    if exception is None:
-        print(f"Copying from {source} to {destination}")
+    template: Template,
+    path_prefix: str,
+    profile: PageProfile | None = None,
+    references: set[str] | None = None,
+    highlighter: Highlighter | None = None,
+    memo: FragmentMemo | None = None,
+    collector: TermCollector | None = None,
+) -> Iterator[str]:
+    start = clock()
+    with open(source, "r", encoding="utf-8") as file:
+        fields, lines = read_front_matter(blocks.iter_lines(file))
+        title = fields.get("title")
+        if not isinstance(title, str):
+            title = blocks.find_title(lines)
+        if title is None:
+            raise ValueError(
+                "Markdown is required to have an h1 heading (single #) as a title."
+            )
+        _ = file.seek(0)
+        _, lines = read_front_matter(blocks.iter_lines(file))
+        if references is not None:
+            lines = scan_references(lines, references)
+        content = ParentNode.iter_blocks_html(
+            blocks.tokenize_blocks(lines),
+            None,
+            path_prefix,
+            block_transform(highlighter, collector),
+            memo if collector is None else None,
+        )
+        chunks = template.iter_render({"Title": title, "Content": content})
+        if profile is None:
+            yield from chunks
+            return
+        profile.add("parse", start)
+        yield from timed_chunks(chunks, profile)
+
+
+def scan_references(
+    lines: Iterator[str], references: set[str]
+) -> Iterator[str]:
+    for line in lines:
+        references.update(page_references(line))
+        yield line
+
+
+def timed_chunks(chunks: Iterator[str], profile: PageProfile) -> Iterator[str]:
+    while True:
+        start = clock()
+        chunk = next(chunks, None)
+        profile.add("render", start)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def write_page(
+    source: Path,
+    destination: Path,
+    path_prefix: str,
+    template: Template,
+    previous_digest: str | None,
+    profile: PageProfile | None = None,
+    cache: ParseCache | None = None,
+    stream_threshold: int = STREAM_THRESHOLD,
+    highlighter: Highlighter | None = None,
+    sink: OutputSink | None = None,
+    memo: FragmentMemo | None = None,
+    collector: TermCollector | None = None,
+) -> tuple[str, bool, set[str]]:
+    if sink is None:
+        sink = DiskSink()
+    start = clock()
+    if os.stat(source).st_size > stream_threshold:
+        markdown = None
+        digest = stream_text_digest(source)
     else:
-        print(
-            f"Attempted to copy from {source} to {destination} but encountered an exception"
+        with open(source, "r", encoding="utf-8") as file:
+            markdown = file.read()
+        digest = text_digest(markdown)
+    if profile is not None:
+        profile.add("read", start)
+    if digest == previous_digest and destination.is_file():
+        if profile is not None:
+            profile.skipped = True
+        return digest, True, set()
+    if collector is not None and collector.indexed_digest == digest:
+        # Re-rendered for another reason; the index has this text already.
+        collector = None
+    if markdown is not None:
+        references = page_references(markdown)
+        chunks = iter_page(
+            markdown,
+            template,
+            path_prefix,
+            profile,
+            cache,
+            highlighter,
+            memo,
+            collector,
+        )
+    else:
+        references: set[str] = set()
+        chunks = iter_streamed_page(
+            source,
+            template,
+            path_prefix,
+            profile,
+            references,
+            highlighter,
+            memo,
+            collector,
+        )
+    # Parse and check the title before the destination is truncated.
+    first_chunk = next(chunks)
+    with sink.open_text(destination) as file:
+        if profile is None:
+            _ = file.write(first_chunk)
+            file.writelines(chunks)
+        else:
+            start = clock()
+            _ = file.write(first_chunk)
+            profile.add("write", start)
+            for chunk in chunks:
+                start = clock()
+                _ = file.write(chunk)
+                profile.add("write", start)
+            start = clock()
+            file.flush()
+            profile.add("write", start)
+    if profile is not None:
+        profile.bytes = sink.size(destination)
+    return digest, False, references
+
+
+def write_page_job(
+    context: BuildContext,
+    profiling: bool,
+    job: tuple[Path, Path, str | None, TermCollector | None],
+) -> tuple[
+    tuple[str, bool, set[str]] | Exception,
+    PageProfile | None,
+    TermCollector | None,
+    tuple[int, int, int] | None,
+    tuple[int, int] | None,
+]:
+    source, destination, previous_digest, collector = job
+    profile = PageProfile(source) if profiling else None
+    memo = context.memo
+    hits, misses, saved_bytes = (
+        memo.stats() if memo is not None else (0, 0, 0)
+    )
+    highlighter = context.highlighter
+    highlighted, unhighlighted = (
+        highlighter.stats() if highlighter is not None else (0, 0)
+    )
+    try:
+        result = write_page(
+            source,
+            destination,
+            context.path_prefix,
+            context.template,
+            previous_digest,
+            profile,
+            context.cache,
+            context.stream_threshold,
+            context.highlighter,
+            None,
+            context.memo,
+            collector,
         )
-        print(exception.__traceback__)
+    except Exception as e:
+        return e, None, None, None, None
+    # The parent's memo and highlighter never see worker lookups, so
+    # report them back.
+    return (
+        result,
+        profile,
+        collector,
+        (
+            (
+                memo.hits - hits,
+                memo.misses - misses,
+                memo.saved_bytes - saved_bytes,
+            )
+            if memo is not None
+            else None
+        ),
+        (
+            (
+                highlighter.hits - highlighted,
+                highlighter.misses - unhighlighted,
+            )
+            if highlighter is not None
+            else None
+        ),
+    )
 
 
 def generate_page_action(
-    source: Path, destination: Path | None, payload: tuple[object, ...] | None
+    source: Path, destination: Path | None, context: BuildContext | None
 ) -> None:
     if destination is None:
         raise ValueError("Cannot copy to a destination of None")
-    if payload is None or len(payload) == 0:
-        payload = ("",)
-
     if source.is_dir():
-        destination.mkdir(exist_ok=True)
-    else:
-        with open(source, "r", encoding="utf-8") as file:
-            markdown = file.read()
-        with open("template.html", "r", encoding="utf-8") as file:
-            template = file.read()
-        content = ParentNode.from_markdown(markdown).to_html()
-        title = blocks.extract_title(markdown)
-        if title is None:
-            raise ValueError(
-                "Markdown is required to have an h1 heading (single #) as a title."
-            )
-        html = template.replace("{{ Title }}", title).replace(
-            "{{ Content }}", content
-        )
-        string_builder: list[str] = []
-        next_start = 0
-        for link in re.finditer(
-            r"(?P<type>(?:href)|(?:src))[^\S\r\n]*=[^\S\r\n]*\"(?P<link>[^\"]*)\"",
-            html,
-        ):
-            string_builder.append(html[next_start : link.start()])
-            try:
-                new_path = Path("/").joinpath(
-                    Path(str(payload[0])).joinpath(
-                        Path(link.group("link")).relative_to("/")
-                    )
-                )
-                string_builder.append(f'{link.group("type")}="{new_path}"')
-            except Exception:
-                string_builder.append(html[link.start() : link.end()])
-            next_start = link.end()
-        string_builder.append(html[next_start:])
-        html = "".join(string_builder)
-        destination = destination.with_suffix(".html")
-        with open(destination, "w", encoding="utf-8") as file:
-            _ = file.write(html)
+        if context is None or context.sink is None:
+            destination.mkdir(exist_ok=True)
+        return
+    if context is None:
+        context = BuildContext("", Template.load(Path("template.html"), ""))
+    render_page_action(source, destination.with_suffix(".html"), context)
+
+
+def render_page_action(
+    source: Path, destination: Path, context: BuildContext
+) -> None:
+    manifest = context.manifest
+    profiler = context.profiler
+    search = context.search
+    profile = PageProfile(source) if profiler is not None else None
+    collector = search.collector(destination) if search is not None else None
+    digest, skipped, references = write_page(
+        source,
+        destination,
+        context.path_prefix,
+        context.template,
+        (
+            manifest.previous_digest(destination, True)
+            if manifest is not None
+            else None
+        ),
+        profile,
+        context.cache,
+        context.stream_threshold,
+        context.highlighter,
+        context.sink,
+        context.memo,
+        collector,
+    )
+    if profiler is not None and profile is not None:
+        profiler.add_page(profile)
+    if manifest is not None:
+        manifest.record(destination, digest, True, skipped, references)
+    if search is not None and collector is not None and not skipped:
+        search.record(destination, digest, collector.terms)
 
 
 def generate_page_logger(
     source: Path,
     destination: Path | None,
     exception: Exception | None,
-    _payload: tuple[object, ...] | None,
+    context: BuildContext | None,
 ) -> None:
     if source.is_dir():
         if exception is None:
@@ -162,48 +406,587 @@ def generate_page_logger(
             print(
                 f"Attempted to create directory mirroring {source} at {destination} using template.html but encountered an exception"
             )
-            print(exception.__traceback__)
+            traceback.print_exception(exception)
     else:
-        if destination is not None:
-            destination = destination.with_suffix(".html")
-        if exception is None:
-            print(
-                f"Generated page from {source} to {destination} using template.html"
+        render_page_logger(
+            source,
+            (
+                destination.with_suffix(".html")
+                if destination is not None
+                else None
+            ),
+            exception,
+            context,
+        )
+
+
+def render_page_logger(
+    source: Path,
+    destination: Path | None,
+    exception: Exception | None,
+    context: BuildContext | None,
+) -> None:
+    manifest = context.manifest if context is not None else None
+    if (
+        exception is None
+        and destination is not None
+        and manifest is not None
+        and manifest.was_skipped(destination)
+    ):
+        print(f"Skipping unchanged {destination}")
+    elif exception is None:
+        print(
+            f"Generated page from {source} to {destination} using template.html"
+        )
+        if (
+            destination is not None
+            and manifest is not None
+            and manifest.explain
+        ):
+            for reason in manifest.rebuild_reasons(destination):
+                print(f"  because {reason}")
+    else:
+        print(
+            f"Attempted to generate page from {source} to {destination} using template.html but encountered an exception"
+        )
+        traceback.print_exception(exception)
+
+
+def render_pages_parallel(
+    pages: list[tuple[Path, Path]],
+    context: BuildContext,
+    jobs: int,
+) -> None:
+    manifest = context.manifest
+    profiler = context.profiler
+    search = context.search
+    page_jobs = [
+        (
+            source,
+            destination,
+            (
+                manifest.previous_digest(destination, True)
+                if manifest is not None
+                else None
+            ),
+            search.collector(destination) if search is not None else None,
+        )
+        for source, destination in pages
+    ]
+    # Workers write straight to disk and report back everything the
+    # parent records, so only the rendering state is sent to them.
+    worker_context = replace(
+        context, manifest=None, profiler=None, sink=None, search=None
+    )
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(
+            partial(write_page_job, worker_context, profiler is not None),
+            page_jobs,
+            chunksize=max(1, len(page_jobs) // (jobs * 4)),
+        )
+        for (source, destination), (
+            result,
+            profile,
+            collector,
+            memo_stats,
+            highlight_stats,
+        ) in zip(pages, results):
+            if context.memo is not None and memo_stats is not None:
+                context.memo.add_stats(memo_stats)
+            if (
+                context.highlighter is not None
+                and highlight_stats is not None
+            ):
+                context.highlighter.add_stats(highlight_stats)
+            if isinstance(result, Exception):
+                render_page_logger(source, destination, result, context)
+                continue
+            digest, skipped, references = result
+            if manifest is not None:
+                manifest.record(
+                    destination, digest, True, skipped, references
+                )
+            if search is not None and collector is not None and not skipped:
+                search.record(destination, digest, collector.terms)
+            if profiler is not None and profile is not None:
+                profiler.add_page(profile)
+            render_page_logger(source, destination, None, context)
+
+
+TASK_PHASES = {
+    TaskType.DELETE: "delete",
+    TaskType.RMDIR: "delete",
+    TaskType.MKDIR: "mkdir",
+    TaskType.COPY: "copy",
+    TaskType.RENDER: "render",
+}
+
+
+def profile_phase(
+    profiler: BuildProfile | None, name: str
+) -> AbstractContextManager[None]:
+    return profiler.phase(name) if profiler is not None else nullcontext()
+
+
+def execute_task(
+    task: Task, context: BuildContext, assets: AssetSync
+) -> None:
+    destination = Path(task.destination)
+    if task.task_type is not TaskType.RENDER:
+        assets.run(task)
+        return
+    source = Path(str(task.source))
+    try:
+        render_page_action(source, destination, context)
+        render_page_logger(source, destination, None, context)
+    except Exception as e:
+        render_page_logger(source, destination, e, context)
+
+
+def execute_plan(
+    plan: list[Task],
+    context: BuildContext,
+    assets: AssetSync,
+    jobs: int = 1,
+) -> None:
+    for phase, group in groupby(
+        plan, key=lambda task: TASK_PHASES[task.task_type]
+    ):
+        with profile_phase(context.profiler, phase):
+            if phase == "render" and jobs > 1:
+                render_pages_parallel(
+                    [
+                        (Path(str(task.source)), Path(task.destination))
+                        for task in group
+                    ],
+                    context,
+                    jobs,
+                )
+            else:
+                for task in group:
+                    execute_task(task, context, assets)
+
+
+def write_site_outputs(
+    context: BuildContext, index: SiteIndex, public_dir: Path
+) -> list[Path]:
+    manifest = context.manifest
+    profiler = context.profiler
+    sink = context.sink
+    search = context.search
+    generated: list[Path] = []
+    if context.site_url is not None:
+        with profile_phase(profiler, "feeds"):
+            for path in write_sitemaps(
+                index,
+                public_dir,
+                context.site_url,
+                context.path_prefix,
+                sink,
+                manifest,
+            ):
+                print(f"Generated sitemap {path}")
+                generated.append(path)
+            feed = write_feed(
+                index,
+                public_dir,
+                context.site_url,
+                context.path_prefix,
+                context.feed_section,
+                sink=sink,
+                manifest=manifest,
+                author=context.feed_author,
             )
-        else:
-            print(
-                f"Attempted to generate page from {source} to {destination} using template.html but encountered an exception"
+            if feed is not None:
+                print(f"Generated feed {feed}")
+                generated.append(feed)
+    if sink is None and manifest is not None:
+        for path in manifest.stale_generated():
+            path.unlink(missing_ok=True)
+    if search is not None:
+        with profile_phase(profiler, "search"):
+            if manifest is not None:
+                search.prune(manifest.pages)
+            paths = search.write(index, sink)
+            if sink is None:
+                search.save()
+        generated.extend(paths)
+        print(
+            (
+                f"Indexed {search.indexed_count} changed pages for search, "
+                f"wrote {search.written_count} of {len(paths)} index files"
             )
-            print(exception.__traceback__)
+        )
+        search.indexed_count = 0
+    return generated
 
 
-def content_generation(path_prefix: str | None, destination: str) -> None:
+def content_generation(
+    path_prefix: str | None,
+    destination: str,
+    *,
+    incremental: bool = False,
+    jobs: int = 1,
+    profiler: BuildProfile | None = None,
+    link_mode: str = "copy",
+    checksum: bool = False,
+    cache: ParseCache | None = None,
+    stream_threshold: int = STREAM_THRESHOLD,
+    site_url: str | None = None,
+    feed_section: str = "blog",
+    feed_author: str | None = None,
+    explain: bool = False,
+    highlighter: Highlighter | None = None,
+    fingerprint: bool = False,
+    precompress: bool = False,
+    sink: OutputSink | None = None,
+    memo: FragmentMemo | None = None,
+    search: bool = False,
+) -> tuple[BuildContext, SiteIndex]:
+    if sink is not None:
+        if fingerprint or precompress:
+            raise ValueError(
+                "Fingerprinting and precompression need a directory output"
+            )
+        # Worker processes cannot write into the parent's sink, and nothing
+        # from a previous build is there to reuse.
+        incremental = False
+        jobs = 1
     static_dir = Path("static").absolute()
     public_dir = Path(destination).absolute()
     content_dir = Path("content").absolute()
-    recursively_act(delete_action, delete_logger, public_dir, None, False)
-    recursively_act(copy_action, copy_logger, static_dir, public_dir, True)
-    recursively_act(
-        generate_page_action,
-        generate_page_logger,
-        content_dir,
+    template = Template.load(Path("template.html"), path_prefix or "")
+    manifest = Manifest(
         public_dir,
-        True,
-        (path_prefix,),
+        template.digest,
+        path_prefix,
+        incremental,
+        explain,
+        highlighter is not None,
+    )
+    postbuild = (
+        PostBuild(public_dir, path_prefix or "", fingerprint, precompress)
+        if fingerprint or precompress
+        else None
+    )
+    search_index = (
+        SearchIndex(public_dir, path_prefix or "") if search else None
+    )
+    keep = manifest.kept_outputs()
+    if postbuild is not None:
+        keep |= postbuild.kept_outputs()
+    if search_index is not None:
+        keep |= search_index.kept_outputs()
+        manifest.indexed = search_index.digests()
+    with profile_phase(profiler, "plan"):
+        plan = plan_build(
+            public_dir,
+            static_dir,
+            content_dir,
+            prune=sink is None,
+            keep=keep,
+        )
+    with profile_phase(profiler, "index"):
+        index = SiteIndex()
+        index.update(plan, content_dir, public_dir)
+        index.save()
+        manifest.titles = {
+            entry.output: entry.title for entry in index.pages.values()
+        }
+    if postbuild is not None:
+        with profile_phase(profiler, "fingerprint"):
+            manifest.fingerprints = postbuild.fingerprint_assets(plan)
+    context = BuildContext(
+        path_prefix or "",
+        template,
+        manifest,
+        profiler,
+        cache,
+        stream_threshold,
+        highlighter,
+        sink,
+        memo,
+        search_index,
+        site_url,
+        feed_section,
+        feed_author,
+    )
+    execute_plan(
+        plan, context, AssetSync(link_mode, checksum, manifest, sink), jobs
+    )
+    generated = write_site_outputs(context, index, public_dir)
+    if postbuild is not None:
+        with profile_phase(profiler, "postbuild"):
+            postbuild.run(plan, manifest, generated)
+            postbuild.save()
+        if postbuild.assets:
+            print(
+                (
+                    f"Fingerprinted {len(postbuild.assets)} assets, "
+                    f"rewrote references in {postbuild.rewritten} pages"
+                )
+            )
+        if precompress:
+            encodings = ", ".join(suffix for suffix, _ in ENCODINGS)
+            print(
+                (
+                    f"Precompressed {postbuild.compressed_count} changed "
+                    f"files ({encodings})"
+                )
+            )
+    if highlighter is not None and highlighter.hits + highlighter.misses > 0:
+        print(
+            (
+                f"Highlighted {highlighter.hits + highlighter.misses} code "
+                f"blocks, {highlighter.hits} from the fragment cache"
+            )
+        )
+    if memo is not None and memo.hits + memo.misses > 0:
+        print(memo.summary())
+    if sink is None:
+        with profile_phase(profiler, "manifest"):
+            manifest.save()
+    if cache is not None:
+        with profile_phase(profiler, "evict"):
+            _ = cache.evict()
+    return context, index
+
+
+class Arguments(argparse.Namespace):
+    path_prefix: str | None = None
+    destination: str = "public"
+    incremental: bool = False
+    explain: bool = False
+    link_mode: str = "copy"
+    checksum: bool = False
+    no_cache: bool = False
+    cache_size: int = 256
+    stream_threshold: int = STREAM_THRESHOLD // 2**20
+    site_url: str | None = None
+    feed_section: str = "blog"
+    feed_author: str | None = None
+    fragment_memo: int = 4096
+    highlight: bool = False
+    search: bool = False
+    fingerprint: bool = False
+    precompress: bool = False
+    in_memory: bool = False
+    archive: str | None = None
+    jobs: int = 1
+    profile: str | None = None
+    profile_top: int = 10
+
+
+def parse_arguments(arguments: list[str] | None = None) -> Arguments:
+    parser = argparse.ArgumentParser(
+        description="Generate a static site from content/ and static/"
+    )
+    _ = parser.add_argument("path_prefix", nargs="?", default=None)
+    _ = parser.add_argument("destination", nargs="?", default="public")
+    _ = parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild outputs whose sources changed since the last build",
+    )
+    _ = parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="print which inputs caused each page to be rebuilt",
+    )
+    _ = parser.add_argument(
+        "--link-mode",
+        choices=LINK_MODES,
+        default="copy",
+        help="how unchanged static assets are placed in the destination",
+    )
+    _ = parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="compare static assets by content hash instead of size and mtime",
+    )
+    _ = parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="parse every page instead of reusing trees from .ssg-cache/ast",
+    )
+    _ = parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        metavar="MB",
+        help="evict the least recently used parsed trees beyond this size",
+    )
+    _ = parser.add_argument(
+        "--stream-threshold",
+        type=int,
+        default=STREAM_THRESHOLD // 2**20,
+        metavar="MB",
+        help=(
+            "render markdown files larger than this block by block "
+            "instead of reading them whole"
+        ),
+    )
+    _ = parser.add_argument(
+        "--site-url",
+        default=None,
+        metavar="URL",
+        help="absolute site URL; enables sitemap.xml and an Atom feed",
     )
+    _ = parser.add_argument(
+        "--feed-section",
+        default="blog",
+        metavar="DIRECTORY",
+        help="content directory whose pages make up the Atom feed",
+    )
+    _ = parser.add_argument(
+        "--feed-author",
+        default=None,
+        metavar="NAME",
+        help="Atom feed author; pages can override it with an author field",
+    )
+    _ = parser.add_argument(
+        "--fragment-memo",
+        type=int,
+        default=4096,
+        metavar="N",
+        help=(
+            "reuse the HTML of up to N repeated blocks when pages are "
+            "parsed rather than loaded from the cache (0 disables)"
+        ),
+    )
+    _ = parser.add_argument(
+        "--highlight",
+        action="store_true",
+        help="tokenize fenced code with a known language at build time",
+    )
+    _ = parser.add_argument(
+        "--search",
+        action="store_true",
+        help=(
+            "write a sharded full-text search index and search.js loader "
+            "to search/"
+        ),
+    )
+    _ = parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help=(
+            "add content-hashed copies of static assets and point pages "
+            "at them"
+        ),
+    )
+    _ = parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write compressed siblings of HTML, CSS, JS and XML outputs",
+    )
+    output = parser.add_mutually_exclusive_group()
+    _ = output.add_argument(
+        "--in-memory",
+        action="store_true",
+        help=(
+            "render into memory without writing the destination, "
+            "e.g. to check that every page builds"
+        ),
+    )
+    _ = output.add_argument(
+        "--archive",
+        default=None,
+        metavar="PATH",
+        help=(
+            "write the site into a .zip or .tar[.gz|.bz2|.xz] archive "
+            "instead of the destination directory"
+        ),
+    )
+    _ = parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="render pages across N worker processes (0 uses every core)",
+    )
+    _ = parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profile.json",
+        default=None,
+        metavar="PATH",
+        help="time each build phase and page step and write a JSON report",
+    )
+    _ = parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="number of slowest pages to list after a profiled build",
+    )
+    namespace = parser.parse_args(arguments, Arguments())
+    if (namespace.in_memory or namespace.archive is not None) and (
+        namespace.fingerprint or namespace.precompress
+    ):
+        parser.error("--fingerprint and --precompress need a destination")
+    return namespace
 
 
 def main() -> None:
-    if len(sys.argv) > 2:
-        destination = sys.argv[2]
-    else:
-        destination = "public"
-    if len(sys.argv) > 1:
-        path_prefix = sys.argv[1]
-    else:
-        path_prefix = None
+    arguments = parse_arguments()
+    jobs = arguments.jobs if arguments.jobs > 0 else os.cpu_count() or 1
+    profile = arguments.profile
+    profiler = BuildProfile() if profile is not None else None
+    sink = None
+    if arguments.archive is not None:
+        sink = ArchiveSink(
+            Path(arguments.destination), Path(arguments.archive)
+        )
+    elif arguments.in_memory:
+        sink = MemorySink(Path(arguments.destination))
     print("Begining main")
-    content_generation(path_prefix, destination)
+    try:
+        _ = content_generation(
+            arguments.path_prefix,
+            arguments.destination,
+            incremental=arguments.incremental,
+            jobs=jobs,
+            profiler=profiler,
+            link_mode=arguments.link_mode,
+            checksum=arguments.checksum,
+            cache=(
+                None
+                if arguments.no_cache
+                else ParseCache(max_bytes=arguments.cache_size * 2**20)
+            ),
+            stream_threshold=arguments.stream_threshold * 2**20,
+            site_url=arguments.site_url,
+            feed_section=arguments.feed_section,
+            feed_author=arguments.feed_author,
+            explain=arguments.explain,
+            highlighter=Highlighter() if arguments.highlight else None,
+            fingerprint=arguments.fingerprint,
+            precompress=arguments.precompress,
+            sink=sink,
+            memo=(
+                FragmentMemo(arguments.fragment_memo)
+                if arguments.fragment_memo > 0
+                else None
+            ),
+            search=arguments.search,
+        )
+    finally:
+        if sink is not None:
+            sink.close()
+    if isinstance(sink, MemorySink):
+        print(
+            (
+                f"Rendered {len(sink.files)} files, "
+                f"{sum(map(len, sink.files.values()))} bytes, in memory"
+            )
+        )
+    elif isinstance(sink, ArchiveSink):
+        print(f"Wrote {len(sink.sizes)} files to {sink.path}")
+    if profiler is not None and profile is not None:
+        profiler.save(Path(profile))
+        print(profiler.summary(arguments.profile_top))
+        print(f"Wrote build profile to {profile}")
     print("Finishing main")
 
 
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import marshal
+import zlib
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TypedDict, cast
+
+from sinks import replacing
+
+MANIFEST_VERSION = 2
+CACHE_DIR = Path(".ssg-cache")
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def stream_text_digest(path: Path, chunk_size: int = 2**20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "r", encoding="utf-8") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_blob(path: Path, version: int) -> object | None:
+    try:
+        with open(path, "rb") as file:
+            stored = cast(
+                tuple[int, object],
+                marshal.loads(zlib.decompress(file.read())),
+            )
+    except (OSError, EOFError, ValueError, TypeError, zlib.error):
+        return None
+    return stored[1] if stored[0] == version else None
+
+
+def save_blob(path: Path, version: int, data: object) -> bool:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # The marshal stub has no public type for the values it accepts.
+        stored = (version, data)
+        blob = marshal.dumps(stored)  # pyright: ignore[reportArgumentType]
+        with replacing(path) as temporary:
+            _ = temporary.write_bytes(zlib.compress(blob, 1))
+    except OSError:
+        return False
+    return True
+
+
+type References = dict[str, str | None]
+
+
+class ManifestData(TypedDict, total=False):
+    version: int
+    template: str
+    prefix: str | None
+    highlight: bool
+    fingerprints: str | None
+    pages: dict[str, tuple[str, References]]
+    assets: dict[str, str]
+    generated: dict[str, str]
+
+
+class Manifest:
+    def __init__(
+        self,
+        root: Path,
+        template_digest: str,
+        path_prefix: str | None,
+        reuse_pages: bool = True,
+        explain: bool = False,
+        highlight: bool = False,
+    ) -> None:
+        self.root: Path = root
+        self.reuse_pages: bool = reuse_pages
+        self.explain: bool = explain
+        self.template_digest: str = template_digest
+        self.path_prefix: str | None = path_prefix
+        self.highlight: bool = highlight
+        self.fingerprints: str | None = None
+        self.path: Path = CACHE_DIR.joinpath(
+            f"manifest-{text_digest(str(root))[:16]}.json"
+        ).absolute()
+        self.previous_template: str | None = None
+        self.previous_prefix: str | None = None
+        self.previous_highlight: bool = False
+        self.previous_fingerprints: str | None = None
+        self.previous_pages: dict[str, tuple[str, References]] = {}
+        self.previous_assets: dict[str, str] = {}
+        self.pages: dict[str, tuple[str, References]] = {}
+        self.assets: dict[str, str] = {}
+        self.previous_generated: dict[str, str] = {}
+        self.generated: dict[str, str] = {}
+        self.skipped: set[str] = set()
+        self.reasons: dict[str, list[str]] = {}
+        self.titles: dict[str, str | None] | None = None
+        self.indexed: dict[str, str] | None = None
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = cast(ManifestData, json.load(file))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != MANIFEST_VERSION:
+            return
+        self.previous_assets = data.get("assets", {})
+        self.previous_template = data.get("template")
+        self.previous_prefix = data.get("prefix")
+        self.previous_highlight = data.get("highlight", False)
+        self.previous_fingerprints = data.get("fingerprints")
+        self.previous_generated = data.get("generated", {})
+        if self.reuse_pages:
+            self.previous_pages = {
+                key: (digest, references)
+                for key, (digest, references) in data.get("pages", {}).items()
+            }
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def kept_outputs(self) -> set[str]:
+        return {
+            str(self.root.joinpath(key)) for key in self.previous_generated
+        }
+
+    def record_generated(self, destination: Path, digest: str) -> bool:
+        key = self._key(destination)
+        self.generated[key] = digest
+        return self.previous_generated.get(key) != digest
+
+    def stale_generated(self) -> list[Path]:
+        return [
+            self.root.joinpath(key)
+            for key in sorted(self.previous_generated.keys() - self.generated)
+        ]
+
+    def page_reasons(self, destination: Path) -> list[str]:
+        if not self.reuse_pages:
+            return ["full build"]
+        previous = self.previous_pages.get(self._key(destination))
+        if previous is None:
+            return ["not in the previous build"]
+        reasons: list[str] = []
+        if self.previous_template != self.template_digest:
+            reasons.append("template changed")
+        if self.previous_prefix != self.path_prefix:
+            reasons.append(
+                f"path prefix changed from {repr(self.previous_prefix)}"
+            )
+        if self.previous_highlight != self.highlight:
+            reasons.append("code highlighting toggled")
+        if self.previous_fingerprints != self.fingerprints:
+            reasons.append("asset fingerprints changed")
+        if (
+            self.indexed is not None
+            and self.indexed.get(self._key(destination)) != previous[0]
+        ):
+            reasons.append("missing from the search index")
+        if self.titles is not None:
+            reasons.extend(
+                f"referenced page {reference} changed"
+                for reference, title in previous[1].items()
+                if self.titles.get(reference) != title
+            )
+        return reasons
+
+    def previous_digest(self, destination: Path, page: bool) -> str | None:
+        if not page:
+            return self.previous_assets.get(self._key(destination))
+        if self.page_reasons(destination):
+            return None
+        return self.previous_pages[self._key(destination)][0]
+
+    def record(
+        self,
+        destination: Path,
+        digest: str,
+        page: bool,
+        skipped: bool,
+        references: Iterable[str] | None = None,
+    ) -> None:
+        key = self._key(destination)
+        if not page:
+            self.assets[key] = digest
+        elif skipped:
+            self.pages[key] = (digest, self.previous_pages[key][1])
+        else:
+            titles = self.titles if self.titles is not None else {}
+            self.pages[key] = (
+                digest,
+                {
+                    reference: titles.get(reference)
+                    for reference in references or ()
+                },
+            )
+            if self.explain:
+                previous = self.previous_pages.get(key)
+                self.reasons[key] = self.page_reasons(destination) or [
+                    (
+                        "source changed"
+                        if previous is None or previous[0] != digest
+                        else "output missing"
+                    )
+                ]
+        if skipped:
+            self.skipped.add(key)
+
+    def was_skipped(self, destination: Path) -> bool:
+        return self._key(destination) in self.skipped
+
+    def rebuild_reasons(self, destination: Path) -> list[str]:
+        return self.reasons.get(self._key(destination), [])
+
+    def save(self) -> None:
+        data: ManifestData = {
+            "version": MANIFEST_VERSION,
+            "template": self.template_digest,
+            "prefix": self.path_prefix,
+            "highlight": self.highlight,
+            "fingerprints": self.fingerprints,
+            "pages": self.pages,
+            "assets": self.assets,
+            "generated": self.generated,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with (
+            replacing(self.path) as temporary,
+            open(temporary, "w", encoding="utf-8") as file,
+        ):
+            json.dump(data, file, separators=(",", ":"))
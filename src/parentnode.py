@@ -1,16 +1,21 @@
 from __future__ import annotations
 
-import re
-from collections.abc import Sequence
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from functools import partial
 from typing import override
 
 import blocks
+import patterns
 from blocks import BlockType
-from htmlnode import HTMLNode
+from fragments import FragmentMemo
+from htmlnode import HTMLNode, NodeData
+from leafnode import LeafNode
 from textnode import TextNode, TextType
 
 
 class ParentNode(HTMLNode):
+    __slots__: tuple[str, ...] = ()
+
     def __init__(
         self,
         tag: str | None,
@@ -21,11 +26,45 @@ class ParentNode(HTMLNode):
 
     @override
     def to_html(self) -> str:
+        return "".join(self.iter_html())
+
+    @override
+    def iter_html(self) -> Iterator[str]:
         if self.tag is None:
             raise ValueError("Parent node must have a tag")
         if len(self.children) == 0:
             raise ValueError("Parent node must have at least one child")
-        return f"<{self.tag}{self.props_to_html()}>{''.join(child.to_html() for child in self.children)}</{self.tag}>"
+        yield f"<{self.tag}{self.props_to_html()}>"
+        for child in self.children:
+            yield from child.iter_html()
+        yield f"</{self.tag}>"
+
+    @override
+    def to_data(self) -> NodeData:
+        return (
+            self.tag,
+            [child.to_data() for child in self.children],
+            self._props,
+        )
+
+    @staticmethod
+    def from_data(data: NodeData, path_prefix: str | None = None) -> HTMLNode:
+        tag, body, props = data
+        if isinstance(body, list):
+            return ParentNode(
+                tag,
+                [ParentNode.from_data(child, path_prefix) for child in body],
+                props,
+            )
+        leaf = LeafNode(tag, body, props)
+        if path_prefix is not None:
+            leaf.prefix_links(path_prefix)
+        return leaf
+
+    @override
+    def prefix_links(self, path_prefix: str) -> None:
+        for child in self.children:
+            child.prefix_links(path_prefix)
 
     @override
     def __repr__(self) -> str:
@@ -33,111 +72,189 @@ class ParentNode(HTMLNode):
 
     @staticmethod
     def from_markdown(
-        text: str, props: dict[str, str] | None = None
+        text: str,
+        props: dict[str, str] | None = None,
+        path_prefix: str | None = None,
+    ) -> HTMLNode:
+        return ParentNode.from_blocks(
+            blocks.tokenize_blocks(text.split("\n")), props, path_prefix
+        )
+
+    @staticmethod
+    def from_blocks(
+        document_blocks: Iterable[tuple[str, BlockType, dict[str, str]]],
+        props: dict[str, str] | None = None,
+        path_prefix: str | None = None,
     ) -> HTMLNode:
         children: list[HTMLNode] = []
-        for block, block_type, block_props in blocks.split_blocks(text):
-            match block_type:
-                case BlockType.HEADING:
-                    heading = int(block_props.pop("heading"))
-                    children.append(
-                        ParentNode(
-                            f"h{heading}",
-                            [
-                                node.to_html_node()
-                                for node in TextNode.split_text(
-                                    block[heading:].strip()
-                                )
-                            ],
-                            block_props,
-                        )
-                    )
-                case BlockType.CODE:
-                    code = re.match(
-                        r"```.*\r?\n(?P<code>[\s\S]*?)(\r?\n)?```", block
-                    )
-                    if code is not None:
-                        children.append(
-                            ParentNode(
-                                "pre",
-                                [
-                                    TextNode(
-                                        code.group("code"), TextType.CODE
-                                    ).to_html_node(block_props)
-                                ],
-                            )
-                        )
-                case BlockType.QUOTE:
-                    quote = "\n".join(
-                        line.group("quote").strip()
-                        for line in re.finditer(
-                            r"[\S\r\n]*>[\S\r\n]*(?P<quote>.*)(?:\r?\n)?", block
-                        )
-                    )
-                    children.append(
-                        ParentNode(
-                            "pre",
-                            children=[
-                                ParentNode(
-                                    "blockquote",
-                                    [
-                                        node.to_html_node()
-                                        for node in TextNode.split_text(quote)
-                                    ],
-                                    block_props,
-                                )
-                            ],
+        for block in document_blocks:
+            node = ParentNode.from_block(*block, path_prefix)
+            if node is not None:
+                children.append(node)
+        return ParentNode("div", children, props)
+
+    @staticmethod
+    def iter_blocks_html(
+        document_blocks: Iterable[tuple[str, BlockType, dict[str, str]]],
+        props: dict[str, str] | None = None,
+        path_prefix: str | None = None,
+        transform: Callable[[HTMLNode], None] | None = None,
+        memo: FragmentMemo | None = None,
+        children: list[NodeData] | None = None,
+    ) -> Iterator[str]:
+        # from_blocks(...).iter_html() holding one block's nodes at a time.
+        # With children, also collects from_blocks(...).to_data() unprefixed.
+        opened = False
+        for block in document_blocks:
+            if memo is None and children is None:
+                fragment = ParentNode.block_html(block, path_prefix, transform)
+            else:
+                render = partial(
+                    ParentNode.block_fragment, block, path_prefix, transform
+                )
+                fragment, data = (
+                    render()
+                    if memo is None
+                    else memo.fragment(block, path_prefix, render)
+                )
+                if children is not None and data is not None:
+                    children.append(data)
+            if not fragment:
+                continue
+            if not opened:
+                opened = True
+                yield "<div"
+                yield HTMLNode(None, None, None, props).props_to_html()
+                yield ">"
+            yield fragment
+        if not opened:
+            raise ValueError("Parent node must have at least one child")
+        yield "</div>"
+
+    @staticmethod
+    def block_html(
+        block: tuple[str, BlockType, dict[str, str]],
+        path_prefix: str | None = None,
+        transform: Callable[[HTMLNode], None] | None = None,
+    ) -> str:
+        node = ParentNode.from_block(*block, path_prefix)
+        if node is None:
+            return ""
+        if transform is not None:
+            transform(node)
+        return node.to_html()
+
+    @staticmethod
+    def block_fragment(
+        block: tuple[str, BlockType, dict[str, str]],
+        path_prefix: str | None = None,
+        transform: Callable[[HTMLNode], None] | None = None,
+    ) -> tuple[str, NodeData | None]:
+        node = ParentNode.from_block(*block)
+        if node is None:
+            return "", None
+        data = node.to_data()
+        if path_prefix is not None:
+            node.prefix_links(path_prefix)
+        if transform is not None:
+            transform(node)
+        return node.to_html(), data
+
+    @staticmethod
+    def from_block(
+        block: str,
+        block_type: BlockType,
+        block_props: dict[str, str],
+        path_prefix: str | None = None,
+    ) -> HTMLNode | None:
+        match block_type:
+            case BlockType.HEADING:
+                heading = int(block_props["heading"])
+                block_props = {
+                    key: value
+                    for key, value in block_props.items()
+                    if key != "heading"
+                }
+                return ParentNode(
+                    f"h{heading}",
+                    [
+                        node.to_html_node(None, path_prefix)
+                        for node in TextNode.split_text(
+                            block[heading:].strip()
                         )
+                    ],
+                    block_props or None,
+                )
+            case BlockType.CODE:
+                code = patterns.CODE_BODY.match(block)
+                if code is not None:
+                    return ParentNode(
+                        "pre",
+                        [
+                            TextNode(
+                                code.group("code"), TextType.CODE
+                            ).to_html_node(block_props or None)
+                        ],
                     )
-                case BlockType.UNORDERED_LIST:
-                    items = [
-                        line.group("item").strip()
-                        for line in re.finditer(
-                            r"[\S\r\n]*(?:(?:\*)|(?:\-))[\S\r\n]*(?P<item>.*)(?:\r?\n)?",
-                            block,
-                        )
-                        if line.group("item")
-                    ]
-                    list_items = [
-                        ParentNode(
-                            "li",
-                            [
-                                node.to_html_node()
-                                for node in TextNode.split_text(line)
-                            ],
-                        )
-                        for line in items
-                    ]
-                    children.append(ParentNode("ul", list_items, block_props))
-                case BlockType.ORDERED_LIST:
-                    items = [
-                        line.group("item").strip()
-                        for line in re.finditer(
-                            r"[\S\r\n]*\d+\.[\S\r\n]*(?P<item>.*)(?:\r?\n)?",
-                            block,
-                        )
-                        if line.group("item")
-                    ]
-                    list_items = [
+            case BlockType.QUOTE:
+                quote = "\n".join(
+                    line.group("quote").strip()
+                    for line in patterns.QUOTE_LINE.finditer(block)
+                )
+                return ParentNode(
+                    "pre",
+                    children=[
                         ParentNode(
-                            "li",
+                            "blockquote",
                             [
-                                node.to_html_node()
-                                for node in TextNode.split_text(line)
+                                node.to_html_node(None, path_prefix)
+                                for node in TextNode.split_text(quote)
                             ],
+                            block_props or None,
                         )
-                        for line in items
-                    ]
-                    children.append(ParentNode("ol", list_items, block_props))
-                case BlockType.PARAGRAPH:
-                    children.append(
-                        ParentNode(
-                            "p",
-                            [
-                                node.to_html_node()
-                                for node in TextNode.split_text(block)
-                            ],
-                            block_props,
-                        )
+                    ],
+                )
+            case BlockType.UNORDERED_LIST:
+                items = [
+                    line.group("item").strip()
+                    for line in patterns.UNORDERED_ITEM.finditer(block)
+                    if line.group("item")
+                ]
+                list_items = [
+                    ParentNode(
+                        "li",
+                        [
+                            node.to_html_node(None, path_prefix)
+                            for node in TextNode.split_text(line)
+                        ],
                     )
-        return ParentNode("div", children, props)
+                    for line in items
+                ]
+                return ParentNode("ul", list_items, block_props or None)
+            case BlockType.ORDERED_LIST:
+                items = [
+                    line.group("item").strip()
+                    for line in patterns.ORDERED_ITEM.finditer(block)
+                    if line.group("item")
+                ]
+                list_items = [
+                    ParentNode(
+                        "li",
+                        [
+                            node.to_html_node(None, path_prefix)
+                            for node in TextNode.split_text(line)
+                        ],
+                    )
+                    for line in items
+                ]
+                return ParentNode("ol", list_items, block_props or None)
+            case BlockType.PARAGRAPH:
+                return ParentNode(
+                    "p",
+                    [
+                        node.to_html_node(None, path_prefix)
+                        for node in TextNode.split_text(block)
+                    ],
+                    block_props or None,
+                )
+        return None
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import marshal
+import os
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import cast
+
+from blocks import Document, parse_document
+from fragments import FragmentMemo
+from htmlnode import HTMLNode, NodeData
+from manifest import CACHE_DIR, load_blob, save_blob, text_digest
+from parentnode import ParentNode
+
+PARSER_VERSION = 3
+CACHE_FORMAT = f"{PARSER_VERSION}.{marshal.version}"
+
+type CacheEntry = tuple[str | None, list[tuple[int, str]], int, NodeData]
+
+
+class ParseCache:
+    def __init__(
+        self,
+        directory: Path | None = None,
+        max_bytes: int = 256 * 2**20,
+    ) -> None:
+        self.directory: Path = (
+            directory if directory is not None else CACHE_DIR.joinpath("ast")
+        ).absolute()
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def key(self, markdown: str) -> str:
+        return text_digest(f"{CACHE_FORMAT}\n{markdown}")
+
+    def load(
+        self, markdown: str, path_prefix: str | None = None
+    ) -> tuple[HTMLNode, Document] | None:
+        path = self.directory.joinpath(self.key(markdown))
+        loaded = load_blob(path, PARSER_VERSION)
+        if loaded is None:
+            self.misses += 1
+            return None
+        title, outline, word_count, data = cast(CacheEntry, loaded)
+        os.utime(path)
+        self.hits += 1
+        return ParentNode.from_data(data, path_prefix), Document(
+            [], title, outline, word_count
+        )
+
+    def parse(
+        self, markdown: str, path_prefix: str | None = None
+    ) -> tuple[HTMLNode, Document]:
+        loaded = self.load(markdown, path_prefix)
+        if loaded is not None:
+            return loaded
+        document = parse_document(markdown)
+        content = ParentNode.from_blocks(document.blocks)
+        self.save(markdown, document, content.to_data())
+        if path_prefix is not None:
+            content.prefix_links(path_prefix)
+        return content, document
+
+    def iter_html(
+        self,
+        markdown: str,
+        document: Document,
+        path_prefix: str | None,
+        transform: Callable[[HTMLNode], None] | None,
+        memo: FragmentMemo,
+    ) -> Iterator[str]:
+        # A miss rendered through the memo, storing the tree parse() would.
+        children: list[NodeData] = []
+        yield from ParentNode.iter_blocks_html(
+            document.blocks, None, path_prefix, transform, memo, children
+        )
+        self.save(markdown, document, ("div", children, None))
+
+    def save(self, markdown: str, document: Document, data: NodeData) -> None:
+        entry: CacheEntry = (
+            document.title,
+            document.outline,
+            document.word_count,
+            data,
+        )
+        _ = save_blob(
+            self.directory.joinpath(self.key(markdown)), PARSER_VERSION, entry
+        )
+
+    def evict(self) -> int:
+        try:
+            with os.scandir(self.directory) as entries:
+                files = [
+                    (entry.stat(), entry.path)
+                    for entry in entries
+                    if entry.is_file()
+                ]
+        except FileNotFoundError:
+            return 0
+        total = sum(stat.st_size for stat, _ in files)
+        evicted = 0
+        files.sort(key=lambda file: file[0].st_mtime_ns)
+        for stat, path in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= stat.st_size
+            evicted += 1
+        return evicted
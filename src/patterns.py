@@ -0,0 +1,66 @@
+import re
+
+
+def list_regex(item_start: str, alternate_start: str | None = None) -> str:
+    if alternate_start is None:
+        return (
+            rf"(?:^|(?:\r?\n))[^\S\r\n]*(?:"
+            rf"(?:[^\S\r\n]*{item_start}(?:[^\S\r\n].*)?\r?\n)*)"
+            rf"[^\S\r\n]*{item_start}[^\S\r\n].*"
+        )
+    return (
+        rf"(?:^|(?:\r?\n))(?:"
+        rf"(?:[^\S\r\n]*(?:"
+        rf"(?:[^\S\r\n]*{item_start}(?:[^\S\r\n].*)?\r?\n)*)"
+        rf"[^\S\r\n]*{item_start}[^\S\r\n].*)"
+        rf"|(?:"
+        rf"[^\S\r\n]*(?:"
+        rf"(?:[^\S\r\n]*{alternate_start}(?:[^\S\r\n].*)?\r?\n)*)"
+        rf"[^\S\r\n]*{alternate_start}[^\S\r\n].*))"
+    )
+
+
+CODE_FENCE = re.compile(
+    r"(?:^|(?:\r?\n))[^\S\r\n]*```([^\S\r\n]*(?P<language>.*?))?[^\S\r\n]*(?:$|(?:\r?\n))"
+)
+HEADING = re.compile(
+    r"(?:^|(?:\r?\n))[^\S\r\n]*(?P<hashcount>#{1,6})[^\S\r\n]+(?P<header>.*?)[^\S\r\n]*(?:$|(?:\r?\n))"
+)
+QUOTE_BLOCK = re.compile(list_regex(r">"))
+ORDERED_LIST_BLOCK = re.compile(list_regex(r"\d+\."))
+UNORDERED_LIST_BLOCK = re.compile(list_regex(r"\*", r"\-"))
+NEWLINES = re.compile(r"(?:\r?\n)+")
+
+BLOCK_LINE = re.compile(
+    (
+        r"[^\S\r\n]*(?:(?P<fence>```)|(?P<hashes>#{1,6})[^\S\r\n]"
+        r"|(?P<marker>[>*-]|\d+\.))(?P<rest>.*)"
+    )
+)
+FENCE_LANGUAGE = re.compile(r"[^\S\r\n]*(?P<language>.*?)[^\S\r\n]*\r?")
+LAST_FENCE_LANGUAGE = re.compile(r"[^\S\r\n]*(?P<language>.*?)[^\S\r\n]*")
+
+CODE_BODY = re.compile(r"```.*\r?\n(?P<code>[\s\S]*?)(\r?\n)?```")
+QUOTE_LINE = re.compile(r"[\S\r\n]*>[\S\r\n]*(?P<quote>.*)(?:\r?\n)?")
+UNORDERED_ITEM = re.compile(
+    r"[\S\r\n]*(?:(?:\*)|(?:\-))[\S\r\n]*(?P<item>.*)(?:\r?\n)?"
+)
+ORDERED_ITEM = re.compile(r"[\S\r\n]*\d+\.[\S\r\n]*(?P<item>.*)(?:\r?\n)?")
+
+IMAGE_OR_LINK = re.compile(r"(?P<type>!)?\[(?P<alt>.*?)]\((?P<url>.*?)\)")
+INLINE_TOKEN = re.compile(
+    (
+        r"`(?P<code>[^`]*)`"
+        r"|(?P<type>!)?\[(?P<alt>[^`\n]*?)]\((?P<url>[^`\n]*?)\)"
+        r"|_|\*\*"
+    )
+)
+
+LINK_ATTRIBUTE = re.compile(
+    r"(?P<type>(?:href)|(?:src))[^\S\r\n]*=[^\S\r\n]*\"(?P<link>[^\"]*)\""
+)
+TEMPLATE_SLOT = re.compile(r"\{\{[^\S\r\n]*(\w+)[^\S\r\n]*}}")
+UNRESERVED_PATH = re.compile(r"[A-Za-z0-9/._~-]*")
+# For str patterns \w is [\p{L}\p{N}_], the class search.js splits
+# queries with, so both sides agree on what a term is.
+SEARCH_TERM = re.compile(r"\w+")
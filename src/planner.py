@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Collection
+from enum import Enum, auto
+from pathlib import Path
+from typing import override
+
+
+class TaskType(Enum):
+    DELETE = auto()
+    RMDIR = auto()
+    MKDIR = auto()
+    COPY = auto()
+    RENDER = auto()
+
+
+class Task:
+    __slots__: tuple[str, ...] = (
+        "task_type",
+        "source",
+        "destination",
+        "source_stat",
+        "destination_stat",
+    )
+
+    def __init__(
+        self,
+        task_type: TaskType,
+        source: str | None,
+        destination: str,
+        source_stat: os.stat_result | None = None,
+        destination_stat: os.stat_result | None = None,
+    ) -> None:
+        self.task_type: TaskType = task_type
+        self.source: str | None = source
+        self.destination: str = destination
+        self.source_stat: os.stat_result | None = source_stat
+        self.destination_stat: os.stat_result | None = destination_stat
+
+    @override
+    def __repr__(self) -> str:
+        return (
+            f"Task({self.task_type}, {repr(self.source)}, "
+            f"{repr(self.destination)})"
+        )
+
+
+def scan(directory: str) -> list[os.DirEntry[str]]:
+    try:
+        with os.scandir(directory) as entries:
+            return list(entries)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def delete_tree(path: str) -> list[Task]:
+    tasks: list[Task] = []
+    directories = [path]
+    index = 0
+    while index < len(directories):
+        for entry in scan(directories[index]):
+            if entry.is_dir(follow_symlinks=False):
+                directories.append(entry.path)
+            else:
+                tasks.append(Task(TaskType.DELETE, None, entry.path))
+        index += 1
+    tasks.extend(
+        Task(TaskType.RMDIR, None, directory)
+        for directory in reversed(directories)
+    )
+    return tasks
+
+
+def plan_build(
+    public_dir: Path,
+    static_dir: Path | None = None,
+    content_dir: Path | None = None,
+    prune: bool = True,
+    keep: Collection[str] = (),
+) -> list[Task]:
+    root = str(public_dir)
+    outputs: dict[str, Task] = {root: Task(TaskType.MKDIR, None, root)}
+    for source_dir, task_type in (
+        (static_dir, TaskType.COPY),
+        (content_dir, TaskType.RENDER),
+    ):
+        if source_dir is None:
+            continue
+        pending = [(str(source_dir), root)]
+        while pending:
+            source, destination = pending.pop()
+            for entry in scan(source):
+                if entry.is_dir():
+                    target = os.path.join(destination, entry.name)
+                    previous = outputs.get(target)
+                    if (
+                        previous is None
+                        or previous.task_type is not TaskType.MKDIR
+                    ):
+                        outputs[target] = Task(
+                            TaskType.MKDIR, entry.path, target
+                        )
+                    pending.append((entry.path, target))
+                elif task_type is TaskType.COPY:
+                    target = os.path.join(destination, entry.name)
+                    outputs[target] = Task(
+                        TaskType.COPY, entry.path, target, entry.stat()
+                    )
+                else:
+                    target = os.path.join(
+                        destination, Path(entry.name).with_suffix(".html")
+                    )
+                    outputs[target] = Task(
+                        TaskType.RENDER, entry.path, target, entry.stat()
+                    )
+
+    deletes: list[Task] = []
+    directories = [root]
+    while directories:
+        for entry in scan(directories.pop()):
+            task = outputs.get(entry.path)
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if task is None:
+                if prune and entry.path not in keep:
+                    deletes.extend(
+                        delete_tree(entry.path)
+                        if is_dir
+                        else [Task(TaskType.DELETE, None, entry.path)]
+                    )
+            elif is_dir != (task.task_type is TaskType.MKDIR):
+                deletes.extend(
+                    delete_tree(entry.path)
+                    if is_dir
+                    else [Task(TaskType.DELETE, None, entry.path)]
+                )
+            else:
+                if is_dir:
+                    directories.append(entry.path)
+                if task.task_type is not TaskType.RENDER:
+                    task.destination_stat = entry.stat(follow_symlinks=False)
+    try:
+        outputs[root].destination_stat = os.stat(root)
+    except FileNotFoundError:
+        pass
+
+    order = {
+        TaskType.MKDIR: 0,
+        TaskType.COPY: 1,
+        TaskType.RENDER: 2,
+    }
+    return deletes + sorted(
+        outputs.values(), key=lambda task: order[task.task_type]
+    )
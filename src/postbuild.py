@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import importlib
+import os
+import posixpath
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import cast
+
+from links import replace_links, rewrite_url
+from manifest import (
+    CACHE_DIR,
+    Manifest,
+    file_digest,
+    load_blob,
+    save_blob,
+    text_digest,
+)
+from planner import Task, TaskType
+from sinks import replacing
+from sync import place_file
+
+POSTBUILD_VERSION = 2
+FINGERPRINT_LENGTH = 10
+FINGERPRINT_SUFFIXES = frozenset(
+    {
+        ".css",
+        ".js",
+        ".mjs",
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".svg",
+        ".webp",
+        ".avif",
+        ".woff",
+        ".woff2",
+    }
+)
+COMPRESS_SUFFIXES = frozenset(
+    {".html", ".css", ".js", ".mjs", ".svg", ".xml", ".json"}
+)
+
+type FileRecord = tuple[int, int, str]
+type PostBuildState = tuple[
+    dict[str, FileRecord], dict[str, FileRecord], list[str]
+]
+
+
+def gzip_compress(data: bytes) -> bytes:
+    # A fixed mtime keeps the .gz output reproducible.
+    return gzip.compress(data, 9, mtime=0)
+
+
+def zstd_compress() -> Callable[[bytes], bytes] | None:
+    # Python 3.14 added compression.zstd; older interpreters write .gz only.
+    try:
+        zstd = importlib.import_module("compression.zstd")
+    except ImportError:
+        return None
+    return partial(cast(Callable[..., bytes], zstd.compress), level=19)
+
+
+ENCODINGS: list[tuple[str, Callable[[bytes], bytes]]] = [
+    (".gz", gzip_compress)
+]
+if (compress := zstd_compress()) is not None:
+    ENCODINGS.append((".zst", compress))
+
+
+def fingerprinted_name(key: str, digest: str) -> str:
+    directory, name = posixpath.split(key)
+    stem, suffix = posixpath.splitext(name)
+    return posixpath.join(
+        directory, f"{stem}.{digest[:FINGERPRINT_LENGTH]}{suffix}"
+    )
+
+
+def compressed_siblings(path: Path) -> list[Path]:
+    return [path.with_name(path.name + suffix) for suffix, _ in ENCODINGS]
+
+
+def rewrite_page(path: Path, urls: dict[str, str]) -> bool:
+    with open(path, "r", encoding="utf-8") as file:
+        html = file.read()
+    rewritten = replace_links(html, lambda url: urls.get(url, url))
+    if rewritten == html:
+        return False
+    with replacing(path) as temporary:
+        _ = temporary.write_text(rewritten, encoding="utf-8")
+    return True
+
+
+def compress_output(
+    path: Path, previous: FileRecord | None
+) -> tuple[FileRecord, bool]:
+    stat = path.stat()
+    siblings = compressed_siblings(path)
+    if (
+        previous is not None
+        and previous[:2] == (stat.st_mtime_ns, stat.st_size)
+        and all(sibling.is_file() for sibling in siblings)
+    ):
+        return previous, False
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    record = (stat.st_mtime_ns, stat.st_size, digest)
+    if (
+        previous is not None
+        and previous[2] == digest
+        and all(sibling.is_file() for sibling in siblings)
+    ):
+        return record, False
+    for sibling, (_, compress) in zip(siblings, ENCODINGS):
+        with replacing(sibling) as temporary:
+            _ = temporary.write_bytes(compress(data))
+    return record, True
+
+
+class PostBuild:
+    def __init__(
+        self,
+        public_dir: Path,
+        path_prefix: str,
+        fingerprint: bool = True,
+        precompress: bool = True,
+        workers: int | None = None,
+    ) -> None:
+        self.public_dir: Path = public_dir
+        self.path_prefix: str = path_prefix
+        self.fingerprint: bool = fingerprint
+        self.precompress: bool = precompress
+        self.workers: int = workers or os.cpu_count() or 1
+        self.path: Path = CACHE_DIR.joinpath(
+            f"postbuild-{text_digest(str(public_dir))[:16]}"
+        ).absolute()
+        self.hashes: dict[str, FileRecord] = {}
+        self.compressed: dict[str, FileRecord] = {}
+        self.previous_outputs: set[str] = set()
+        self.outputs: set[str] = set()
+        self.assets: dict[str, str] = {}
+        self.urls: dict[str, str] = {}
+        self.rewritten: int = 0
+        self.compressed_count: int = 0
+        self._load()
+
+    def _load(self) -> None:
+        state = load_blob(self.path, POSTBUILD_VERSION)
+        if state is None:
+            return
+        hashes, compressed, outputs = cast(PostBuildState, state)
+        self.hashes = hashes
+        self.compressed = compressed
+        self.previous_outputs = set(outputs)
+
+    def _key(self, path: str | Path) -> str:
+        return Path(path).relative_to(self.public_dir).as_posix()
+
+    def kept_outputs(self) -> set[str]:
+        # Derived files the planner would otherwise prune as unknown outputs.
+        return {
+            str(self.public_dir.joinpath(key)) for key in self.previous_outputs
+        }
+
+    def fingerprint_assets(self, plan: Iterable[Task]) -> str | None:
+        if not self.fingerprint:
+            return None
+        hashes: dict[str, FileRecord] = {}
+        for task in plan:
+            if (
+                task.task_type is not TaskType.COPY
+                or task.source is None
+                or task.source_stat is None
+                or os.path.splitext(task.destination)[1].lower()
+                not in FINGERPRINT_SUFFIXES
+            ):
+                continue
+            stat = task.source_stat
+            previous = self.hashes.get(task.source)
+            digest = (
+                previous[2]
+                if previous is not None
+                and previous[:2] == (stat.st_mtime_ns, stat.st_size)
+                else file_digest(Path(task.source))
+            )
+            hashes[task.source] = (stat.st_mtime_ns, stat.st_size, digest)
+            key = self._key(task.destination)
+            fingerprinted = fingerprinted_name(key, digest)
+            self.assets[key] = fingerprinted
+            self.urls[rewrite_url(f"/{key}", self.path_prefix)] = rewrite_url(
+                f"/{fingerprinted}", self.path_prefix
+            )
+        self.hashes = hashes
+        return text_digest(
+            "\n".join(
+                f"{key} {fingerprinted}"
+                for key, fingerprinted in sorted(self.assets.items())
+            )
+        )
+
+    def run(
+        self,
+        plan: Iterable[Task],
+        manifest: Manifest,
+        generated: Iterable[Path] = (),
+    ) -> None:
+        pages: list[Path] = []
+        files: list[str] = []
+        for task in plan:
+            if task.task_type is TaskType.RENDER:
+                key = self._key(task.destination)
+                if key not in manifest.pages:
+                    continue
+                files.append(key)
+                if not manifest.was_skipped(Path(task.destination)):
+                    pages.append(Path(task.destination))
+            elif task.task_type is TaskType.COPY:
+                files.append(self._key(task.destination))
+        for original, fingerprinted in self.assets.items():
+            if self.place(original, fingerprinted):
+                files.append(fingerprinted)
+        files.extend(self._key(path) for path in generated)
+        with ThreadPoolExecutor(self.workers) as executor:
+            if self.urls:
+                self.rewritten += sum(
+                    executor.map(
+                        partial(rewrite_page, urls=self.urls), pages
+                    )
+                )
+            if self.precompress:
+                self.compress(
+                    executor,
+                    [
+                        key
+                        for key in files
+                        if posixpath.splitext(key)[1] in COMPRESS_SUFFIXES
+                    ],
+                )
+        for key in self.previous_outputs - self.outputs:
+            self.public_dir.joinpath(key).unlink(missing_ok=True)
+
+    def place(self, original: str, fingerprinted: str) -> bool:
+        source = self.public_dir.joinpath(original)
+        destination = self.public_dir.joinpath(fingerprinted)
+        try:
+            if not destination.is_file():
+                _ = place_file(str(source), str(destination), "hardlink")
+                print(f"Fingerprinting {source} as {destination}")
+        except OSError as e:
+            print(f"Attempted to fingerprint {source} but encountered {e}")
+            return False
+        self.outputs.add(fingerprinted)
+        return True
+
+    def compress(self, executor: ThreadPoolExecutor, keys: list[str]) -> None:
+        results = executor.map(
+            self.compress_key, keys, [self.compressed.get(key) for key in keys]
+        )
+        compressed: dict[str, FileRecord] = {}
+        for key, result in zip(keys, results):
+            if result is None:
+                continue
+            record, changed = result
+            compressed[key] = record
+            self.outputs.update(key + suffix for suffix, _ in ENCODINGS)
+            if changed:
+                self.compressed_count += 1
+        self.compressed = compressed
+
+    def compress_key(
+        self, key: str, previous: FileRecord | None
+    ) -> tuple[FileRecord, bool] | None:
+        try:
+            return compress_output(self.public_dir.joinpath(key), previous)
+        except OSError:
+            return None
+
+    def save(self) -> None:
+        state: PostBuildState = (
+            self.hashes,
+            self.compressed,
+            sorted(self.outputs),
+        )
+        _ = save_blob(self.path, POSTBUILD_VERSION, state)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+
+from htmlnode import HTMLNode
+
+PAGE_STEPS = ("read", "parse", "render", "write")
+
+
+def clock() -> tuple[int, int]:
+    return time.perf_counter_ns(), time.process_time_ns()
+
+
+def count_nodes(node: HTMLNode) -> int:
+    count = 0
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        count += 1
+        pending.extend(node.children)
+    return count
+
+
+def timing_to_json(timing: list[int]) -> dict[str, float]:
+    return {"wall_ms": timing[0] / 1e6, "cpu_ms": timing[1] / 1e6}
+
+
+class PageProfile:
+    __slots__: tuple[str, ...] = (
+        "source",
+        "steps",
+        "nodes",
+        "bytes",
+        "skipped",
+    )
+
+    def __init__(self, source: Path) -> None:
+        self.source: str = str(source)
+        self.steps: dict[str, list[int]] = {}
+        self.nodes: int = 0
+        self.bytes: int = 0
+        self.skipped: bool = False
+
+    def add(self, step: str, start: tuple[int, int]) -> None:
+        timing = self.steps.get(step)
+        if timing is None:
+            timing = self.steps[step] = [0, 0]
+        timing[0] += time.perf_counter_ns() - start[0]
+        timing[1] += time.process_time_ns() - start[1]
+
+    @property
+    def wall(self) -> int:
+        return sum(timing[0] for timing in self.steps.values())
+
+    @property
+    def cpu(self) -> int:
+        return sum(timing[1] for timing in self.steps.values())
+
+    def to_json(self) -> dict[str, object]:
+        return {
+            "source": self.source,
+            "skipped": self.skipped,
+            "nodes": self.nodes,
+            "bytes": self.bytes,
+            "wall_ms": self.wall / 1e6,
+            "cpu_ms": self.cpu / 1e6,
+            "steps": {
+                step: timing_to_json(timing)
+                for step, timing in self.steps.items()
+            },
+        }
+
+
+class BuildProfile:
+    def __init__(self) -> None:
+        self.phases: dict[str, list[int]] = {}
+        self.pages: list[PageProfile] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None]:
+        start = clock()
+        try:
+            yield
+        finally:
+            timing = self.phases.setdefault(name, [0, 0])
+            timing[0] += time.perf_counter_ns() - start[0]
+            timing[1] += time.process_time_ns() - start[1]
+
+    def add_page(self, page: PageProfile) -> None:
+        self.pages.append(page)
+
+    def slowest(self, top: int) -> list[PageProfile]:
+        return sorted(self.pages, key=lambda page: page.wall, reverse=True)[
+            :top
+        ]
+
+    def to_json(self) -> dict[str, object]:
+        steps: dict[str, list[int]] = {}
+        for page in self.pages:
+            for step, timing in page.steps.items():
+                total = steps.setdefault(step, [0, 0])
+                total[0] += timing[0]
+                total[1] += timing[1]
+        return {
+            "phases": {
+                name: timing_to_json(timing)
+                for name, timing in self.phases.items()
+            },
+            "page_steps": {
+                step: timing_to_json(timing) for step, timing in steps.items()
+            },
+            "page_count": len(self.pages),
+            "nodes": sum(page.nodes for page in self.pages),
+            "bytes": sum(page.bytes for page in self.pages),
+            "pages": [page.to_json() for page in self.pages],
+        }
+
+    def save(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_json(), file, indent=2)
+
+    def summary(self, top: int) -> str:
+        lines = [f"{'phase':<12} {'wall ms':>10} {'cpu ms':>10}"]
+        for name, timing in self.phases.items():
+            lines.append(
+                f"{name:<12} {timing[0] / 1e6:>10.2f} {timing[1] / 1e6:>10.2f}"
+            )
+        slowest = self.slowest(top)
+        if slowest:
+            lines.append("")
+            lines.append(
+                (
+                    f"{'wall ms':>10} {'cpu ms':>10} {'nodes':>8} "
+                    f"{'bytes':>10}  slowest pages"
+                )
+            )
+            for page in slowest:
+                lines.append(
+                    (
+                        f"{page.wall / 1e6:>10.2f} {page.cpu / 1e6:>10.2f} "
+                        f"{page.nodes:>8} {page.bytes:>10}  {page.source}"
+                    )
+                )
+        return "\n".join(lines)
@@ -0,0 +1,138 @@
+// Client for the index written by `main.py --search`:
+//
+//   import { search } from "/search/search.js";
+//   const results = await search("static site");
+//
+// Only index.json.gz and the shards holding the query's terms are
+// fetched.
+const base = new URL(".", import.meta.url);
+const shards = new Map();
+let index = null;
+
+const TERM = /[\p{L}\p{N}_]+/gu;
+
+// Index files are gzipped JSON, inflated here so that any static server
+// can host them without a Content-Encoding setup.
+async function fetchJson(name, missing) {
+  const response = await fetch(new URL(name, base));
+  if (!response.ok) {
+    if (missing === undefined) {
+      throw new Error(`${response.status} fetching ${name}`);
+    }
+    return missing;
+  }
+  const stream = response.body.pipeThrough(new DecompressionStream("gzip"));
+  return new Response(stream).json();
+}
+
+function loadIndex() {
+  index ??= fetchJson("index.json.gz");
+  return index;
+}
+
+function queryTerms(query, maxTerm) {
+  return (query.toLowerCase().match(TERM) ?? []).filter(
+    (term) => [...term].length <= maxTerm,
+  );
+}
+
+function shardName(term, prefix) {
+  const bytes = new TextEncoder().encode([...term].slice(0, prefix).join(""));
+  return Array.from(bytes, (byte) => byte.toString(16).padStart(2, "0")).join(
+    "",
+  );
+}
+
+function loadShard(name) {
+  if (!shards.has(name)) {
+    shards.set(name, fetchJson(`${name}.json.gz`, {}));
+  }
+  return shards.get(name);
+}
+
+// [document delta, count, position deltas..., document delta, ...]
+function decode(encoded, postings = new Map()) {
+  let document = 0;
+  for (let i = 0; i < encoded.length; ) {
+    document += encoded[i++];
+    const count = encoded[i++];
+    const positions = postings.get(document) ?? [];
+    let position = 0;
+    for (let end = i + count; i < end; i++) {
+      position += encoded[i];
+      positions.push(position);
+    }
+    postings.set(document, positions);
+  }
+  return postings;
+}
+
+async function termPostings(term, available, index, expand) {
+  const name = shardName(term, index.prefix);
+  if (!available.has(name)) {
+    return new Map();
+  }
+  const shard = await loadShard(name);
+  if (!expand || [...term].length < index.prefix) {
+    return shard[term] ? decode(shard[term]) : new Map();
+  }
+  const postings = new Map();
+  for (const [candidate, encoded] of Object.entries(shard)) {
+    if (candidate.startsWith(term)) {
+      decode(encoded, postings);
+    }
+  }
+  for (const positions of postings.values()) {
+    positions.sort((a, b) => a - b);
+  }
+  return postings;
+}
+
+// Pages containing every term, best first. With `prefix` the last term
+// also matches longer words, for search-as-you-type.
+export async function search(query, { limit = 10, prefix = false } = {}) {
+  const index = await loadIndex();
+  const terms = queryTerms(query, index.max_term);
+  if (terms.length === 0) {
+    return [];
+  }
+  const available = new Set(index.shards);
+  const lists = await Promise.all(
+    terms.map((term, i) =>
+      termPostings(term, available, index, prefix && i === terms.length - 1),
+    ),
+  );
+  const smallest = lists.reduce((a, b) => (b.size < a.size ? b : a));
+  const results = [];
+  for (const document of smallest.keys()) {
+    const page = index.pages[document];
+    if (!page || !lists.every((postings) => postings.has(document))) {
+      continue;
+    }
+    let score = 0;
+    for (const postings of lists) {
+      score += Math.log1p(postings.get(document).length);
+    }
+    results.push({
+      url: page[0],
+      title: page[1],
+      score: score + 2 * phrases(lists, document),
+    });
+  }
+  results.sort((a, b) => b.score - a.score);
+  return results.slice(0, limit);
+}
+
+// Positions count words, so the query as a phrase is a run of
+// consecutive positions starting at any occurrence of its first term.
+function phrases(lists, document) {
+  if (lists.length < 2) {
+    return 0;
+  }
+  let starts = lists[0].get(document);
+  for (let k = 1; k < lists.length && starts.length > 0; k++) {
+    const positions = new Set(lists[k].get(document));
+    starts = starts.filter((position) => positions.has(position + k));
+  }
+  return starts.length;
+}
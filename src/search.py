@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Iterable
+from pathlib import Path
+from typing import cast
+
+import patterns
+from htmlnode import HTMLNode
+from links import rewrite_url
+from manifest import CACHE_DIR, load_blob, save_blob, text_digest
+from postbuild import gzip_compress
+from sinks import DiskSink, OutputSink
+from siteindex import SiteIndex
+
+SEARCH_VERSION = 3
+SEARCH_DIRECTORY = "search"
+SHARD_PREFIX = 2
+SHARD_SUFFIX = ".json.gz"
+INDEX_NAME = f"index{SHARD_SUFFIX}"
+MAX_TERM = 64
+LOADER = Path(__file__).with_name("search.js")
+
+type PageTerms = dict[str, list[int]]
+type Postings = dict[int, list[int]]
+type SearchState = tuple[
+    int,
+    dict[str, Postings],
+    dict[str, tuple[int, str, list[str]]],
+    dict[str, str],
+]
+
+
+def shard_name(term: str, prefix_length: int = SHARD_PREFIX) -> str:
+    # Terms sharing a prefix share a shard, so the loader can also
+    # expand the last word of a query without fetching anything else.
+    return term[:prefix_length].encode("utf-8").hex()
+
+
+def encode_postings(postings: Postings) -> list[int]:
+    encoded: list[int] = []
+    previous = 0
+    for document in sorted(postings):
+        positions = postings[document]
+        encoded.append(document - previous)
+        encoded.append(len(positions))
+        previous = document
+        position = 0
+        for current in positions:
+            encoded.append(current - position)
+            position = current
+    return encoded
+
+
+def decode_postings(encoded: list[int]) -> Postings:
+    postings: Postings = {}
+    document = 0
+    index = 0
+    while index < len(encoded):
+        document += encoded[index]
+        count = encoded[index + 1]
+        index += 2
+        position = 0
+        positions: list[int] = []
+        for delta in encoded[index : index + count]:
+            position += delta
+            positions.append(position)
+        postings[document] = positions
+        index += count
+    return postings
+
+
+def json_bytes(value: object) -> bytes:
+    return json.dumps(
+        value, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def compressed_json(value: object) -> bytes:
+    # search.js inflates these itself, so no server setup is needed.
+    return gzip_compress(json_bytes(value))
+
+
+class TermCollector:
+    __slots__: tuple[str, ...] = ("terms", "position", "indexed_digest")
+
+    def __init__(self, indexed_digest: str | None = None) -> None:
+        self.terms: PageTerms = {}
+        self.position: int = 0
+        self.indexed_digest: str | None = indexed_digest
+
+    def add_text(self, text: str) -> None:
+        terms = self.terms
+        words: list[str] = patterns.SEARCH_TERM.findall(text.lower())
+        for position, term in enumerate(words, self.position):
+            positions = terms.get(term)
+            if positions is None:
+                terms[term] = [position]
+            else:
+                positions.append(position)
+        self.position += len(words)
+
+    def add_node(self, node: HTMLNode) -> None:
+        # Inline runs of one block are joined as they render, so
+        # "**bold**er" is the single word "bolder".
+        text: list[str] = []
+        pending = [node]
+        while pending:
+            current = pending.pop()
+            if current.value is not None:
+                text.append(current.value)
+            else:
+                pending.extend(reversed(current.children))
+        self.add_text("".join(text))
+        # Phrases never run from one block into the next.
+        self.position += 1
+
+    def add_tree(self, tree: HTMLNode) -> None:
+        for child in tree.children:
+            self.add_node(child)
+
+
+class SearchIndex:
+    def __init__(
+        self,
+        public_dir: Path,
+        path_prefix: str,
+        prefix_length: int = SHARD_PREFIX,
+    ) -> None:
+        self.public_dir: Path = public_dir
+        self.directory: Path = public_dir.joinpath(SEARCH_DIRECTORY)
+        self.path_prefix: str = path_prefix
+        self.prefix_length: int = prefix_length
+        self.path: Path = CACHE_DIR.joinpath(
+            f"search-{text_digest(str(public_dir))[:16]}"
+        ).absolute()
+        self.postings: dict[str, Postings] = {}
+        self.pages: dict[str, tuple[int, str, list[str]]] = {}
+        self.documents: dict[int, str] = {}
+        self.files: dict[str, str] = {}
+        self.dirty: set[str] = set()
+        self.next_document: int = 0
+        self.indexed_count: int = 0
+        self.written_count: int = 0
+        self.sink: OutputSink | None = None
+        self._load()
+
+    def _load(self) -> None:
+        state = load_blob(self.path, SEARCH_VERSION)
+        if state is None:
+            return
+        prefix_length, postings, pages, files = cast(SearchState, state)
+        self.postings = postings
+        self.pages = pages
+        self.documents = {
+            document: key for key, (document, _, _) in pages.items()
+        }
+        self.files = files
+        if prefix_length != self.prefix_length:
+            # Rewrite every shard and delete the ones named the old way.
+            self.dirty = {
+                shard_name(term, self.prefix_length) for term in postings
+            } | set(self.shard_names())
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self.public_dir).as_posix()
+
+    def shard_names(self) -> list[str]:
+        return sorted(
+            name.removesuffix(SHARD_SUFFIX)
+            for name in self.files
+            if name not in (INDEX_NAME, "search.js")
+        )
+
+    def collector(self, destination: Path) -> TermCollector:
+        previous = self.pages.get(self._key(destination))
+        return TermCollector(previous[1] if previous is not None else None)
+
+    def digests(self) -> dict[str, str]:
+        return {key: digest for key, (_, digest, _) in self.pages.items()}
+
+    def kept_outputs(self) -> set[str]:
+        return {str(self.directory)} | {
+            str(self.directory.joinpath(name)) for name in self.files
+        }
+
+    def record(self, destination: Path, digest: str, terms: PageTerms) -> None:
+        key = self._key(destination)
+        previous = self.pages.get(key)
+        # Tokens depend only on the markdown, so an unchanged digest means
+        # a re-render for another reason (template, prefix) left them alone.
+        if previous is not None and previous[1] == digest:
+            return
+        terms = {
+            term: positions
+            for term, positions in terms.items()
+            if len(term) <= MAX_TERM
+        }
+        if previous is not None:
+            document = previous[0]
+            self._drop(
+                document, [term for term in previous[2] if term not in terms]
+            )
+        else:
+            while self.next_document in self.documents:
+                self.next_document += 1
+            document = self.next_document
+            self.documents[document] = key
+        # Only shards whose postings differ need encoding again.
+        for term, positions in terms.items():
+            postings = self.postings.setdefault(term, {})
+            if postings.get(document) != positions:
+                postings[document] = positions
+                self.dirty.add(shard_name(term, self.prefix_length))
+        self.pages[key] = (document, digest, sorted(terms))
+        self.indexed_count += 1
+
+    def _drop(self, document: int, terms: list[str]) -> None:
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            _ = postings.pop(document, None)
+            if not postings:
+                del self.postings[term]
+            self.dirty.add(shard_name(term, self.prefix_length))
+
+    def remove(self, key: str) -> None:
+        previous = self.pages.pop(key, None)
+        if previous is None:
+            return
+        self._drop(previous[0], previous[2])
+        del self.documents[previous[0]]
+
+    def prune(self, keys: Iterable[str]) -> None:
+        for key in self.pages.keys() - keys:
+            self.remove(key)
+
+    def shards(self) -> dict[str, bytes]:
+        terms: dict[str, list[str]] = {name: [] for name in self.dirty}
+        for term in self.postings:
+            name = shard_name(term, self.prefix_length)
+            if name in terms:
+                terms[name].append(term)
+        return {
+            name: compressed_json(
+                {
+                    term: encode_postings(self.postings[term])
+                    for term in sorted(shard)
+                }
+            )
+            for name, shard in terms.items()
+            if shard
+        }
+
+    def table(self, index: SiteIndex) -> bytes:
+        outputs = {entry.output: entry for entry in index.pages.values()}
+        root = rewrite_url("/", self.path_prefix).rstrip("/")
+        pages: list[list[str | None] | None] = [None] * (
+            max(self.documents, default=-1) + 1
+        )
+        for document, key in self.documents.items():
+            entry = outputs.get(key)
+            if entry is not None:
+                pages[document] = [
+                    root + entry.url,
+                    entry.title,
+                ]
+        return compressed_json(
+            {
+                "version": SEARCH_VERSION,
+                "prefix": self.prefix_length,
+                "max_term": MAX_TERM,
+                "shards": self.shard_names(),
+                "pages": pages,
+            }
+        )
+
+    def write(
+        self, index: SiteIndex, sink: OutputSink | None = None
+    ) -> list[Path]:
+        if sink is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Builds without --search prune the directory as unknown output.
+            self.dirty.update(
+                name
+                for name in self.shard_names()
+                if not self.directory.joinpath(
+                    f"{name}{SHARD_SUFFIX}"
+                ).is_file()
+            )
+        elif sink is not self.sink:
+            # A fresh sink holds none of the files written last time.
+            self.sink = sink
+            self.files = {}
+            self.dirty = {
+                shard_name(term, self.prefix_length) for term in self.postings
+            }
+        self.written_count = 0
+        shards = self.shards()
+        for name in self.dirty - shards.keys():
+            if self.files.pop(f"{name}{SHARD_SUFFIX}", None) is not None:
+                self.directory.joinpath(f"{name}{SHARD_SUFFIX}").unlink(
+                    missing_ok=True
+                )
+        for name, data in shards.items():
+            self._write(f"{name}{SHARD_SUFFIX}", data, sink)
+        self._write(INDEX_NAME, self.table(index), sink)
+        self._write("search.js", LOADER.read_bytes(), sink)
+        self.dirty = set()
+        return [self.directory.joinpath(name) for name in sorted(self.files)]
+
+    def _write(self, name: str, data: bytes, sink: OutputSink | None) -> None:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.directory.joinpath(name)
+        if sink is None:
+            if self.files.get(name) == digest and path.is_file():
+                return
+            sink = DiskSink()
+        sink.write_bytes(path, data)
+        self.files[name] = digest
+        self.written_count += 1
+
+    def save(self) -> None:
+        state: SearchState = (
+            self.prefix_length,
+            self.postings,
+            self.pages,
+            self.files,
+        )
+        _ = save_blob(self.path, SEARCH_VERSION, state)
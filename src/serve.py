@@ -0,0 +1,475 @@
+import argparse
+import os
+import posixpath
+import socket
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import replace
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import BaseServer
+from typing import override
+from urllib.parse import unquote, urlsplit
+
+from main import (
+    BuildContext,
+    content_generation,
+    delete_action,
+    delete_logger,
+    generate_page_action,
+    generate_page_logger,
+    write_site_outputs,
+)
+from parsecache import ParseCache
+from sinks import MemorySink
+from siteindex import SiteIndex
+from sync import AssetSync
+
+RELOAD_PATH = "/__livereload"
+RELOAD_SCRIPT = (
+    b'<script>new EventSource("'
+    + RELOAD_PATH.encode()
+    + b'").addEventListener("reload", () => location.reload());</script>'
+)
+
+
+class LiveReload:
+    def __init__(self) -> None:
+        self.version: int = 0
+        self._condition: threading.Condition = threading.Condition()
+
+    def notify(self) -> None:
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+
+    def wait(self, version: int, timeout: float) -> int:
+        with self._condition:
+            _ = self._condition.wait_for(
+                lambda: self.version != version, timeout
+            )
+            return self.version
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    def __init__(
+        self,
+        reloader: LiveReload | None,
+        path_prefix: str,
+        request: socket.socket,
+        client_address: tuple[str, int],
+        server: BaseServer,
+        directory: str | None = None,
+    ) -> None:
+        self.reloader: LiveReload | None = reloader
+        self.path_prefix: str = path_prefix.strip("/")
+        super().__init__(request, client_address, server, directory=directory)
+
+    @override
+    def translate_path(self, path: str) -> str:
+        return super().translate_path(strip_prefix(path, self.path_prefix))
+
+    @override
+    def do_GET(self) -> None:
+        if self.reloader is None:
+            super().do_GET()
+            return
+        if self.path == RELOAD_PATH:
+            self.send_reload_events(self.reloader)
+            return
+        path = Path(self.translate_path(self.path))
+        if path.is_dir() and self.path.endswith("/"):
+            path = path.joinpath("index.html")
+        if path.suffix != ".html" or not path.is_file():
+            super().do_GET()
+            return
+        html = with_reload_script(path.read_bytes())
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(html)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        _ = self.wfile.write(html)
+
+    def send_reload_events(self, reloader: LiveReload) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        version = reloader.version
+        try:
+            while True:
+                next_version = reloader.wait(version, 15)
+                if next_version == version:
+                    _ = self.wfile.write(b": keep-alive\n\n")
+                else:
+                    version = next_version
+                    _ = self.wfile.write(
+                        f"event: reload\ndata: {version}\n\n".encode()
+                    )
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+
+class MemoryHandler(LiveReloadHandler):
+    def __init__(
+        self,
+        site: MemorySink,
+        reloader: LiveReload | None,
+        path_prefix: str,
+        request: socket.socket,
+        client_address: tuple[str, int],
+        server: BaseServer,
+    ) -> None:
+        self.site: MemorySink = site
+        super().__init__(
+            reloader, path_prefix, request, client_address, server
+        )
+
+    @override
+    def do_GET(self) -> None:
+        if self.reloader is not None and self.path == RELOAD_PATH:
+            self.send_reload_events(self.reloader)
+            return
+        self.send_file(True)
+
+    @override
+    def do_HEAD(self) -> None:
+        self.send_file(False)
+
+    def send_file(self, body: bool) -> None:
+        path = strip_prefix(
+            unquote(urlsplit(self.path).path), self.path_prefix
+        )
+        key = posixpath.normpath(path).lstrip("/")
+        if key == ".":
+            key = ""
+        if path.endswith("/") or not key:
+            key = posixpath.join(key, "index.html")
+        data = self.site.get(key)
+        if data is None:
+            if self.site.get(f"{key}/index.html") is None:
+                self.send_error(404, "File not found")
+                return
+            self.send_response(301)
+            self.send_header("Location", f"{urlsplit(self.path).path}/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.reloader is not None and key.endswith(".html"):
+            data = with_reload_script(data)
+        self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(key))
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if body:
+            _ = self.wfile.write(data)
+
+
+def strip_prefix(path: str, path_prefix: str) -> str:
+    prefix = f"/{path_prefix}"
+    if path_prefix and (path == prefix or path.startswith(f"{prefix}/")):
+        return path[len(prefix) :] or "/"
+    return path
+
+
+def with_reload_script(html: bytes) -> bytes:
+    body_end = html.rfind(b"</body>")
+    if body_end == -1:
+        return html + RELOAD_SCRIPT
+    return html[:body_end] + RELOAD_SCRIPT + html[body_end:]
+
+
+type Build = Callable[[], tuple[BuildContext, SiteIndex]]
+
+
+def build_in_memory(
+    path_prefix: str | None,
+    site: MemorySink,
+    site_url: str | None = None,
+    feed_section: str = "blog",
+    feed_author: str | None = None,
+    search: bool = False,
+) -> tuple[BuildContext, SiteIndex]:
+    # Readers keep the old files until the new build is swapped in whole.
+    fresh = MemorySink(site.root)
+    context, index = content_generation(
+        path_prefix,
+        str(site.root),
+        cache=ParseCache(),
+        sink=fresh,
+        site_url=site_url,
+        feed_section=feed_section,
+        feed_author=feed_author,
+        search=search,
+    )
+    # Both sinks now share one dict, so rebuilds can keep writing to fresh.
+    site.files = fresh.files
+    return context, index
+
+
+def snapshot(roots: list[Path]) -> dict[Path, tuple[int, int]]:
+    files: dict[Path, tuple[int, int]] = {}
+    directories: list[str] = []
+    for root in roots:
+        if root.is_file():
+            stat = root.stat()
+            files[root] = (stat.st_mtime_ns, stat.st_size)
+        elif root.is_dir():
+            directories.append(str(root))
+    while directories:
+        try:
+            entries = list(os.scandir(directories.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                directories.append(entry.path)
+            elif entry.is_file():
+                stat = entry.stat()
+                files[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def rebuild(
+    changed: list[Path],
+    removed: list[Path],
+    public_dir: Path,
+    context: BuildContext,
+    index: SiteIndex,
+) -> None:
+    static_dir = Path("static").absolute()
+    content_dir = Path("content").absolute()
+    sink = context.sink
+    assets = AssetSync(sink=sink)
+    for source in sorted(changed):
+        if source.is_relative_to(static_dir):
+            destination = public_dir.joinpath(source.relative_to(static_dir))
+            if sink is None:
+                destination.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                assets.sync_file(source, destination)
+            except Exception as e:
+                assets.log(source, destination, None, e)
+        elif source.is_relative_to(content_dir):
+            destination = public_dir.joinpath(source.relative_to(content_dir))
+            if sink is None:
+                destination.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                generate_page_action(source, destination, context)
+                generate_page_logger(source, destination, None, context)
+            except Exception as e:
+                generate_page_logger(source, destination, e, context)
+            relative = source.relative_to(content_dir)
+            _ = index.update_page(
+                source,
+                relative.as_posix(),
+                relative.with_suffix(".html").as_posix(),
+            )
+    for source in removed:
+        if source.is_relative_to(static_dir):
+            destination = public_dir.joinpath(source.relative_to(static_dir))
+        elif source.is_relative_to(content_dir):
+            destination = public_dir.joinpath(
+                source.relative_to(content_dir)
+            ).with_suffix(".html")
+            index.remove(source.relative_to(content_dir).as_posix())
+            if context.search is not None:
+                context.search.remove(
+                    destination.relative_to(public_dir).as_posix()
+                )
+        else:
+            continue
+        if isinstance(sink, MemorySink):
+            sink.remove(destination)
+        elif destination.is_file():
+            try:
+                delete_action(destination, None, None)
+                delete_logger(destination, None, None, None)
+            except Exception as e:
+                delete_logger(destination, None, e, None)
+    index.save()
+
+
+def watch(
+    public_dir: Path,
+    reloader: LiveReload,
+    interval: float,
+    build: Build,
+    context: BuildContext,
+    index: SiteIndex,
+) -> None:
+    template_path = Path("template.html").absolute()
+    roots = [
+        Path("content").absolute(),
+        Path("static").absolute(),
+        template_path,
+    ]
+    # Single-file rebuilds bypass the manifest; the next full build
+    # compares every page against it again.
+    context = replace(context, manifest=None, profiler=None)
+    previous = snapshot(roots)
+    while True:
+        time.sleep(interval)
+        current = snapshot(roots)
+        if current == previous:
+            continue
+        changed = [
+            path
+            for path, stat in current.items()
+            if previous.get(path) != stat
+        ]
+        removed = [path for path in previous if path not in current]
+        previous = current
+        start = time.perf_counter()
+        if template_path in changed:
+            context, index = build()
+            context = replace(context, manifest=None, profiler=None)
+        else:
+            rebuild(changed, removed, public_dir, context, index)
+            _ = write_site_outputs(context, index, public_dir)
+        reloader.notify()
+        print(
+            (
+                f"Rebuilt {len(changed) + len(removed)} changed files in "
+                f"{(time.perf_counter() - start) * 1000:.1f} ms"
+            )
+        )
+
+
+class Arguments(argparse.Namespace):
+    path_prefix: str | None = None
+    destination: str = "public"
+    watch: bool = False
+    in_memory: bool = False
+    site_url: str | None = None
+    feed_section: str = "blog"
+    feed_author: str | None = None
+    search: bool = False
+    port: int = 8888
+    interval: float = 0.05
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build the site and serve it, rebuilding on change"
+    )
+    _ = parser.add_argument("path_prefix", nargs="?", default=None)
+    _ = parser.add_argument("destination", nargs="?", default="public")
+    _ = parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="rebuild changed files and reload open browsers",
+    )
+    _ = parser.add_argument(
+        "--in-memory",
+        action="store_true",
+        help=(
+            "build into memory and serve from there without writing the "
+            "destination"
+        ),
+    )
+    _ = parser.add_argument(
+        "--site-url",
+        default=None,
+        metavar="URL",
+        help="absolute site URL; enables sitemap.xml and an Atom feed",
+    )
+    _ = parser.add_argument(
+        "--feed-section",
+        default="blog",
+        metavar="DIRECTORY",
+        help="content directory whose pages make up the Atom feed",
+    )
+    _ = parser.add_argument(
+        "--feed-author",
+        default=None,
+        metavar="NAME",
+        help="Atom feed author; pages can override it with an author field",
+    )
+    _ = parser.add_argument(
+        "--search",
+        action="store_true",
+        help=(
+            "write a sharded full-text search index and search.js loader "
+            "to search/"
+        ),
+    )
+    _ = parser.add_argument("--port", type=int, default=8888)
+    _ = parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.05,
+        help="seconds between checks for changed files",
+    )
+    arguments = parser.parse_args(namespace=Arguments())
+    public_dir = Path(arguments.destination).absolute()
+    site = MemorySink(public_dir) if arguments.in_memory else None
+    build: Build = (
+        partial(
+            build_in_memory,
+            arguments.path_prefix,
+            site,
+            arguments.site_url,
+            arguments.feed_section,
+            arguments.feed_author,
+            arguments.search,
+        )
+        if site is not None
+        else partial(
+            content_generation,
+            arguments.path_prefix,
+            str(public_dir),
+            incremental=True,
+            site_url=arguments.site_url,
+            feed_section=arguments.feed_section,
+            feed_author=arguments.feed_author,
+            search=arguments.search,
+        )
+    )
+    context, index = build()
+    reloader = LiveReload() if arguments.watch else None
+    if reloader is not None:
+        _ = threading.Thread(
+            target=watch,
+            args=(
+                public_dir,
+                reloader,
+                arguments.interval,
+                build,
+                context,
+                index,
+            ),
+            daemon=True,
+        ).start()
+    server = ThreadingHTTPServer(
+        ("", arguments.port),
+        (
+            partial(
+                MemoryHandler, site, reloader, arguments.path_prefix or ""
+            )
+            if site is not None
+            else partial(
+                LiveReloadHandler,
+                reloader,
+                arguments.path_prefix or "",
+                directory=str(public_dir),
+            )
+        ),
+    )
+    source = "memory" if site is not None else public_dir
+    print(f"Serving {source} on http://localhost:{arguments.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
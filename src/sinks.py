@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import io
+import os
+import shutil
+import tarfile
+import time
+import zipfile
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Literal, TextIO, override
+
+type TarMode = Literal["w", "w:gz", "w:bz2", "w:xz"]
+type ArchiveMode = Literal["zip"] | TarMode
+
+ARCHIVE_MODES: dict[str, ArchiveMode] = {
+    ".zip": "zip",
+    ".tar": "w",
+    ".tar.gz": "w:gz",
+    ".tgz": "w:gz",
+    ".tar.bz2": "w:bz2",
+    ".tar.xz": "w:xz",
+}
+
+
+def archive_mode(path: Path) -> ArchiveMode:
+    name = path.name.lower()
+    for suffix, mode in ARCHIVE_MODES.items():
+        if name.endswith(suffix):
+            return mode
+    raise ValueError(
+        f"Archive {path} must end in one of {', '.join(ARCHIVE_MODES)}"
+    )
+
+
+def temporary_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+
+@contextmanager
+def replacing(path: Path) -> Generator[Path]:
+    # A failed write keeps the previous file, and renaming into place
+    # never writes through a hardlink left by the asset sync.
+    temporary = temporary_path(path)
+    try:
+        yield temporary
+        os.replace(temporary, path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+class OutputSink:
+    @contextmanager
+    def open_text(self, path: Path) -> Generator[TextIO]:
+        # Only a page that rendered without raising reaches the sink.
+        buffer = io.StringIO()
+        yield buffer
+        self.write_bytes(path, buffer.getvalue().encode("utf-8"))
+
+    def write_bytes(self, _path: Path, _data: bytes) -> None:
+        raise NotImplementedError()
+
+    def copy_file(self, source: Path, path: Path) -> None:
+        self.write_bytes(path, source.read_bytes())
+
+    def is_dir(self, _path: Path) -> bool:
+        raise NotImplementedError()
+
+    def size(self, _path: Path) -> int:
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        pass
+
+
+class DiskSink(OutputSink):
+    @override
+    @contextmanager
+    def open_text(self, path: Path) -> Generator[TextIO]:
+        with (
+            replacing(path) as temporary,
+            open(temporary, "w", encoding="utf-8") as file,
+        ):
+            yield file
+
+    @override
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        with replacing(path) as temporary:
+            _ = temporary.write_bytes(data)
+
+    @override
+    def copy_file(self, source: Path, path: Path) -> None:
+        path.unlink(missing_ok=True)
+        _ = shutil.copy2(source, path)
+
+    @override
+    def is_dir(self, path: Path) -> bool:
+        return path.is_dir()
+
+    @override
+    def size(self, path: Path) -> int:
+        return path.stat().st_size
+
+
+class MemorySink(OutputSink):
+    def __init__(self, root: Path) -> None:
+        self.root: Path = root.absolute()
+        self.files: dict[str, bytes] = {}
+
+    def key(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    @override
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        self.files[self.key(path)] = data
+
+    @override
+    def is_dir(self, path: Path) -> bool:
+        prefix = f"{self.key(path)}/"
+        return path == self.root or any(
+            key.startswith(prefix) for key in self.files
+        )
+
+    @override
+    def size(self, path: Path) -> int:
+        return len(self.files[self.key(path)])
+
+    def get(self, key: str) -> bytes | None:
+        return self.files.get(key)
+
+    def remove(self, path: Path) -> None:
+        _ = self.files.pop(self.key(path), None)
+
+
+class ArchiveSink(OutputSink):
+    def __init__(self, root: Path, path: Path) -> None:
+        self.root: Path = root.absolute()
+        self.path: Path = path
+        mode = archive_mode(path)
+        self.mode: ArchiveMode = mode
+        self.sizes: dict[str, int] = {}
+        self.zip: zipfile.ZipFile | None = None
+        self.tar: tarfile.TarFile | None = None
+        if mode == "zip":
+            self.zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED)
+        else:
+            self.tar = tarfile.open(path, mode)
+
+    def key(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    @override
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        key = self.key(path)
+        if self.zip is not None:
+            self.zip.writestr(
+                zipfile.ZipInfo(key, time.localtime()[:6]),
+                data,
+                zipfile.ZIP_DEFLATED,
+            )
+        elif self.tar is not None:
+            info = tarfile.TarInfo(key)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self.tar.addfile(info, io.BytesIO(data))
+        self.sizes[key] = len(data)
+
+    @override
+    def copy_file(self, source: Path, path: Path) -> None:
+        key = self.key(path)
+        if self.zip is not None:
+            self.zip.write(source, key)
+        elif self.tar is not None:
+            self.tar.add(source, key)
+        self.sizes[key] = source.stat().st_size
+
+    @override
+    def is_dir(self, path: Path) -> bool:
+        prefix = f"{self.key(path)}/"
+        return path == self.root or any(
+            key.startswith(prefix) for key in self.sizes
+        )
+
+    @override
+    def size(self, path: Path) -> int:
+        return self.sizes[self.key(path)]
+
+    @override
+    def close(self) -> None:
+        if self.zip is not None:
+            self.zip.close()
+        if self.tar is not None:
+            self.tar.close()
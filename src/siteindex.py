@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import heapq
+import os
+from collections.abc import Iterable
+from pathlib import Path, PurePosixPath
+from typing import cast, override
+
+import blocks
+from frontmatter import FrontMatter, read_front_matter
+from manifest import CACHE_DIR, load_blob, save_blob
+from planner import Task, TaskType
+
+INDEX_VERSION = 1
+
+type EntryData = tuple[
+    str,
+    str,
+    str | None,
+    str | None,
+    list[str],
+    str,
+    FrontMatter,
+    tuple[int, int],
+]
+
+
+def page_slug(source: str) -> str:
+    path = PurePosixPath(source)
+    if path.stem == "index":
+        return path.parent.name
+    return path.stem
+
+
+def field_tags(value: str | list[str] | None) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [tag.strip() for tag in value.split(",") if tag.strip()]
+    return value
+
+
+def section_order(entry: PageEntry) -> tuple[str, str]:
+    return entry.date or "", entry.source
+
+
+class PageEntry:
+    __slots__: tuple[str, ...] = (
+        "source",
+        "output",
+        "title",
+        "date",
+        "tags",
+        "slug",
+        "fields",
+        "signature",
+    )
+
+    def __init__(
+        self,
+        source: str,
+        output: str,
+        title: str | None,
+        date: str | None,
+        tags: list[str],
+        slug: str,
+        fields: FrontMatter,
+        signature: tuple[int, int],
+    ) -> None:
+        self.source: str = source
+        self.output: str = output
+        self.title: str | None = title
+        self.date: str | None = date
+        self.tags: list[str] = tags
+        self.slug: str = slug
+        self.fields: FrontMatter = fields
+        self.signature: tuple[int, int] = signature
+
+    @staticmethod
+    def read(
+        path: Path, source: str, output: str, stat: os.stat_result
+    ) -> PageEntry:
+        with open(path, "r", encoding="utf-8") as file:
+            fields, lines = read_front_matter(blocks.iter_lines(file))
+            title = fields.get("title")
+            if not isinstance(title, str):
+                title = blocks.find_title(lines)
+        date = fields.get("date")
+        slug = fields.get("slug")
+        return PageEntry(
+            source,
+            output,
+            title,
+            date if isinstance(date, str) else None,
+            field_tags(fields.get("tags")),
+            slug if isinstance(slug, str) else page_slug(source),
+            fields,
+            (stat.st_mtime_ns, stat.st_size),
+        )
+
+    @property
+    def url(self) -> str:
+        if self.output == "index.html":
+            return "/"
+        if self.output.endswith("/index.html"):
+            return f"/{self.output[: -len('index.html')]}"
+        return f"/{self.output}"
+
+    def to_data(self) -> EntryData:
+        return (
+            self.source,
+            self.output,
+            self.title,
+            self.date,
+            self.tags,
+            self.slug,
+            self.fields,
+            self.signature,
+        )
+
+    @override
+    def __repr__(self) -> str:
+        return f"PageEntry({repr(self.source)}, {repr(self.output)})"
+
+
+class SiteIndex:
+    def __init__(self, path: Path | None = None) -> None:
+        self.path: Path = (
+            path if path is not None else CACHE_DIR.joinpath("index")
+        ).absolute()
+        self.pages: dict[str, PageEntry] = {}
+        self.changed: bool = False
+        self.read_count: int = 0
+        self._load()
+
+    def _load(self) -> None:
+        entries = load_blob(self.path, INDEX_VERSION)
+        if entries is None:
+            return
+        for data in cast(list[EntryData], entries):
+            entry = PageEntry(*data)
+            self.pages[entry.source] = entry
+
+    def update(
+        self, plan: Iterable[Task], content_dir: Path, public_dir: Path
+    ) -> None:
+        seen: set[str] = set()
+        for task in plan:
+            if task.task_type is not TaskType.RENDER or task.source is None:
+                continue
+            source = Path(task.source)
+            entry = self.update_page(
+                source,
+                source.relative_to(content_dir).as_posix(),
+                Path(task.destination).relative_to(public_dir).as_posix(),
+                task.source_stat,
+            )
+            if entry is not None:
+                seen.add(entry.source)
+        for source in self.pages.keys() - seen:
+            self.remove(source)
+
+    def update_page(
+        self,
+        path: Path,
+        source: str,
+        output: str,
+        stat: os.stat_result | None = None,
+    ) -> PageEntry | None:
+        try:
+            if stat is None:
+                stat = os.stat(path)
+            previous = self.pages.get(source)
+            if (
+                previous is not None
+                and previous.output == output
+                and previous.signature == (stat.st_mtime_ns, stat.st_size)
+            ):
+                return previous
+            entry = PageEntry.read(path, source, output, stat)
+        except (OSError, UnicodeDecodeError):
+            self.remove(source)
+            return None
+        self.read_count += 1
+        self.pages[source] = entry
+        self.changed = True
+        return entry
+
+    def remove(self, source: str) -> None:
+        if self.pages.pop(source, None) is not None:
+            self.changed = True
+
+    def section(
+        self, directory: str, limit: int | None = None
+    ) -> list[PageEntry]:
+        prefix = f"{directory.strip('/')}/"
+        listing = f"{prefix}index.md"
+        entries = (
+            entry
+            for entry in self.pages.values()
+            if entry.source.startswith(prefix) and entry.source != listing
+        )
+        if limit is not None:
+            return heapq.nlargest(limit, entries, key=section_order)
+        return sorted(entries, key=section_order, reverse=True)
+
+    def save(self) -> None:
+        if not self.changed:
+            return
+        entries = [
+            self.pages[source].to_data() for source in sorted(self.pages)
+        ]
+        if save_blob(self.path, INDEX_VERSION, entries):
+            self.changed = False
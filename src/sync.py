@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import os
+import shutil
+import traceback
+from pathlib import Path
+
+from manifest import Manifest, file_digest
+from planner import Task, TaskType, plan_build
+from sinks import OutputSink
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+FICLONE = 0x40049409
+
+
+def stat_signature(stat: os.stat_result) -> str:
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def reflink(source: str, destination: str) -> None:
+    if fcntl is None:
+        raise OSError("Reflinks are not supported on this platform")
+    with open(source, "rb") as source_file:
+        with open(destination, "wb") as destination_file:
+            _ = fcntl.ioctl(
+                destination_file.fileno(), FICLONE, source_file.fileno()
+            )
+    shutil.copystat(source, destination)
+
+
+def place_file(source: str, destination: str, link_mode: str) -> str:
+    # Always replace the old output rather than writing through it, since it
+    # may be a hardlink back into static/.
+    try:
+        os.unlink(destination)
+    except FileNotFoundError:
+        pass
+    if link_mode == "hardlink":
+        try:
+            os.link(source, destination)
+            return "hardlink"
+        except OSError:
+            pass
+    elif link_mode == "reflink":
+        try:
+            reflink(source, destination)
+            return "reflink"
+        except OSError:
+            try:
+                os.unlink(destination)
+            except FileNotFoundError:
+                pass
+    _ = shutil.copy2(source, destination)
+    return "copy"
+
+
+class AssetSync:
+    def __init__(
+        self,
+        link_mode: str = "copy",
+        checksum: bool = False,
+        manifest: Manifest | None = None,
+        sink: OutputSink | None = None,
+    ) -> None:
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Link mode {link_mode} not recognized")
+        self.link_mode: str = link_mode
+        self.checksum: bool = checksum
+        self.manifest: Manifest | None = manifest
+        self.sink: OutputSink | None = sink
+        self.placed: int = 0
+        self.skipped: int = 0
+
+    def sync_tree(self, source_dir: Path, destination_dir: Path) -> None:
+        for task in plan_build(destination_dir, source_dir, prune=False):
+            self.run(task)
+
+    def run(self, task: Task) -> None:
+        try:
+            if self.sink is not None:
+                self.sink_entry(task)
+            elif task.task_type is TaskType.DELETE:
+                os.unlink(task.destination)
+                print(f"Deleting {task.destination}")
+            elif task.task_type is TaskType.RMDIR:
+                os.rmdir(task.destination)
+                print(f"Deleting {task.destination}")
+            elif task.task_type is TaskType.MKDIR:
+                if task.destination_stat is None:
+                    try:
+                        os.mkdir(task.destination)
+                    except FileNotFoundError:
+                        os.makedirs(task.destination)
+                    print(f"Creating directory {task.destination}")
+            elif task.task_type is TaskType.COPY:
+                if task.source is None or task.source_stat is None:
+                    raise ValueError("Cannot copy without a source")
+                self.sync_entry(
+                    task.source,
+                    task.source_stat,
+                    task.destination,
+                    task.destination_stat,
+                )
+            else:
+                raise ValueError(f"Cannot sync a {task.task_type} task")
+        except Exception as e:
+            self.log(
+                Path(task.source or task.destination),
+                Path(task.destination),
+                None,
+                e,
+            )
+
+    def sink_entry(self, task: Task) -> None:
+        # A sink has no directories and starts empty, so only copies remain.
+        if self.sink is None or task.task_type is not TaskType.COPY:
+            return
+        if task.source is None:
+            raise ValueError("Cannot copy without a source")
+        self.sink.copy_file(Path(task.source), Path(task.destination))
+        self.placed += 1
+        self.log(Path(task.source), Path(task.destination), "copy", None)
+
+    def sync_file(self, source: Path, destination: Path) -> None:
+        try:
+            destination_stat = os.stat(destination, follow_symlinks=False)
+        except FileNotFoundError:
+            destination_stat = None
+        self.sync_entry(
+            str(source), source.stat(), str(destination), destination_stat
+        )
+
+    def sync_entry(
+        self,
+        source: str,
+        source_stat: os.stat_result,
+        target: str,
+        previous: os.stat_result | None,
+    ) -> None:
+        destination = Path(target)
+        signature = self.signature(source, source_stat)
+        fresh = previous is not None and self.is_current(
+            source_stat, destination, previous, signature
+        )
+        mode = None
+        if fresh:
+            self.skipped += 1
+        else:
+            mode = place_file(source, target, self.link_mode)
+            self.placed += 1
+        if self.manifest is not None:
+            self.manifest.record(destination, signature, False, fresh)
+        self.log(Path(source), destination, mode, None)
+
+    def signature(self, source: str, source_stat: os.stat_result) -> str:
+        if self.checksum:
+            return file_digest(Path(source))
+        return stat_signature(source_stat)
+
+    def is_current(
+        self,
+        source_stat: os.stat_result,
+        destination: Path,
+        previous: os.stat_result,
+        signature: str,
+    ) -> bool:
+        if previous.st_size != source_stat.st_size:
+            return False
+        if not self.checksum:
+            return previous.st_mtime_ns == source_stat.st_mtime_ns
+        if self.manifest is not None:
+            previous_digest = self.manifest.previous_digest(destination, False)
+            if previous_digest is not None:
+                return previous_digest == signature
+        return file_digest(destination) == signature
+
+    def log(
+        self,
+        source: Path,
+        destination: Path,
+        mode: str | None,
+        exception: Exception | None,
+    ) -> None:
+        if exception is not None:
+            print(
+                f"Attempted to sync {source} to {destination} but encountered an exception"
+            )
+            traceback.print_exception(exception)
+        elif mode is None:
+            print(f"Skipping unchanged {destination}")
+        elif mode == "copy":
+            print(f"Copying from {source} to {destination}")
+        else:
+            print(f"Linking ({mode}) {destination} to {source}")
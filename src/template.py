@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+
+import patterns
+from htmlnode import HTMLNode
+from links import rewrite_links
+from manifest import text_digest
+
+
+class Template:
+    def __init__(self, text: str) -> None:
+        self.digest: str = text_digest(text)
+        self.literals: list[str] = []
+        self.slots: list[tuple[str, str]] = []
+        next_start = 0
+        for placeholder in patterns.TEMPLATE_SLOT.finditer(text):
+            self.literals.append(text[next_start : placeholder.start()])
+            self.slots.append((placeholder.group(1), placeholder.group()))
+            next_start = placeholder.end()
+        self.literals.append(text[next_start:])
+
+    @staticmethod
+    def load(path: Path, path_prefix: str | None = None) -> Template:
+        with open(path, "r", encoding="utf-8") as file:
+            text = file.read()
+        if path_prefix is not None:
+            text = rewrite_links(text, path_prefix)
+        return Template(text)
+
+    def render(self, values: Mapping[str, str | HTMLNode]) -> str:
+        return "".join(self.iter_render(values))
+
+    def iter_render(
+        self, values: Mapping[str, str | HTMLNode | Iterable[str]]
+    ) -> Iterator[str]:
+        yield self.literals[0]
+        for (name, placeholder), literal in zip(self.slots, self.literals[1:]):
+            value = values.get(name, placeholder)
+            if isinstance(value, HTMLNode):
+                yield from value.iter_html()
+            elif isinstance(value, str):
+                yield value
+            else:
+                yield from value
+            yield literal
@@ -0,0 +1,109 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from bench import (
+    Arguments,
+    bench_nodes,
+    compare_reports,
+    full_build,
+    synthetic_content,
+)
+
+
+def corpus_arguments(**overrides: object) -> Arguments:
+    arguments: dict[str, object] = {
+        "seed": 0,
+        "pages": 12,
+        "page_blocks": 10,
+        "depth": 2,
+        "list_density": 0.2,
+        "code_density": 0.2,
+        "quote_density": 0.2,
+        "link_density": 0.1,
+        "shared_density": 0.0,
+    }
+    arguments.update(overrides)
+    return Arguments(**arguments)
+
+
+class TestBench(unittest.TestCase):
+    def test_synthetic_content_is_reproducible(self):
+        with tempfile.TemporaryDirectory() as first:
+            with tempfile.TemporaryDirectory() as second:
+                pages = synthetic_content(Path(first), corpus_arguments())
+                again = synthetic_content(Path(second), corpus_arguments())
+        self.assertEqual(list(pages.values()), list(again.values()))
+        self.assertEqual(
+            [path.relative_to(first) for path in pages],
+            [path.relative_to(second) for path in again],
+        )
+        self.assertLessEqual(
+            max(len(path.relative_to(first).parts) for path in pages), 3
+        )
+
+    def test_shared_blocks_repeat_across_pages(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pages = synthetic_content(
+                Path(directory), corpus_arguments(shared_density=1.0)
+            )
+        blocks = [
+            block
+            for markdown in pages.values()
+            for block in markdown.split("\n\n")[1:]
+        ]
+        self.assertLessEqual(len(set(blocks)), 16)
+
+    def test_synthetic_content_builds(self):
+        with tempfile.TemporaryDirectory() as directory:
+            site = Path(directory)
+            pages = synthetic_content(
+                site.joinpath("content"), corpus_arguments()
+            )
+            site.joinpath("static").mkdir()
+            _ = site.joinpath("template.html").write_text(
+                "<title>{{ Title }}</title>{{ Content }}"
+            )
+            full_build(site, site.joinpath("public"), 1)
+            self.assertEqual(
+                len(list(site.joinpath("public").rglob("*.html"))), len(pages)
+            )
+
+    def test_nodes_reports_both_layouts(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            bench_nodes(Arguments(blocks=20, nodes=100, seed=0))
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[1].split(), ["unslotted", "slotted"])
+        self.assertEqual(
+            [line[:24].strip() for line in lines[2:]],
+            [
+                "from_markdown tree",
+                "LeafNode(None, text)",
+                "TextNode(text, PLAIN)",
+            ],
+        )
+        for line in lines[2:]:
+            self.assertEqual(line.count("/MB"), 2)
+
+    def test_compare_flags_regressions(self):
+        baseline = {
+            "results": {"a": {"best_ms": 10.0}, "b": {"best_ms": 10.0}}
+        }
+        current = {
+            "results": {
+                "a": {"best_ms": 10.5},
+                "b": {"best_ms": 12.0},
+                "c": {"best_ms": 1.0},
+            }
+        }
+        rows = compare_reports(baseline, current, 0.1)
+        self.assertEqual(
+            [(row[0], row[4]) for row in rows], [("a", False), ("b", True)]
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
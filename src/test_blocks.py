@@ -0,0 +1,125 @@
+import io
+import random
+import unittest
+
+import blocks
+from blocks import BlockType
+
+LINES = [
+    "",
+    "\r",
+    " ",
+    "# heading",
+    "## heading ",
+    "#heading",
+    "####### heading",
+    "```",
+    "```python",
+    "``` python \r",
+    "> quote",
+    ">",
+    ">quote",
+    "1. item",
+    "1.",
+    "12. item",
+    "* item",
+    "*",
+    "**bold** text",
+    "- item",
+    "-",
+    "\t- item",
+    "plain text",
+    "a\rb",
+]
+
+
+class TestSplitBlocks(unittest.TestCase):
+    def test_blocks(self):
+        self.assertEqual(
+            blocks.split_blocks(
+                (
+                    "# Title\n\nSome\ntext\n\n```py\ncode\n```\n"
+                    "> a\n> b\n\n1. one\n2. two\n- x\n- y"
+                )
+            ),
+            [
+                ("# Title", BlockType.HEADING, {"heading": "1"}),
+                ("Some text", BlockType.PARAGRAPH, {}),
+                ("```py\ncode\n```", BlockType.CODE, {"class": "language-py"}),
+                ("> a\n> b", BlockType.QUOTE, {}),
+                ("1. one\n2. two", BlockType.ORDERED_LIST, {}),
+                ("- x\n- y", BlockType.UNORDERED_LIST, {}),
+            ],
+        )
+
+    def test_adjacent_headings(self):
+        self.assertEqual(
+            blocks.split_blocks("# a\n# b\n# c"),
+            blocks.iterator_split_blocks("# a\n# b\n# c"),
+        )
+
+    def test_matches_iterator_split_blocks(self):
+        generator = random.Random(0)
+        for _ in range(5000):
+            text = generator.choice(["\n", "\r\n"]).join(
+                generator.choice(LINES)
+                for _ in range(generator.randint(0, 20))
+            ) + generator.choice(["", "\n"])
+            self.assertEqual(
+                blocks.split_blocks(text),
+                blocks.iterator_split_blocks(text),
+                repr(text),
+            )
+
+
+class TestParseDocument(unittest.TestCase):
+    def test_metadata(self):
+        document = blocks.parse_document(
+            (
+                "## Intro\n\n# The Title\n\n# Second\n\nsome words here\n\n"
+                "```\nnot counted\n```\n\n- one two\n- three\n\n> a quote"
+            )
+        )
+        self.assertEqual(document.title, "The Title")
+        self.assertEqual(
+            document.outline, [(2, "Intro"), (1, "The Title"), (1, "Second")]
+        )
+        self.assertEqual(document.word_count, 12)
+        self.assertEqual(len(document.blocks), 7)
+
+    def test_title_matches_extract_title(self):
+        generator = random.Random(0)
+        for _ in range(5000):
+            text = generator.choice(["\n", "\r\n"]).join(
+                generator.choice(LINES)
+                for _ in range(generator.randint(0, 20))
+            ) + generator.choice(["", "\n"])
+            document = blocks.parse_document(text)
+            self.assertEqual(
+                document.title, blocks.extract_title(text), repr(text)
+            )
+            self.assertEqual(
+                document.blocks, blocks.split_blocks(text), repr(text)
+            )
+
+
+class TestIterLines(unittest.TestCase):
+    def test_matches_split(self):
+        generator = random.Random(1)
+        for _ in range(2000):
+            text = generator.choice(["\n", "\r\n"]).join(
+                generator.choice(LINES)
+                for _ in range(generator.randint(0, 20))
+            ) + generator.choice(["", "\n"])
+            translated = io.StringIO(text, newline=None).read()
+            lines = list(blocks.iter_lines(io.StringIO(text, newline=None)))
+            self.assertEqual(lines, translated.split("\n"), repr(text))
+            self.assertEqual(
+                blocks.find_title(lines),
+                blocks.extract_title(translated),
+                repr(text),
+            )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
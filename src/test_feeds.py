@@ -0,0 +1,164 @@
+import unittest
+import xml.etree.ElementTree as ElementTree
+from collections.abc import Iterable
+from functools import cached_property
+from typing import override
+from unittest import mock
+
+import feeds
+from feeds import rfc3339, site_root, url_path, write_feed, write_sitemaps
+from fixtures import WorkingDirectoryTestCase, WorkingPath
+from frontmatter import FrontMatter
+from manifest import Manifest
+from siteindex import PageEntry, SiteIndex
+
+SITEMAP = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+def entry(
+    source: str,
+    title: str | None = None,
+    date: str | None = None,
+    tags: Iterable[str] = (),
+    fields: FrontMatter | None = None,
+) -> PageEntry:
+    output = source.removesuffix(".md") + ".html"
+    return PageEntry(
+        source, output, title, date, list(tags), "", fields or {}, (0, 0)
+    )
+
+
+class TestFeeds(WorkingDirectoryTestCase):
+    public: WorkingPath = WorkingPath("public")
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self.public.joinpath("blog").mkdir(parents=True)
+
+    @cached_property
+    def index(self) -> SiteIndex:
+        index = SiteIndex(self.public.joinpath("index"))
+        for page in (
+            entry("index.md", "Home"),
+            entry("blog/index.md", "Blog & news"),
+            entry("blog/a/index.md", "A <post>", "2024-01-01", ["x"]),
+            entry("blog/b.md", "B", "2024-02-01", fields={"author": "Bo"}),
+        ):
+            index.pages[page.source] = page
+        return index
+
+    def test_site_root(self):
+        self.assertEqual(
+            site_root("https://a.org/", "site"), "https://a.org/site"
+        )
+        self.assertEqual(
+            site_root("https://a.org/a&b", ""), "https://a.org/a&amp;b"
+        )
+        self.assertEqual(url_path("/a b/<c>.html"), "/a%20b/%3Cc%3E.html")
+
+    def test_rfc3339(self):
+        self.assertEqual(rfc3339("2024-01-01"), "2024-01-01T00:00:00Z")
+        self.assertEqual(
+            rfc3339("2024-01-01T10:30:00"), "2024-01-01T10:30:00Z"
+        )
+        self.assertEqual(
+            rfc3339("2024-01-01T10:30:00+02:00"), "2024-01-01T08:30:00Z"
+        )
+        self.assertIsNone(rfc3339("January 2024"))
+
+    def test_sitemap(self):
+        [path] = write_sitemaps(self.index, self.public, "https://a.org", "")
+        locations = [
+            element.text
+            for element in ElementTree.parse(path).iter(f"{SITEMAP}loc")
+        ]
+        self.assertEqual(
+            locations,
+            [
+                "https://a.org/blog/a/",
+                "https://a.org/blog/b.html",
+                "https://a.org/blog/",
+                "https://a.org/",
+            ],
+        )
+
+    def test_sitemap_is_split(self):
+        with mock.patch.object(feeds, "SITEMAP_LIMIT", 3):
+            paths = write_sitemaps(
+                self.index, self.public, "https://a.org", ""
+            )
+        self.assertEqual(
+            [path.name for path in paths],
+            ["sitemap.xml", "sitemap-1.xml", "sitemap-2.xml"],
+        )
+        root = ElementTree.parse(paths[0]).getroot()
+        self.assertEqual(root.tag, f"{SITEMAP}sitemapindex")
+        self.assertEqual(
+            [element.text for element in root.iter(f"{SITEMAP}loc")],
+            ["https://a.org/sitemap-1.xml", "https://a.org/sitemap-2.xml"],
+        )
+        self.assertEqual(
+            len(list(ElementTree.parse(paths[2]).iter(f"{SITEMAP}url"))), 1
+        )
+
+    def test_feed(self):
+        path = write_feed(self.index, self.public, "https://a.org", "", "blog")
+        assert path is not None
+        root = ElementTree.parse(path).getroot()
+        self.assertEqual(root.findtext(f"{ATOM}title"), "Blog & news")
+        self.assertEqual(
+            root.findtext(f"{ATOM}updated"), "2024-02-01T00:00:00Z"
+        )
+        self.assertEqual(
+            [
+                element.findtext(f"{ATOM}title")
+                for element in root.iter(f"{ATOM}entry")
+            ],
+            ["B", "A <post>"],
+        )
+        self.assertEqual(
+            root.findtext(f"{ATOM}author/{ATOM}name"), "Blog & news"
+        )
+        self.assertEqual(
+            [
+                element.findtext(f"{ATOM}author/{ATOM}name")
+                for element in root.iter(f"{ATOM}entry")
+            ],
+            ["Bo", None],
+        )
+
+    def test_feed_author(self):
+        path = write_feed(
+            self.index, self.public, "https://a.org", "", "blog", author="Al"
+        )
+        assert path is not None
+        root = ElementTree.parse(path).getroot()
+        self.assertEqual(root.findtext(f"{ATOM}author/{ATOM}name"), "Al")
+
+    def test_unchanged_outputs_are_kept(self):
+        manifest = Manifest(self.public, "template", "")
+        [sitemap] = write_sitemaps(
+            self.index, self.public, "https://a.org", "", manifest=manifest
+        )
+        manifest.save()
+        stat = sitemap.stat()
+        manifest = Manifest(self.public, "template", "")
+        self.assertEqual(manifest.kept_outputs(), {str(sitemap)})
+        _ = write_sitemaps(
+            self.index, self.public, "https://a.org", "", manifest=manifest
+        )
+        self.assertEqual(sitemap.stat().st_ino, stat.st_ino)
+        self.assertEqual(manifest.stale_generated(), [])
+        manifest = Manifest(self.public, "template", "")
+        self.assertEqual(manifest.stale_generated(), [sitemap])
+
+    def test_missing_section(self):
+        self.assertIsNone(
+            write_feed(self.index, self.public, "https://a.org", "", "news")
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
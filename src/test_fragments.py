@@ -0,0 +1,120 @@
+import contextlib
+import io
+import shutil
+import unittest
+from pathlib import Path
+from typing import override
+
+import blocks
+from fixtures import WorkingDirectoryTestCase
+from fragments import FragmentMemo
+from main import content_generation
+from parentnode import ParentNode
+from parsecache import ParseCache
+
+MARKDOWN = "# Title\n\n> note\n\n[home](/index.html)\n\n> note"
+
+
+class TestFragmentMemo(unittest.TestCase):
+    def render(self, memo: FragmentMemo, path_prefix: str = "site") -> str:
+        return "".join(
+            ParentNode.iter_blocks_html(
+                blocks.tokenize_blocks(MARKDOWN.split("\n")),
+                None,
+                path_prefix,
+                memo=memo,
+            )
+        )
+
+    def test_matches_tree(self):
+        memo = FragmentMemo()
+        expected = ParentNode.from_markdown(MARKDOWN, None, "site").to_html()
+        self.assertEqual(self.render(memo), expected)
+        self.assertEqual(self.render(memo), expected)
+        self.assertEqual((memo.hits, memo.misses), (5, 3))
+        self.assertEqual(memo.hit_rate, 5 / 8)
+
+    def test_keyed_on_prefix(self):
+        memo = FragmentMemo()
+        _ = self.render(memo, "site")
+        self.assertIn('href="/other/index.html"', self.render(memo, "other"))
+        self.assertEqual((memo.hits, memo.misses), (2, 6))
+
+    def test_eviction(self):
+        memo = FragmentMemo(max_entries=2)
+        _ = self.render(memo)
+        self.assertEqual(len(memo.fragments), 2)
+        self.assertEqual(memo.misses, 3)
+
+    def test_large_blocks_bypass(self):
+        memo = FragmentMemo(max_block=5)
+        for text in ("long text", "long text", "short"):
+            _ = memo.fragment(
+                (text, blocks.BlockType.PARAGRAPH, {}),
+                None,
+                lambda: (text, None),
+            )
+        self.assertEqual((memo.hits, memo.misses), (0, 1))
+        self.assertEqual(len(memo.fragments), 1)
+        self.assertEqual((memo.hits, memo.misses), (0, 1))
+
+
+class TestBuild(WorkingDirectoryTestCase):
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        Path("content").mkdir()
+        Path("static").mkdir()
+        _ = Path("template.html").write_text(
+            "<title>{{ Title }}</title>{{ Content }}"
+        )
+        for name in ("a", "b", "c"):
+            _ = Path("content", f"{name}.md").write_text(
+                f"# {name}\n\n> note\n\n[home](/index.html)\n\n> note"
+            )
+
+    def build(
+        self,
+        *,
+        jobs: int = 1,
+        cache: ParseCache | None = None,
+        memo: FragmentMemo | None = None,
+    ) -> str:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            _ = content_generation(
+                "site", "public", jobs=jobs, cache=cache, memo=memo
+            )
+        return output.getvalue()
+
+    def pages(self) -> dict[str, str]:
+        return {
+            path.name: path.read_text()
+            for path in sorted(Path("public").glob("*.html"))
+        }
+
+    def test_memo_used_on_cache_misses(self):
+        _ = self.build(cache=ParseCache())
+        expected = self.pages()
+        shutil.rmtree("public")
+        shutil.rmtree(".ssg-cache")
+        memo = FragmentMemo()
+        cache = ParseCache()
+        _ = self.build(cache=cache, memo=memo)
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        self.assertEqual((memo.hits, memo.misses), (7, 5))
+        self.assertEqual(self.pages(), expected)
+        # Trees stored from memoised fragments render the same when loaded.
+        shutil.rmtree("public")
+        cache = ParseCache()
+        _ = self.build(cache=cache, memo=FragmentMemo())
+        self.assertEqual(cache.hits, 3)
+        self.assertEqual(self.pages(), expected)
+
+    def test_workers_report_memo_lookups(self):
+        output = self.build(jobs=2, memo=FragmentMemo())
+        self.assertRegex(output, r"Fragment memo: [1-9]\d* hits")
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,63 @@
+import io
+import random
+import unittest
+
+import blocks
+from frontmatter import parse_fields, read_front_matter, split_front_matter
+
+PAGE = """---
+title: "Hello: world"
+date: 2024-03-01
+tags: [tolkien, 'elves']
+# a comment
+authors:
+  - Tom
+  - Goldberry
+---
+# Heading
+
+Body"""
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split(self):
+        fields, body = split_front_matter(PAGE)
+        self.assertEqual(
+            fields,
+            {
+                "title": "Hello: world",
+                "date": "2024-03-01",
+                "tags": ["tolkien", "elves"],
+                "authors": ["Tom", "Goldberry"],
+            },
+        )
+        self.assertEqual(body, "# Heading\n\nBody")
+
+    def test_without_front_matter(self):
+        for text in ("# Title\n---\n", "---", "---\ntitle: x\n", ""):
+            self.assertEqual(split_front_matter(text), ({}, text))
+
+    def test_block_list_after_scalar_is_ignored(self):
+        self.assertEqual(parse_fields(["a: b", "- c"]), {"a": "b"})
+
+    def test_read_matches_split(self):
+        lines = ["---", "title: x", "tags: a, b", "# y", "---", "z"]
+        generator = random.Random(0)
+        for _ in range(2000):
+            text = "\n".join(
+                generator.choice(lines) for _ in range(generator.randint(0, 8))
+            ) + generator.choice(["", "\n"])
+            fields, body = split_front_matter(text)
+            read_fields, rest = read_front_matter(
+                blocks.iter_lines(io.StringIO(text))
+            )
+            self.assertEqual(read_fields, fields, repr(text))
+            self.assertEqual(
+                blocks.split_blocks(body),
+                list(blocks.tokenize_blocks(rest)),
+                repr(text),
+            )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
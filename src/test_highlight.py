@@ -0,0 +1,100 @@
+import re
+import unittest
+
+import blocks
+from highlight import LANGUAGES, Highlighter, tokenize
+from parentnode import ParentNode
+
+SPAN = re.compile(r"</?span[^>]*>")
+
+
+class TestTokenize(unittest.TestCase):
+    def test_python(self):
+        html = tokenize(
+            'def greet(name):\n    # say hi\n    return f"hi {name}" * 2\n',
+            LANGUAGES["python"],
+        )
+        self.assertIn('<span class="hljs-keyword">def</span>', html)
+        self.assertIn('<span class="hljs-title function_">greet</span>', html)
+        self.assertIn('<span class="hljs-comment"># say hi</span>', html)
+        self.assertIn('<span class="hljs-string">f"hi {name}"</span>', html)
+        self.assertIn('<span class="hljs-number">2</span>', html)
+
+    def test_escapes(self):
+        html = tokenize('if (a < b && c) { s = "<b>"; }', LANGUAGES["js"])
+        self.assertNotIn("<b>", html)
+        self.assertIn("a &lt; b &amp;&amp; c", html)
+        self.assertIn('<span class="hljs-string">"&lt;b&gt;"</span>', html)
+
+    def test_keeps_text(self):
+        code = (
+            '#!/bin/sh\nfor f in *.md; do echo "$f" # list\ndone\n'
+            "x=$((1 + 2)) 'single'\n"
+        )
+        for language in LANGUAGES.values():
+            html = SPAN.sub("", tokenize(code, language))
+            self.assertEqual(
+                html.replace("&lt;", "<")
+                .replace("&gt;", ">")
+                .replace("&amp;", "&"),
+                code,
+            )
+
+    def test_json(self):
+        html = tokenize('{"a": [1, true, "b"]}', LANGUAGES["json"])
+        self.assertIn('<span class="hljs-attr">"a"</span>', html)
+        self.assertIn('<span class="hljs-string">"b"</span>', html)
+        self.assertIn('<span class="hljs-literal">true</span>', html)
+
+
+class TestHighlighter(unittest.TestCase):
+    def test_unknown_language(self):
+        highlighter = Highlighter()
+        self.assertIsNone(highlighter.highlight("x = 1", "brainfuck"))
+        self.assertEqual(highlighter.misses, 0)
+
+    def test_cache(self):
+        highlighter = Highlighter(max_entries=2)
+        first = highlighter.highlight("x = 1", "python")
+        self.assertIs(highlighter.highlight("x = 1", "python"), first)
+        self.assertEqual((highlighter.hits, highlighter.misses), (1, 1))
+        _ = highlighter.highlight("x = 1", "js")
+        _ = highlighter.highlight("y = 2", "python")
+        self.assertEqual(len(highlighter.fragments), 2)
+        _ = highlighter.highlight("x = 1", "python")
+        self.assertEqual((highlighter.hits, highlighter.misses), (1, 4))
+
+    def test_tree(self):
+        content = ParentNode.from_markdown(
+            "# Title\n\n```python\nx = None\n```\n\n```\nplain <b>\n```"
+        )
+        Highlighter().highlight_tree(content)
+        self.assertEqual(
+            content.to_html(),
+            (
+                "<div><h1>Title</h1><pre>"
+                '<code class="hljs language-python" data-highlighted="yes">'
+                'x = <span class="hljs-literal">None</span></code></pre>'
+                "<pre><code>plain <b></code></pre></div>"
+            ),
+        )
+
+    def test_streamed_blocks(self):
+        markdown = "# Title\n\n```sh\necho $HOME\n```"
+        content = ParentNode.from_markdown(markdown)
+        highlighter = Highlighter()
+        highlighter.highlight_tree(content)
+        streamed = "".join(
+            ParentNode.iter_blocks_html(
+                blocks.tokenize_blocks(markdown.split("\n")),
+                None,
+                None,
+                highlighter.highlight_node,
+            )
+        )
+        self.assertEqual(streamed, content.to_html())
+        self.assertEqual(highlighter.hits, 1)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
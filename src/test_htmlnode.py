@@ -12,6 +12,16 @@ class TestTextNode(unittest.TestCase):
             "HTMLNode('a', 'Value', [HTMLNode('p', 'Paragraph', [], {})], {'href': 'http://example.com'})",
         )
 
+    def test_props_allocated_on_demand(self):
+        node = HTMLNode("p", "Paragraph")
+        self.assertEqual(node.props_to_html(), "")
+        node.props["class"] = "note"
+        self.assertEqual(node.props_to_html(), ' class="note"')
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            setattr(HTMLNode("p"), "extra", "value")
+
 
 if __name__ == "__main__":
     _ = unittest.main()
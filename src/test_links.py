@@ -0,0 +1,124 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from links import page_references, rewrite_links, rewrite_url
+from parentnode import ParentNode
+from template import Template
+from textnode import TextNode, TextType
+
+
+def path_rewrite_url(url: str, path_prefix: str) -> str:
+    try:
+        return str(
+            Path("/").joinpath(
+                Path(path_prefix).joinpath(Path(url).relative_to("/"))
+            )
+        )
+    except ValueError:
+        return url
+
+
+class TestLinks(unittest.TestCase):
+    def test_rewrite_url(self):
+        self.assertEqual(rewrite_url("/blog/tom/", "site"), "/site/blog/tom")
+        self.assertEqual(rewrite_url("/", "site"), "/site")
+        self.assertEqual(rewrite_url("/index.css", ""), "/index.css")
+        self.assertEqual(rewrite_url("images/a.png", "site"), "images/a.png")
+        self.assertEqual(
+            rewrite_url("https://example.com/a", "site"),
+            "https://example.com/a",
+        )
+        self.assertEqual(
+            rewrite_url("//example.com/a", "site"), "//example.com/a"
+        )
+
+    def test_rewrite_url_matches_pathlib(self):
+        generator = random.Random(0)
+        pieces = ["/", "/", "a", ".", "..", "b#c", "?q=1", "//", "http:"]
+        for _ in range(20000):
+            url = "".join(
+                generator.choice(pieces) for _ in range(generator.randrange(6))
+            )
+            prefix = "".join(
+                generator.choice(pieces) for _ in range(generator.randrange(4))
+            )
+            self.assertEqual(
+                rewrite_url(url, prefix), path_rewrite_url(url, prefix)
+            )
+
+    def test_rewrite_links(self):
+        self.assertEqual(
+            rewrite_links(
+                '<link href="/index.css"><a href = "/">x</a><img src="a.png">',
+                "site",
+            ),
+            (
+                '<link href="/site/index.css"><a href="/site">x</a>'
+                '<img src="a.png">'
+            ),
+        )
+
+    def test_to_html_node_prefix(self):
+        link = TextNode("home", TextType.LINK, "/index.html")
+        image = TextNode("tom", TextType.IMAGE, "/images/tom.png")
+        self.assertEqual(
+            link.to_html_node(None, "site").to_html(),
+            '<a href="/site/index.html">home</a>',
+        )
+        self.assertEqual(
+            image.to_html_node(None, "site").to_html(),
+            '<img src="/site/images/tom.png" alt="tom">',
+        )
+        self.assertEqual(
+            link.to_html_node().to_html(), '<a href="/index.html">home</a>'
+        )
+
+    def test_from_markdown_prefix_leaves_text_alone(self):
+        self.assertEqual(
+            ParentNode.from_markdown(
+                '[home](/) and `href="/x"`', None, "site"
+            ).to_html(),
+            (
+                '<div><p><a href="/site">home</a> and '
+                '<code>href="/x"</code></p></div>'
+            ),
+        )
+
+    def test_template_load_rewrites_links(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath("template.html")
+            _ = path.write_text('<link href="/index.css">{{ Content }}')
+            self.assertEqual(
+                Template.load(path, "site").render({"Content": "x"}),
+                '<link href="/site/index.css">x',
+            )
+            self.assertEqual(
+                Template.load(path).render({"Content": "x"}),
+                '<link href="/index.css">x',
+            )
+
+
+class TestPageReferences(unittest.TestCase):
+    def test_page_references(self):
+        self.assertEqual(
+            page_references(
+                (
+                    "[home](/) [tom](/blog/tom) [a](/a.html#top) "
+                    "[b](/b/?x=1) ![img](/images/a.png) [css](/index.css) "
+                    "[ext](https://a.org/) [host](//cdn.org/x.html) "
+                    "[rel](c.html)"
+                )
+            ),
+            {
+                "index.html",
+                "blog/tom/index.html",
+                "a.html",
+                "b/index.html",
+            },
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,166 @@
+import contextlib
+import io
+import json
+import unittest
+from pathlib import Path
+from typing import cast, override
+
+from fixtures import WorkingDirectoryTestCase, WorkingPath
+from main import content_generation, write_page
+from manifest import Manifest, ManifestData
+from sinks import MemorySink
+from template import Template
+
+MARKDOWN = """Intro **before** the title
+
+# Title
+
+- [home](/index.html)
+- ![image](/a.png)
+
+```python
+print("a")
+```
+"""
+
+
+class TestWritePage(WorkingDirectoryTestCase):
+    source: WorkingPath = WorkingPath("index.md")
+    template: Template = Template("<title>{{ Title }}</title>{{ Content }}")
+
+    def render(
+        self, name: str, stream_threshold: int
+    ) -> tuple[tuple[str, bool, set[str]], str]:
+        destination = self.root.joinpath(name)
+        result = write_page(
+            self.source,
+            destination,
+            "site",
+            self.template,
+            None,
+            stream_threshold=stream_threshold,
+        )
+        return result, destination.read_text()
+
+    def test_streamed_page_matches(self):
+        _ = self.source.write_text(MARKDOWN.replace("\n", "\r\n"))
+        whole = self.render("whole.html", 2**20)
+        streamed = self.render("streamed.html", 0)
+        self.assertEqual(streamed, whole)
+
+    def test_front_matter_title(self):
+        _ = self.source.write_text(
+            "---\ntitle: From front matter\n---\n" + MARKDOWN
+        )
+        for name, stream_threshold in (("a.html", 2**20), ("b.html", 0)):
+            _, html = self.render(name, stream_threshold)
+            self.assertTrue(
+                html.startswith("<title>From front matter</title><div><p>")
+            )
+
+    def test_memory_sink_matches_disk(self):
+        _ = self.source.write_text(MARKDOWN)
+        _, html = self.render("disk.html", 2**20)
+        sink = MemorySink(self.root)
+        for name, stream_threshold in (("a.html", 2**20), ("b.html", 0)):
+            _ = write_page(
+                self.source,
+                self.root.joinpath(name),
+                "site",
+                self.template,
+                None,
+                stream_threshold=stream_threshold,
+                sink=sink,
+            )
+        self.assertEqual(
+            sink.files,
+            {"a.html": html.encode(), "b.html": html.encode()},
+        )
+        self.assertFalse(self.root.joinpath("a.html").exists())
+
+    def test_streamed_page_requires_title(self):
+        _ = self.source.write_text("no title here")
+        destination = self.root.joinpath("index.html")
+        with self.assertRaises(ValueError):
+            _ = write_page(
+                self.source,
+                destination,
+                "",
+                self.template,
+                None,
+                stream_threshold=0,
+            )
+        self.assertFalse(destination.exists())
+
+
+class TestContentGeneration(WorkingDirectoryTestCase):
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        content = Path("content")
+        for index in range(12):
+            page = content.joinpath(f"section{index % 3}", f"page{index}.md")
+            page.parent.mkdir(parents=True, exist_ok=True)
+            _ = page.write_text(f"# Page {index}\n\n[home](/index.html)")
+        _ = content.joinpath("index.md").write_text(MARKDOWN)
+        _ = content.joinpath("broken.md").write_text("no title here")
+        Path("static", "images").mkdir(parents=True)
+        _ = Path("static", "images", "a.png").write_bytes(b"png")
+        _ = Path("template.html").write_text(
+            "<title>{{ Title }}</title>{{ Content }}"
+        )
+
+    def build(self, destination: str, jobs: int) -> list[str]:
+        output = io.StringIO()
+        with (
+            contextlib.redirect_stdout(output),
+            contextlib.redirect_stderr(output),
+        ):
+            _ = content_generation(
+                "site", destination, incremental=True, jobs=jobs
+            )
+        root = Path(destination).absolute()
+        log = output.getvalue().replace(str(root), "<public>")
+        # Tracebacks from workers have different frames; keep the error.
+        return [
+            line
+            for line in log.splitlines()
+            if not line.startswith((" ", "Traceback"))
+        ]
+
+    def snapshot(
+        self, destination: str
+    ) -> tuple[dict[str, bytes], ManifestData]:
+        root = Path(destination).absolute()
+        files = {
+            path.relative_to(root).as_posix(): path.read_bytes()
+            for path in sorted(root.rglob("*"))
+            if path.is_file()
+        }
+        manifest = cast(
+            ManifestData,
+            json.loads(Manifest(root, "", None).path.read_text()),
+        )
+        return files, manifest
+
+    def test_parallel_build_matches_serial(self):
+        serial = [self.build("serial", 1)]
+        parallel = [self.build("parallel", 3)]
+        _ = Path("content", "section1", "page4.md").write_text("# Changed")
+        serial.append(self.build("serial", 1))
+        parallel.append(self.build("parallel", 3))
+        self.assertEqual(parallel, serial)
+        self.assertIn("Skipping unchanged <public>/index.html", serial[1])
+        self.assertIn(
+            (
+                "Generated page from "
+                f"{Path('content', 'section1', 'page4.md').absolute()} to "
+                "<public>/section1/page4.html using template.html"
+            ),
+            serial[1],
+        )
+        self.assertEqual(self.snapshot("parallel"), self.snapshot("serial"))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,113 @@
+import tempfile
+import unittest
+from pathlib import Path
+from typing import override
+
+from fixtures import WorkingDirectoryTestCase, WorkingPath
+from manifest import Manifest, stream_text_digest, text_digest
+
+
+class TestManifest(WorkingDirectoryTestCase):
+    root: WorkingPath = WorkingPath("public")
+    page: WorkingPath = WorkingPath("public", "index.html")
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self.root.mkdir()
+        _ = self.page.write_text("<p>page</p>")
+
+    def test_fresh_after_save(self):
+        manifest = Manifest(self.root, "template", "prefix")
+        manifest.record(self.page, "digest", True, False)
+        manifest.save()
+        manifest = Manifest(self.root, "template", "prefix")
+        self.assertEqual(manifest.previous_digest(self.page, True), "digest")
+
+    def test_template_change_invalidates_pages(self):
+        manifest = Manifest(self.root, "template", "prefix")
+        manifest.record(self.page, "digest", True, False)
+        manifest.record(self.root.joinpath("a.css"), "css", False, False)
+        manifest.save()
+        manifest = Manifest(self.root, "other", "prefix")
+        self.assertIsNone(manifest.previous_digest(self.page, True))
+        self.assertEqual(manifest.previous_assets, {"a.css": "css"})
+
+    def test_full_build_ignores_previous_pages(self):
+        manifest = Manifest(self.root, "template", "prefix")
+        manifest.record(self.page, "digest", True, False)
+        manifest.save()
+        manifest = Manifest(self.root, "template", "prefix", False)
+        self.assertIsNone(manifest.previous_digest(self.page, True))
+
+    def test_highlight_toggle_invalidates_pages(self):
+        manifest = Manifest(self.root, "template", "prefix")
+        manifest.record(self.page, "digest", True, False)
+        manifest.save()
+        manifest = Manifest(self.root, "template", "prefix", highlight=True)
+        self.assertEqual(
+            manifest.page_reasons(self.page), ["code highlighting toggled"]
+        )
+        self.assertIsNone(manifest.previous_digest(self.page, True))
+
+    def test_unindexed_page_invalidates(self):
+        manifest = Manifest(self.root, "template", "prefix")
+        manifest.record(self.page, "digest", True, False)
+        manifest.save()
+        manifest = Manifest(self.root, "template", "prefix")
+        manifest.indexed = {"index.html": "old digest"}
+        self.assertEqual(
+            manifest.page_reasons(self.page), ["missing from the search index"]
+        )
+        manifest.indexed = {"index.html": "digest"}
+        self.assertEqual(manifest.previous_digest(self.page, True), "digest")
+
+    def test_changed_reference_invalidates_page(self):
+        manifest = Manifest(self.root, "template", "prefix")
+        manifest.titles = {"a.html": "A", "b.html": "B"}
+        manifest.record(self.page, "digest", True, False, ["a.html"])
+        manifest.save()
+        manifest = Manifest(self.root, "template", "prefix", explain=True)
+        manifest.titles = {"a.html": "A", "b.html": "New B"}
+        self.assertEqual(manifest.previous_digest(self.page, True), "digest")
+        manifest.titles = {"a.html": "New A"}
+        self.assertIsNone(manifest.previous_digest(self.page, True))
+        manifest.record(self.page, "digest", True, False, ["a.html"])
+        self.assertEqual(
+            manifest.rebuild_reasons(self.page),
+            ["referenced page a.html changed"],
+        )
+
+    def test_rebuild_reasons(self):
+        manifest = Manifest(self.root, "template", "prefix", explain=True)
+        manifest.record(self.page, "digest", True, False)
+        self.assertEqual(
+            manifest.rebuild_reasons(self.page), ["not in the previous build"]
+        )
+        manifest.save()
+        manifest = Manifest(self.root, "other", "", explain=True)
+        manifest.record(self.page, "digest", True, False)
+        self.assertEqual(
+            manifest.rebuild_reasons(self.page),
+            ["template changed", "path prefix changed from 'prefix'"],
+        )
+        manifest = Manifest(self.root, "template", "prefix", explain=True)
+        manifest.record(self.page, "changed", True, False)
+        self.assertEqual(
+            manifest.rebuild_reasons(self.page), ["source changed"]
+        )
+
+
+class TestStreamTextDigest(unittest.TestCase):
+    def test_matches_text_digest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath("page.md")
+            _ = path.write_bytes("# Tïtle\r\n\r\nbödy\n".encode("utf-8"))
+            self.assertEqual(
+                stream_text_digest(path, 3),
+                text_digest(path.read_text(encoding="utf-8")),
+            )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,57 @@
+import io
+import unittest
+
+import blocks
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+
+class TestParentNode(unittest.TestCase):
+    node: ParentNode = ParentNode(
+        "div",
+        [
+            ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")]),
+            LeafNode("img", None, {"src": "/a.png"}),
+        ],
+        {"class": "page"},
+    )
+    html: str = (
+        '<div class="page"><p><b>Bold</b> text</p><img src="/a.png"></div>'
+    )
+
+    def test_to_html(self):
+        self.assertEqual(self.node.to_html(), self.html)
+
+    def test_write_html(self):
+        stream = io.StringIO()
+        self.node.write_html(stream)
+        self.assertEqual(stream.getvalue(), self.html)
+
+    def test_iter_html_without_children(self):
+        with self.assertRaises(ValueError):
+            _ = list(ParentNode("div", []).iter_html())
+
+    def test_iter_blocks_html_matches_tree(self):
+        markdown = (
+            "# Title\n\n- [a](/a.html)\n- b\n\n> quote\n\n```py\nx\n```"
+        )
+        self.assertEqual(
+            "".join(
+                ParentNode.iter_blocks_html(
+                    blocks.tokenize_blocks(markdown.split("\n")),
+                    {"class": "page"},
+                    "site",
+                )
+            ),
+            ParentNode.from_markdown(
+                markdown, {"class": "page"}, "site"
+            ).to_html(),
+        )
+
+    def test_iter_blocks_html_without_blocks(self):
+        with self.assertRaises(ValueError):
+            _ = list(ParentNode.iter_blocks_html([]))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
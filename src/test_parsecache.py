@@ -0,0 +1,82 @@
+import os
+import unittest
+from functools import cached_property
+
+from fixtures import WorkingDirectoryTestCase
+from parentnode import ParentNode
+from parsecache import ParseCache
+
+MARKDOWN = """# Title
+
+Some **bold** text with [a link](/blog/) and ![an image](/images/a.png)
+
+```python
+print("a")
+```"""
+
+
+class TestParseCache(WorkingDirectoryTestCase):
+    @cached_property
+    def cache(self) -> ParseCache:
+        return ParseCache(self.root)
+
+    def test_data_round_trip(self):
+        tree = ParentNode.from_markdown(MARKDOWN)
+        self.assertEqual(
+            ParentNode.from_data(tree.to_data()).to_html(), tree.to_html()
+        )
+        self.assertEqual(
+            ParentNode.from_data(tree.to_data(), "site").to_html(),
+            ParentNode.from_markdown(MARKDOWN, None, "site").to_html(),
+        )
+
+    def test_hit_after_miss(self):
+        expected = ParentNode.from_markdown(MARKDOWN, None, "site").to_html()
+        for prefix in ("site", "site"):
+            content, document = self.cache.parse(MARKDOWN, prefix)
+            self.assertEqual(content.to_html(), expected)
+            self.assertEqual(document.title, "Title")
+            self.assertEqual(document.outline, [(1, "Title")])
+            self.assertEqual(document.word_count, 10)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_prefix_is_not_part_of_the_key(self):
+        _ = self.cache.parse(MARKDOWN, "site")
+        content, _ = self.cache.parse(MARKDOWN, "other")
+        self.assertEqual(
+            content.to_html(),
+            ParentNode.from_markdown(MARKDOWN, None, "other").to_html(),
+        )
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_corrupt_entry_is_reparsed(self):
+        _ = self.cache.parse(MARKDOWN)
+        path = self.root.joinpath(self.cache.key(MARKDOWN))
+        _ = path.write_bytes(b"not a cache entry")
+        content, _ = self.cache.parse(MARKDOWN)
+        self.assertEqual(
+            content.to_html(), ParentNode.from_markdown(MARKDOWN).to_html()
+        )
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_evicts_least_recently_used(self):
+        documents = [
+            f"# Page {index}\n\n{'text ' * 200}" for index in range(3)
+        ]
+        for index, document in enumerate(documents):
+            _ = self.cache.parse(document)
+            path = self.root.joinpath(self.cache.key(document))
+            os.utime(path, ns=(index, index))
+        _ = self.cache.parse(documents[0])
+        sizes = [entry.stat().st_size for entry in os.scandir(self.root)]
+        self.cache.max_bytes = sum(sizes) - 1
+        self.assertEqual(self.cache.evict(), 1)
+        _ = self.cache.parse(documents[0])
+        _ = self.cache.parse(documents[2])
+        self.assertEqual(self.cache.hits, 3)
+        _ = self.cache.parse(documents[1])
+        self.assertEqual(self.cache.misses, 4)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
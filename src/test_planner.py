@@ -0,0 +1,120 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+from typing import override
+
+from fixtures import WorkingDirectoryTestCase, WorkingPath
+from planner import Task, TaskType, delete_tree, plan_build
+
+
+class TestPlanner(WorkingDirectoryTestCase):
+    static: WorkingPath = WorkingPath("static")
+    content: WorkingPath = WorkingPath("content")
+    public: WorkingPath = WorkingPath("public")
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self.static.joinpath("images").mkdir(parents=True)
+        _ = self.static.joinpath("images", "a.png").write_bytes(b"png")
+        self.content.joinpath("blog").mkdir(parents=True)
+        _ = self.content.joinpath("index.md").write_text("# Home")
+        _ = self.content.joinpath("blog", "post.md").write_text("# Post")
+
+    def summary(self, plan: list[Task]) -> list[tuple[TaskType, str]]:
+        return [
+            (
+                task.task_type,
+                Path(task.destination).relative_to(self.public).as_posix(),
+            )
+            for task in plan
+        ]
+
+    def test_plan_for_empty_destination(self):
+        plan = plan_build(self.public, self.static, self.content)
+        self.assertEqual(
+            sorted(self.summary(plan), key=lambda task: task[1]),
+            [
+                (TaskType.MKDIR, "."),
+                (TaskType.MKDIR, "blog"),
+                (TaskType.RENDER, "blog/post.html"),
+                (TaskType.MKDIR, "images"),
+                (TaskType.COPY, "images/a.png"),
+                (TaskType.RENDER, "index.html"),
+            ],
+        )
+        kinds = [task.task_type for task in plan]
+        self.assertEqual(kinds, sorted(kinds, key=lambda kind: kind.value))
+        self.assertTrue(all(task.destination_stat is None for task in plan))
+
+    def test_plan_deletes_stale_outputs_first(self):
+        self.public.joinpath("images").mkdir(parents=True)
+        _ = self.public.joinpath("images", "a.png").write_bytes(b"png")
+        self.public.joinpath("old", "deeper").mkdir(parents=True)
+        _ = self.public.joinpath("old", "deeper", "page.html").write_text("")
+        self.public.joinpath("index.html").mkdir()
+        plan = plan_build(self.public, self.static, self.content)
+        self.assertCountEqual(
+            self.summary(plan[:4]),
+            [
+                (TaskType.DELETE, "old/deeper/page.html"),
+                (TaskType.RMDIR, "old/deeper"),
+                (TaskType.RMDIR, "old"),
+                (TaskType.RMDIR, "index.html"),
+            ],
+        )
+        self.assertLess(
+            self.summary(plan).index((TaskType.RMDIR, "old/deeper")),
+            self.summary(plan).index((TaskType.RMDIR, "old")),
+        )
+        copy = next(task for task in plan if task.task_type is TaskType.COPY)
+        self.assertIsNotNone(copy.destination_stat)
+        self.assertIsNotNone(copy.source_stat)
+
+    def test_plan_without_prune_keeps_unknown_outputs(self):
+        self.public.mkdir()
+        _ = self.public.joinpath("CNAME").write_text("example.com")
+        plan = plan_build(self.public, self.static, prune=False)
+        self.assertNotIn(TaskType.DELETE, [task.task_type for task in plan])
+
+    def test_plan_keeps_listed_outputs(self):
+        self.public.mkdir()
+        _ = self.public.joinpath("index.html.gz").write_bytes(b"")
+        _ = self.public.joinpath("stale.html").write_text("")
+        plan = plan_build(
+            self.public,
+            self.static,
+            self.content,
+            keep={str(self.public.joinpath("index.html.gz"))},
+        )
+        self.assertEqual(
+            [
+                item
+                for item in self.summary(plan)
+                if item[0] is TaskType.DELETE
+            ],
+            [(TaskType.DELETE, "stale.html")],
+        )
+
+    def test_deeper_than_recursion_limit(self):
+        depth = sys.getrecursionlimit() + 10
+        deep = self.content
+        for _ in range(depth):
+            deep = deep.joinpath("d")
+            deep.mkdir()
+        _ = deep.joinpath("page.md").write_text("# Deep")
+        plan = plan_build(self.public, None, self.content)
+        self.assertEqual(
+            sum(task.task_type is TaskType.MKDIR for task in plan), depth + 2
+        )
+        # shutil.rmtree recurses too, so clean up with the planner.
+        for task in delete_tree(str(self.content)):
+            if task.task_type is TaskType.DELETE:
+                os.unlink(task.destination)
+            else:
+                os.rmdir(task.destination)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
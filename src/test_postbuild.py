@@ -0,0 +1,112 @@
+import gzip
+import unittest
+from pathlib import Path
+from typing import override
+
+from fixtures import WorkingDirectoryTestCase, WorkingPath
+from manifest import Manifest
+from planner import TaskType, plan_build
+from postbuild import PostBuild, fingerprinted_name, rewrite_page
+from sync import AssetSync
+
+PAGE = (
+    '<link href="/blog/site.css" rel="stylesheet" />'
+    '<img src="/blog/a.png" alt="a"><a href="/blog/other.html">x</a>'
+)
+
+
+class TestPostBuild(WorkingDirectoryTestCase):
+    static: WorkingPath = WorkingPath("static")
+    content: WorkingPath = WorkingPath("content")
+    public: WorkingPath = WorkingPath("public")
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self.static.mkdir()
+        self.content.mkdir()
+        _ = self.static.joinpath("site.css").write_text("body { color: red }")
+        _ = self.static.joinpath("a.png").write_bytes(b"png")
+        _ = self.content.joinpath("index.md").write_text("# Home")
+
+    def build(self):
+        postbuild = PostBuild(self.public, "/blog", workers=2)
+        plan = plan_build(
+            self.public,
+            self.static,
+            self.content,
+            keep=postbuild.kept_outputs(),
+        )
+        manifest = Manifest(self.public, "template", "/blog")
+        manifest.fingerprints = postbuild.fingerprint_assets(plan)
+        assets = AssetSync(manifest=manifest)
+        for task in plan:
+            if task.task_type is not TaskType.RENDER:
+                assets.run(task)
+                continue
+            page = Path(task.destination)
+            if manifest.previous_digest(page, True) == "digest":
+                manifest.record(page, "digest", True, True)
+                continue
+            _ = page.write_text(PAGE)
+            manifest.record(page, "digest", True, False)
+        postbuild.run(plan, manifest)
+        postbuild.save()
+        manifest.save()
+        return postbuild
+
+    def test_fingerprinted_name(self):
+        self.assertEqual(
+            fingerprinted_name("js/highlight.min.js", "0123456789abcdef"),
+            "js/highlight.min.0123456789.js",
+        )
+        self.assertEqual(
+            fingerprinted_name("a.png", "ff" * 8), "a.ffffffffff.png"
+        )
+
+    def test_rewrite_page(self):
+        page = self.root.joinpath("page.html")
+        _ = page.write_text(PAGE)
+        self.assertTrue(rewrite_page(page, {"/blog/a.png": "/blog/a.1.png"}))
+        self.assertEqual(
+            page.read_text(), PAGE.replace("/blog/a.png", "/blog/a.1.png")
+        )
+        self.assertFalse(rewrite_page(page, {"/blog/b.png": "/blog/b.1.png"}))
+
+    def test_build(self):
+        postbuild = self.build()
+        css = postbuild.assets["site.css"]
+        self.assertTrue(self.public.joinpath(css).is_file())
+        self.assertTrue(self.public.joinpath("site.css").is_file())
+        html = self.public.joinpath("index.html").read_text()
+        self.assertIn(f'href="/blog/{css}"', html)
+        self.assertIn(f'src="/blog/{postbuild.assets["a.png"]}"', html)
+        self.assertIn('href="/blog/other.html"', html)
+        self.assertEqual(
+            gzip.decompress(
+                self.public.joinpath("index.html.gz").read_bytes()
+            ).decode(),
+            html,
+        )
+        self.assertTrue(self.public.joinpath(f"{css}.gz").is_file())
+        self.assertFalse(self.public.joinpath("a.png.gz").exists())
+        self.assertEqual(postbuild.compressed_count, 3)
+
+        postbuild = self.build()
+        self.assertEqual(postbuild.compressed_count, 0)
+        self.assertEqual(postbuild.rewritten, 0)
+
+        _ = self.static.joinpath("site.css").write_text("body { color: blue }")
+        postbuild = self.build()
+        self.assertNotEqual(postbuild.assets["site.css"], css)
+        self.assertFalse(self.public.joinpath(css).exists())
+        self.assertFalse(self.public.joinpath(f"{css}.gz").exists())
+        self.assertEqual(postbuild.rewritten, 1)
+        self.assertIn(
+            postbuild.assets["site.css"],
+            self.public.joinpath("index.html").read_text(),
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
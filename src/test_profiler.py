@@ -0,0 +1,82 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from typing import TypedDict, cast
+
+from main import write_page
+from parentnode import ParentNode
+from profiler import BuildProfile, PageProfile, clock, count_nodes
+from template import Template
+
+
+class ProfileReport(TypedDict):
+    phases: dict[str, dict[str, float]]
+    page_steps: dict[str, dict[str, float]]
+    page_count: int
+    nodes: int
+
+
+class TestProfiler(unittest.TestCase):
+    def test_count_nodes(self):
+        tree = ParentNode.from_markdown("# Title\n\nSome **bold** text")
+        self.assertEqual(count_nodes(tree), 7)
+
+    def test_page_steps_accumulate(self):
+        page = PageProfile(Path("index.md"))
+        page.add("render", clock())
+        page.add("render", clock())
+        page.add("write", clock())
+        self.assertEqual(set(page.steps), {"render", "write"})
+        self.assertEqual(
+            page.wall, page.steps["render"][0] + page.steps["write"][0]
+        )
+
+    def test_write_page_profile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = Path(directory).joinpath("index.md")
+            destination = Path(directory).joinpath("index.html")
+            _ = source.write_text("# Title\n\n[home](/index.html)")
+            page = PageProfile(source)
+            _ = write_page(
+                source,
+                destination,
+                "prefix",
+                Template("<title>{{ Title }}</title>{{ Content }}"),
+                None,
+                page,
+            )
+            self.assertEqual(
+                set(page.steps), {"read", "parse", "render", "write"}
+            )
+            self.assertEqual(page.nodes, 5)
+            self.assertEqual(page.bytes, destination.stat().st_size)
+            self.assertFalse(page.skipped)
+
+    def test_report_and_slowest(self):
+        profile = BuildProfile()
+        with profile.phase("copy"):
+            pass
+        for name, wall in (("a.md", 5), ("b.md", 30), ("c.md", 10)):
+            page = PageProfile(Path(name))
+            page.steps["parse"] = [wall, wall]
+            page.nodes = 2
+            profile.add_page(page)
+        self.assertEqual(
+            [page.source for page in profile.slowest(2)], ["b.md", "c.md"]
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory).joinpath("profile.json")
+            profile.save(path)
+            with open(path, encoding="utf-8") as file:
+                report = cast(ProfileReport, json.load(file))
+        self.assertEqual(list(report["phases"]), ["copy"])
+        self.assertEqual(report["page_count"], 3)
+        self.assertEqual(report["nodes"], 6)
+        self.assertEqual(report["page_steps"]["parse"]["wall_ms"], 45 / 1e6)
+        self.assertIn("b.md", profile.summary(1))
+        self.assertNotIn("a.md", profile.summary(1))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,173 @@
+import contextlib
+import gzip
+import io
+import json
+import sys
+import unicodedata
+import unittest
+from pathlib import Path
+from typing import TypedDict, cast, override
+
+from fixtures import WorkingDirectoryTestCase, WorkingPath
+from main import content_generation
+from parentnode import ParentNode
+from patterns import SEARCH_TERM
+from search import (
+    LOADER,
+    PageTerms,
+    TermCollector,
+    decode_postings,
+    encode_postings,
+    shard_name,
+)
+
+
+class IndexFile(TypedDict):
+    shards: list[str]
+    pages: list[list[str]]
+
+
+class TestTermCollector(unittest.TestCase):
+    def test_add_tree(self):
+        collector = TermCollector()
+        collector.add_tree(
+            ParentNode.from_markdown("# The Title\n\nThe **bold**er `Code`")
+        )
+        self.assertEqual(
+            collector.terms,
+            {"the": [0, 3], "title": [1], "bolder": [4], "code": [5]},
+        )
+
+    def test_postings_round_trip(self):
+        postings = {0: [1, 5, 9], 3: [0], 7: [2, 4]}
+        encoded = encode_postings(postings)
+        self.assertEqual(encoded, [0, 3, 1, 4, 4, 3, 1, 0, 4, 2, 2, 2])
+        self.assertEqual(decode_postings(encoded), postings)
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name("search"), "7365")
+        self.assertEqual(shard_name("é"), "c3a9")
+
+    def test_terms_match_the_loader(self):
+        self.assertIn(r"const TERM = /[\p{L}\p{N}_]+/gu;", LOADER.read_text())
+        self.assertEqual(
+            [
+                hex(code)
+                for code in range(sys.maxunicode + 1)
+                if bool(SEARCH_TERM.fullmatch(chr(code)))
+                != (
+                    unicodedata.category(chr(code))[0] in "LN"
+                    or chr(code) == "_"
+                )
+            ],
+            [],
+        )
+
+
+class TestSearchIndex(WorkingDirectoryTestCase):
+    content: WorkingPath = WorkingPath("content")
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self.content.joinpath("blog").mkdir(parents=True)
+        Path("static").mkdir()
+        _ = Path("template.html").write_text(
+            "<title>{{ Title }}</title>{{ Content }}"
+        )
+        _ = self.content.joinpath("index.md").write_text(
+            "# Home\n\nWelcome to the shire"
+        )
+        _ = self.content.joinpath("blog", "tom.md").write_text(
+            "# Tom\n\nOld Tom Bombadil is a merry fellow"
+        )
+        _ = self.content.joinpath("blog", "elves.md").write_text(
+            "# Elves\n\nThe elves of Rivendell"
+        )
+
+    def build(self, destination: str = "public") -> str:
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            _ = content_generation(
+                None, destination, incremental=True, search=True
+            )
+        return output.getvalue()
+
+    def read(self, destination: str = "public") -> dict[str, PageTerms]:
+        directory = Path(destination, "search")
+        index = cast(
+            IndexFile,
+            json.loads(
+                gzip.decompress(
+                    directory.joinpath("index.json.gz").read_bytes()
+                )
+            ),
+        )
+        terms: dict[str, PageTerms] = {}
+        for name in index["shards"]:
+            shard = cast(
+                dict[str, list[int]],
+                json.loads(
+                    gzip.decompress(
+                        directory.joinpath(f"{name}.json.gz").read_bytes()
+                    )
+                ),
+            )
+            for term, encoded in shard.items():
+                self.assertEqual(shard_name(term), name)
+                terms[term] = {
+                    index["pages"][document][0]: positions
+                    for document, positions in decode_postings(
+                        encoded
+                    ).items()
+                }
+        return terms
+
+    def test_build(self):
+        output = self.build()
+        self.assertIn("Indexed 3 changed pages", output)
+        terms = self.read()
+        self.assertEqual(terms["tom"], {"/blog/tom.html": [0, 3]})
+        self.assertEqual(terms["the"], {"/": [4], "/blog/elves.html": [2]})
+        self.assertTrue(Path("public", "search", "search.js").is_file())
+
+    def test_incremental_matches_full_build(self):
+        _ = self.build()
+        stamps = {
+            path.name: path.stat().st_mtime_ns
+            for path in Path("public", "search").iterdir()
+        }
+        _ = self.content.joinpath("blog", "tom.md").write_text(
+            "# Tom\n\nOld Tom Bombadil is a merry fellow and sings"
+        )
+        self.content.joinpath("blog", "elves.md").unlink()
+        output = self.build()
+        self.assertIn("Indexed 1 changed pages", output)
+        self.assertEqual(self.read(), self.build_fresh())
+        self.assertFalse(Path("public", "search", "656c.json.gz").exists())
+        self.assertEqual(
+            Path("public", "search", "7368.json.gz").stat().st_mtime_ns,
+            stamps["7368.json.gz"],
+        )
+
+    def build_fresh(self) -> dict[str, PageTerms]:
+        _ = self.build("fresh")
+        return self.read("fresh")
+
+    def test_template_change_keeps_index(self):
+        _ = self.build()
+        _ = Path("template.html").write_text(
+            "<h1>{{ Title }}</h1>{{ Content }}"
+        )
+        output = self.build()
+        self.assertIn("Indexed 0 changed pages", output)
+        self.assertIn("wrote 0 of", output)
+
+    def test_enabling_search_renders_pages(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            _ = content_generation(None, "public", incremental=True)
+        output = self.build()
+        self.assertIn("Indexed 3 changed pages", output)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,205 @@
+import contextlib
+import http.client
+import io
+import os
+import threading
+import unittest
+from functools import cached_property, partial
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import override
+
+from fixtures import WorkingDirectoryTestCase, WorkingPath
+from main import BuildContext, write_site_outputs
+from serve import (
+    RELOAD_SCRIPT,
+    LiveReload,
+    MemoryHandler,
+    rebuild,
+    snapshot,
+    strip_prefix,
+    with_reload_script,
+)
+from sinks import MemorySink
+from siteindex import SiteIndex
+from template import Template
+
+
+class TestLiveReload(unittest.TestCase):
+    def test_wait_times_out_without_change(self):
+        reloader = LiveReload()
+        self.assertEqual(reloader.wait(0, 0.01), 0)
+
+    def test_notify_wakes_waiters(self):
+        reloader = LiveReload()
+        versions: list[int] = []
+        waiter = threading.Thread(
+            target=lambda: versions.append(reloader.wait(0, 5))
+        )
+        waiter.start()
+        reloader.notify()
+        waiter.join(5)
+        self.assertEqual(versions, [1])
+        self.assertEqual(reloader.wait(0, 0.01), 1)
+
+
+class TestHelpers(unittest.TestCase):
+    def test_strip_prefix(self):
+        self.assertEqual(strip_prefix("/site/a.html", "site"), "/a.html")
+        self.assertEqual(strip_prefix("/site", "site"), "/")
+        self.assertEqual(strip_prefix("/site/", "site"), "/")
+        self.assertEqual(
+            strip_prefix("/sites/a.html", "site"), "/sites/a.html"
+        )
+        self.assertEqual(strip_prefix("/a.html", ""), "/a.html")
+
+    def test_with_reload_script(self):
+        self.assertEqual(
+            with_reload_script(b"<body>a</body></body>"),
+            b"<body>a</body>" + RELOAD_SCRIPT + b"</body>",
+        )
+        self.assertEqual(
+            with_reload_script(b"<p>a</p>"), b"<p>a</p>" + RELOAD_SCRIPT
+        )
+
+
+class TestRebuild(WorkingDirectoryTestCase):
+    content: WorkingPath = WorkingPath("content")
+    static: WorkingPath = WorkingPath("static")
+    public: WorkingPath = WorkingPath("public")
+    template: Template = Template("<title>{{ Title }}</title>{{ Content }}")
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self.content.joinpath("blog").mkdir(parents=True)
+        self.static.mkdir()
+        self.public.mkdir()
+        _ = self.content.joinpath("index.md").write_text("# Home\n\nHello")
+        _ = self.content.joinpath("blog", "a.md").write_text("# A\n\nPost")
+        _ = self.static.joinpath("a.css").write_text("p {}")
+
+    def test_snapshot_detects_changes(self):
+        roots = [self.content, self.static, Path("missing").absolute()]
+        before = snapshot(roots)
+        self.assertEqual(
+            sorted(before),
+            [
+                self.content.joinpath("blog", "a.md"),
+                self.content.joinpath("index.md"),
+                self.static.joinpath("a.css"),
+            ],
+        )
+        _ = self.static.joinpath("a.css").write_text("p { color: red }")
+        self.content.joinpath("index.md").unlink()
+        after = snapshot(roots)
+        self.assertNotEqual(
+            before[self.static.joinpath("a.css")],
+            after[self.static.joinpath("a.css")],
+        )
+        self.assertNotIn(self.content.joinpath("index.md"), after)
+
+    def test_rebuild(self):
+        index = SiteIndex()
+        with contextlib.redirect_stdout(io.StringIO()):
+            rebuild(
+                [
+                    self.content.joinpath("index.md"),
+                    self.content.joinpath("blog", "a.md"),
+                    self.static.joinpath("a.css"),
+                ],
+                [],
+                self.public,
+                BuildContext("", self.template),
+                index,
+            )
+        self.assertEqual(
+            self.public.joinpath("blog", "a.html").read_text(),
+            "<title>A</title><div><h1>A</h1><p>Post</p></div>",
+        )
+        self.assertEqual(self.public.joinpath("a.css").read_text(), "p {}")
+        self.assertEqual(sorted(index.pages), ["blog/a.md", "index.md"])
+        self.content.joinpath("blog", "a.md").unlink()
+        with contextlib.redirect_stdout(io.StringIO()):
+            rebuild(
+                [],
+                [self.content.joinpath("blog", "a.md")],
+                self.public,
+                BuildContext("", self.template),
+                index,
+            )
+        self.assertFalse(self.public.joinpath("blog", "a.html").exists())
+        self.assertTrue(self.public.joinpath("index.html").exists())
+        self.assertEqual(sorted(index.pages), ["index.md"])
+
+    def test_rebuild_updates_site_outputs(self):
+        index = SiteIndex()
+        site = MemorySink(self.public)
+        context = BuildContext(
+            "", self.template, sink=site, site_url="https://example.com"
+        )
+        content = self.content.joinpath("blog", "a.md")
+        with contextlib.redirect_stdout(io.StringIO()):
+            rebuild([content], [], self.public, context, index)
+            _ = write_site_outputs(context, index, self.public)
+        self.assertIn("blog/a.html", site.files)
+        self.assertIn(b"/blog/a.html", site.files["sitemap.xml"])
+        self.assertIn(b"<title>A</title>", site.files["blog/atom.xml"])
+        content.unlink()
+        with contextlib.redirect_stdout(io.StringIO()):
+            rebuild([], [content], self.public, context, index)
+            _ = write_site_outputs(context, index, self.public)
+        self.assertNotIn("blog/a.html", site.files)
+        self.assertNotIn(b"/blog/a.html", site.files["sitemap.xml"])
+        self.assertEqual(os.listdir(self.public), [])
+
+
+class TestMemoryHandler(unittest.TestCase):
+    @cached_property
+    def server(self) -> ThreadingHTTPServer:
+        site = MemorySink(Path("public"))
+        site.files = {
+            "index.html": b"<body>home</body>",
+            "blog/index.html": b"<body>blog</body>",
+            "a.css": b"p {}",
+        }
+        server = self.enterContext(
+            ThreadingHTTPServer(
+                ("127.0.0.1", 0),
+                partial(MemoryHandler, site, LiveReload(), "site"),
+            )
+        )
+        thread = threading.Thread(target=server.serve_forever, args=(0.01,))
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def get(self, path: str) -> http.client.HTTPResponse:
+        connection = http.client.HTTPConnection(
+            "127.0.0.1", self.server.server_address[1]
+        )
+        self.addCleanup(connection.close)
+        with contextlib.redirect_stderr(io.StringIO()):
+            connection.request("GET", path)
+            return connection.getresponse()
+
+    def test_serves_files_under_prefix(self):
+        response = self.get("/site/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(
+            response.read(), b"<body>home" + RELOAD_SCRIPT + b"</body>"
+        )
+        response = self.get("/site/a.css")
+        self.assertEqual(response.getheader("Content-Type"), "text/css")
+        self.assertEqual(response.read(), b"p {}")
+
+    def test_redirects_and_missing_files(self):
+        response = self.get("/site/blog")
+        self.assertEqual(response.status, 301)
+        self.assertEqual(response.getheader("Location"), "/site/blog/")
+        self.assertEqual(self.get("/site/missing.html").status, 404)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,98 @@
+import tarfile
+import unittest
+import zipfile
+from typing import override
+
+from fixtures import WorkingDirectoryTestCase, WorkingPath
+from sinks import ArchiveSink, DiskSink, MemorySink, OutputSink
+
+
+class TestSinks(WorkingDirectoryTestCase):
+    public: WorkingPath = WorkingPath("public")
+    asset: WorkingPath = WorkingPath("a.png")
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        _ = self.asset.write_bytes(b"png")
+
+    def fill(self, sink: OutputSink) -> None:
+        with sink.open_text(self.public.joinpath("index.html")) as file:
+            _ = file.write("<p>é</p>")
+        with self.assertRaises(ValueError):
+            with sink.open_text(self.public.joinpath("broken.html")) as file:
+                _ = file.write("partial")
+                raise ValueError("render failed")
+        sink.write_bytes(self.public.joinpath("blog", "atom.xml"), b"<feed/>")
+        sink.copy_file(self.asset, self.public.joinpath("images", "a.png"))
+
+    def test_disk(self):
+        for directory in ("blog", "images"):
+            self.public.joinpath(directory).mkdir(parents=True)
+        _ = self.public.joinpath("broken.html").write_text("old")
+        self.public.joinpath("index.html").hardlink_to(self.asset)
+        sink = DiskSink()
+        self.fill(sink)
+        self.assertEqual(
+            self.public.joinpath("index.html").read_text(), "<p>é</p>"
+        )
+        self.assertEqual(self.asset.read_bytes(), b"png")
+        self.assertEqual(
+            self.public.joinpath("broken.html").read_text(), "old"
+        )
+        self.assertEqual(
+            sorted(path.name for path in self.public.iterdir()),
+            ["blog", "broken.html", "images", "index.html"],
+        )
+        self.assertEqual(sink.size(self.public.joinpath("index.html")), 9)
+
+    def test_memory(self):
+        sink = MemorySink(self.public)
+        self.fill(sink)
+        self.assertEqual(
+            sink.files,
+            {
+                "index.html": "<p>é</p>".encode(),
+                "blog/atom.xml": b"<feed/>",
+                "images/a.png": b"png",
+            },
+        )
+        self.assertTrue(sink.is_dir(self.public.joinpath("blog")))
+        self.assertFalse(sink.is_dir(self.public.joinpath("bl")))
+        self.assertFalse(self.public.exists())
+
+    def test_zip(self):
+        path = self.root.joinpath("site.zip")
+        sink = ArchiveSink(self.public, path)
+        self.fill(sink)
+        sink.close()
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(
+                sorted(archive.namelist()),
+                ["blog/atom.xml", "images/a.png", "index.html"],
+            )
+            self.assertEqual(
+                archive.read("index.html").decode(), "<p>é</p>"
+            )
+
+    def test_tar(self):
+        path = self.root.joinpath("site.tar.gz")
+        sink = ArchiveSink(self.public, path)
+        self.fill(sink)
+        sink.close()
+        with tarfile.open(path) as archive:
+            self.assertEqual(
+                sorted(archive.getnames()),
+                ["blog/atom.xml", "images/a.png", "index.html"],
+            )
+            file = archive.extractfile("images/a.png")
+            assert file is not None
+            self.assertEqual(file.read(), b"png")
+
+    def test_unknown_archive(self):
+        with self.assertRaises(ValueError):
+            _ = ArchiveSink(self.public, self.root.joinpath("site.rar"))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,79 @@
+import os
+import unittest
+from typing import override
+
+from fixtures import WorkingDirectoryTestCase, WorkingPath
+from planner import plan_build
+from siteindex import SiteIndex
+
+
+class TestSiteIndex(WorkingDirectoryTestCase):
+    content: WorkingPath = WorkingPath("content")
+    public: WorkingPath = WorkingPath("public")
+    path: WorkingPath = WorkingPath("index")
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self.write("index.md", "# Home")
+        self.write(
+            "blog/first/index.md",
+            "---\ndate: 2024-01-02\ntags: a, b\n---\n# First post",
+        )
+        self.write(
+            "blog/second.md",
+            "---\ntitle: Second\ndate: 2024-02-01\nslug: two\n---\nBody",
+        )
+
+    def write(self, name: str, text: str) -> None:
+        path = self.content.joinpath(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _ = path.write_text(text)
+
+    def update(self):
+        index = SiteIndex(self.path)
+        index.update(
+            plan_build(self.public, None, self.content),
+            self.content,
+            self.public,
+        )
+        index.save()
+        return index
+
+    def test_entries(self):
+        index = self.update()
+        first = index.pages["blog/first/index.md"]
+        self.assertEqual(
+            (first.title, first.date, first.tags, first.slug, first.url),
+            ("First post", "2024-01-02", ["a", "b"], "first", "/blog/first/"),
+        )
+        second = index.pages["blog/second.md"]
+        self.assertEqual(
+            (second.title, second.slug, second.output, second.url),
+            ("Second", "two", "blog/second.html", "/blog/second.html"),
+        )
+        self.assertEqual(index.pages["index.md"].url, "/")
+        self.assertEqual(
+            [entry.source for entry in index.section("blog")],
+            ["blog/second.md", "blog/first/index.md"],
+        )
+        self.assertEqual(
+            [entry.source for entry in index.section("blog", 1)],
+            ["blog/second.md"],
+        )
+
+    def test_incremental_update(self):
+        _ = self.update()
+        index = self.update()
+        self.assertEqual(index.read_count, 0)
+        self.assertFalse(index.changed)
+        self.write("index.md", "# New home")
+        os.unlink(self.content.joinpath("blog/second.md"))
+        index = self.update()
+        self.assertEqual(index.read_count, 1)
+        self.assertEqual(index.pages["index.md"].title, "New home")
+        self.assertNotIn("blog/second.md", SiteIndex(self.path).pages)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,78 @@
+import os
+import unittest
+from typing import override
+
+from fixtures import WorkingDirectoryTestCase, WorkingPath
+from sync import AssetSync
+
+
+class TestAssetSync(WorkingDirectoryTestCase):
+    static: WorkingPath = WorkingPath("static")
+    public: WorkingPath = WorkingPath("public")
+
+    @override
+    def setUp(self) -> None:
+        super().setUp()
+        self.static.joinpath("images").mkdir(parents=True)
+        _ = self.static.joinpath("index.css").write_text("body {}")
+        _ = self.static.joinpath("images", "a.png").write_bytes(b"png")
+
+    def test_copies_then_skips_unchanged(self):
+        assets = AssetSync()
+        assets.sync_tree(self.static, self.public)
+        self.assertEqual((assets.placed, assets.skipped), (2, 0))
+        self.assertEqual(
+            self.public.joinpath("images", "a.png").read_bytes(), b"png"
+        )
+        assets = AssetSync()
+        assets.sync_tree(self.static, self.public)
+        self.assertEqual((assets.placed, assets.skipped), (0, 2))
+
+    def test_recopies_changed_file(self):
+        AssetSync().sync_tree(self.static, self.public)
+        _ = self.static.joinpath("index.css").write_text("body { margin: 0 }")
+        assets = AssetSync()
+        assets.sync_tree(self.static, self.public)
+        self.assertEqual((assets.placed, assets.skipped), (1, 1))
+        self.assertEqual(
+            self.public.joinpath("index.css").read_text(), "body { margin: 0 }"
+        )
+
+    def test_checksum_sees_same_size_and_mtime(self):
+        AssetSync().sync_tree(self.static, self.public)
+        source = self.static.joinpath("index.css")
+        stat = source.stat()
+        _ = source.write_text("main {}")
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assets = AssetSync()
+        assets.sync_tree(self.static, self.public)
+        self.assertEqual(assets.placed, 0)
+        assets = AssetSync(checksum=True)
+        assets.sync_tree(self.static, self.public)
+        self.assertEqual(assets.placed, 1)
+        self.assertEqual(
+            self.public.joinpath("index.css").read_text(), "main {}"
+        )
+
+    def test_hardlink_mode(self):
+        AssetSync("hardlink").sync_tree(self.static, self.public)
+        self.assertTrue(
+            self.public.joinpath("index.css").samefile(
+                self.static.joinpath("index.css")
+            )
+        )
+
+    def test_replaces_directory_with_file(self):
+        self.public.joinpath("index.css", "nested").mkdir(parents=True)
+        AssetSync().sync_tree(self.static, self.public)
+        self.assertEqual(
+            self.public.joinpath("index.css").read_text(), "body {}"
+        )
+
+    def test_unknown_link_mode(self):
+        with self.assertRaises(ValueError):
+            _ = AssetSync("symlink")
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
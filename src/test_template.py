@@ -0,0 +1,27 @@
+import unittest
+
+from template import Template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><p>{{Content}}</p>")
+        self.assertEqual(
+            template.render({"Title": "Hi", "Content": "Body"}),
+            "<title>Hi</title><p>Body</p>",
+        )
+
+    def test_missing_slot_is_left_untouched(self):
+        template = Template("{{ Title }} {{ Footer }}")
+        self.assertEqual(template.render({"Title": "Hi"}), "Hi {{ Footer }}")
+
+    def test_values_are_not_substituted_again(self):
+        template = Template("{{ Title }}|{{ Content }}")
+        self.assertEqual(
+            template.render({"Title": "{{ Content }}", "Content": "x"}),
+            "{{ Content }}|x",
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
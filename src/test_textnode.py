@@ -1,3 +1,5 @@
+import random
+import re
 import unittest
 
 from textnode import TextNode, TextType
@@ -35,6 +37,47 @@ class TestTextNode(unittest.TestCase):
             'TextNode("This is a test node", TextType.PLAIN, "https://example.com")',
         )
 
+    def test_split_text(self):
+        self.assertEqual(
+            TextNode.split_text("a **b** _c_ `d` [e](/f) ![g](/h.png)"),
+            [
+                TextNode("a ", TextType.PLAIN),
+                TextNode("b", TextType.BOLD),
+                TextNode(" ", TextType.PLAIN),
+                TextNode("c", TextType.ITALIC),
+                TextNode(" ", TextType.PLAIN),
+                TextNode("d", TextType.CODE),
+                TextNode(" ", TextType.PLAIN),
+                TextNode("e", TextType.LINK, "/f"),
+                TextNode(" ", TextType.PLAIN),
+                TextNode("g", TextType.IMAGE, "/h.png"),
+            ],
+        )
+
+    def test_split_text_mismatch(self):
+        with self.assertRaisesRegex(ValueError, "delimiter _ "):
+            _ = TextNode.split_text("**a _b** c")
+
+    def test_split_node_matches_staged_split_node(self):
+        tokens = ["a", " ", "_", "**", "*", "`", "[", "]", "(", ")", "!"]
+        tokens += ["\n", "[x](/y)", "![i](/u)", "[a_b](c)"]
+        generator = random.Random(0)
+        for _ in range(5000):
+            node = TextNode(
+                "".join(
+                    generator.choice(tokens)
+                    for _ in range(generator.randint(0, 12))
+                ),
+                TextType.PLAIN,
+            )
+            try:
+                expected = node.staged_split_node()
+            except ValueError as e:
+                with self.assertRaisesRegex(ValueError, re.escape(str(e))):
+                    _ = node.split_node()
+            else:
+                self.assertEqual(node.split_node(), expected, repr(node))
+
 
 if __name__ == "__main__":
     _ = unittest.main()
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import re
 from collections.abc import Sequence
 from enum import Enum, auto
 from typing import override
 
+import patterns
 from leafnode import LeafNode
+from links import rewrite_url
 
 
 class TextType(Enum):
@@ -18,6 +19,8 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__: tuple[str, ...] = ("text", "text_type", "url")
+
     def __init__(
         self, text: str, text_type: TextType, url: str | None = None
     ) -> None:
@@ -42,7 +45,11 @@ class TextNode:
         else:
             return f'TextNode("{self.text.encode("unicode_escape").decode("utf-8")}", {self.text_type}, "{self.url.encode("unicode_escape").decode("utf-8")}")'
 
-    def to_html_node(self, props: dict[str, str] | None = None) -> LeafNode:
+    def to_html_node(
+        self,
+        props: dict[str, str] | None = None,
+        path_prefix: str | None = None,
+    ) -> LeafNode:
         match self.text_type:
             case TextType.PLAIN:
                 return LeafNode(None, self.text, props)
@@ -58,7 +65,11 @@ class TextNode:
                         props = {}
                     else:
                         props = props.copy()
-                    props["href"] = self.url
+                    props["href"] = (
+                        self.url
+                        if path_prefix is None
+                        else rewrite_url(self.url, path_prefix)
+                    )
                     return LeafNode("a", self.text, props)
                 else:
                     raise ValueError(
@@ -70,7 +81,11 @@ class TextNode:
                         props = {}
                     else:
                         props = props.copy()
-                    props["src"] = self.url
+                    props["src"] = (
+                        self.url
+                        if path_prefix is None
+                        else rewrite_url(self.url, path_prefix)
+                    )
                     props["alt"] = self.text
                     return LeafNode("img", None, props)
                 else:
@@ -109,9 +124,7 @@ class TextNode:
             return [self]
         result_list: list[TextNode] = []
         next_start = 0
-        for image in re.finditer(
-            r"(?P<type>!)?\[(?P<alt>.*?)]\((?P<url>.*?)\)", self.text
-        ):
+        for image in patterns.IMAGE_OR_LINK.finditer(self.text):
             if image.start() > next_start:
                 result_list.append(
                     TextNode(
@@ -134,7 +147,7 @@ class TextNode:
         result_list.append(TextNode(self.text[next_start:], TextType.PLAIN))
         return result_list
 
-    def split_node(self) -> Sequence[TextNode]:
+    def staged_split_node(self) -> Sequence[TextNode]:
         return [
             bold_node
             for code_node in self._split_nodes_delimiter("`")
@@ -144,6 +157,90 @@ class TextNode:
             if bold_node.text != "" or bold_node.text_type is not TextType.PLAIN
         ]
 
+    def split_node(self) -> Sequence[TextNode]:
+        # One scan that reproduces staged_split_node: code spans and links
+        # bound the fragments that _ and ** are paired within, and a
+        # mismatched _ in a fragment is reported before a mismatched **.
+        if self.text_type is not TextType.PLAIN:
+            return [self]
+        text = self.text
+        if text.count("`") % 2 != 0:
+            raise ValueError(
+                "There is a mismatch in the occurances of delimiter ` in the text"
+            )
+        text_nodes: list[TextNode] = []
+        start = 0
+        italic = False
+        bold = False
+        bold_mismatch = False
+        for token in patterns.INLINE_TOKEN.finditer(text):
+            delimiter = token.group()
+            if delimiter == "_":
+                if italic:
+                    text_nodes.append(
+                        TextNode(text[start : token.start()], TextType.ITALIC)
+                    )
+                else:
+                    bold_mismatch = bold_mismatch or bold
+                    bold = False
+                    if token.start() > start:
+                        text_nodes.append(
+                            TextNode(
+                                text[start : token.start()], TextType.PLAIN
+                            )
+                        )
+                italic = not italic
+            elif delimiter == "**":
+                if italic:
+                    continue
+                if bold:
+                    text_nodes.append(
+                        TextNode(text[start : token.start()], TextType.BOLD)
+                    )
+                elif token.start() > start:
+                    text_nodes.append(
+                        TextNode(text[start : token.start()], TextType.PLAIN)
+                    )
+                bold = not bold
+            else:
+                self._check_fragment(italic, bold or bold_mismatch)
+                if token.start() > start:
+                    text_nodes.append(
+                        TextNode(text[start : token.start()], TextType.PLAIN)
+                    )
+                if token.group("code") is not None:
+                    text_nodes.append(
+                        TextNode(token.group("code"), TextType.CODE)
+                    )
+                else:
+                    text_nodes.append(
+                        TextNode(
+                            token.group("alt"),
+                            (
+                                TextType.LINK
+                                if token.group("type") is None
+                                else TextType.IMAGE
+                            ),
+                            token.group("url"),
+                        )
+                    )
+            start = token.end()
+        self._check_fragment(italic, bold or bold_mismatch)
+        if start < len(text):
+            text_nodes.append(TextNode(text[start:], TextType.PLAIN))
+        return text_nodes
+
+    @staticmethod
+    def _check_fragment(italic: bool, bold: bool) -> None:
+        if italic:
+            raise ValueError(
+                "There is a mismatch in the occurances of delimiter _ in the text"
+            )
+        if bold:
+            raise ValueError(
+                "There is a mismatch in the occurances of delimiter ** in the text"
+            )
+
     @staticmethod
     def split_text(text: str) -> Sequence[TextNode]:
         return TextNode(text, TextType.PLAIN).split_node()